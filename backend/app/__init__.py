@@ -2,6 +2,7 @@ from flask import Flask, request
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from app.config import Config
+from app.json_provider import FastJSONProvider
 from app.models import db
 from flask import jsonify
 
@@ -10,6 +11,7 @@ jwt = JWTManager()
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
     
     app.url_map.strict_slashes = False
     
@@ -48,9 +50,28 @@ def create_app():
         from app.models.training_video import TrainingVideo
         from app.models.training_session import TrainingSession
         from app.models.user_technique_progress import UserTechniqueProgress
+        from app.models.user_stats import UserStats
+        from app.models.catalog_state import CatalogState
+        from app.models.practice_event import PracticeEvent, PracticeRollup
+        from app.models.technique_neighbor import TechniqueNeighbor
+        from app.models.leaderboard import LeaderboardEntry, LeaderboardState
+        from app.models.change_log import ChangeLog
+        from app.services.user_stats import ensure_user_stats
+        from app.services.technique_search import ensure_search_index
+        from app.services.technique_import import ensure_technique_key_index
+        from app.services.training_analytics import ensure_session_date_index
+        from app.services.practice_queue import ensure_next_due_column
+        from app.services.sync import ensure_change_log
         
         db.create_all()
         print("✅ Database tables created/verified")
+        
+        ensure_next_due_column()
+        ensure_user_stats()
+        ensure_search_index()
+        ensure_technique_key_index()
+        ensure_session_date_index()
+        ensure_change_log()
     
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -81,5 +102,33 @@ def create_app():
         print("✅ Admin blueprint registered at /api/admin")
     except ImportError as e:
         print(f"❌ Failed to import admin blueprint: {e}")
+
+    try:
+        from app.routes.dashboard import dashboard_bp
+        app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+        print("✅ Dashboard blueprint registered at /api/dashboard")
+    except ImportError as e:
+        print(f"❌ Failed to import dashboard blueprint: {e}")
+
+    try:
+        from app.routes.leaderboards import leaderboards_bp
+        app.register_blueprint(leaderboards_bp, url_prefix='/api/leaderboards')
+        print("✅ Leaderboards blueprint registered at /api/leaderboards")
+    except ImportError as e:
+        print(f"❌ Failed to import leaderboards blueprint: {e}")
+
+    try:
+        from app.routes.sync import sync_bp
+        app.register_blueprint(sync_bp, url_prefix='/api/sync')
+        print("✅ Sync blueprint registered at /api/sync")
+    except ImportError as e:
+        print(f"❌ Failed to import sync blueprint: {e}")
+
+    try:
+        from app.routes.export import export_bp
+        app.register_blueprint(export_bp, url_prefix='/api/export')
+        print("✅ Export blueprint registered at /api/export")
+    except ImportError as e:
+        print(f"❌ Failed to import export blueprint: {e}")
     
     return app
\ No newline at end of file
@@ -9,6 +9,12 @@ class Config:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///dojotracker.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replicas - comma-separated URIs, e.g. sqlite:///dojotracker_replica.db
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv('SQLALCHEMY_REPLICA_URIS', '').split(',') if uri.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{i}': uri for i, uri in enumerate(SQLALCHEMY_REPLICA_URIS)}
+    # Seconds a user's reads stay on the primary after they write
+    REPLICA_LAG_TOLERANCE = float(os.getenv('REPLICA_LAG_TOLERANCE', '5'))
+    
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
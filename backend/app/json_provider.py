@@ -0,0 +1,123 @@
+"""
+JSON Provider
+Response serialization backed by orjson when it is installed, the standard library otherwise.
+Datetimes are encoded natively as ISO 8601, so models hand them over untouched.
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+from flask import Response, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """Encode the types neither backend handles on its own"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that prefers orjson and works directly in bytes"""
+
+    def dumps_bytes(self, obj, indent=None, sort_keys=None):
+        if sort_keys is None:
+            sort_keys = self.sort_keys
+
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+
+        separators = None if indent else (',', ':')
+        return json.dumps(
+            obj, default=_default, indent=indent, sort_keys=sort_keys,
+            separators=separators, ensure_ascii=self.ensure_ascii
+        ).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', _default)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent), mimetype=self.mimetype)
+
+
+# ==================== ENCODERS ====================
+
+def compile_encoder(fields, from_row=False, name='encode'):
+    """
+    Generate a function that builds a dict of the given fields, reading attributes of an object,
+    or positions of a result row when from_row is set. Values are passed through as-is.
+    """
+    for field in fields:
+        if not field.isidentifier():
+            raise ValueError(f'Invalid field name: {field!r}')
+
+    if from_row:
+        items = ', '.join(f'{field!r}: obj[{i}]' for i, field in enumerate(fields))
+    else:
+        items = ', '.join(f'{field!r}: obj.{field}' for field in fields)
+
+    namespace = {}
+    exec(compile(f'def {name}(obj):\n    return {{{items}}}\n', f'<encoder {name}>', 'exec'), namespace)
+    return namespace[name]
+
+
+def model_encoder(*fields):
+    """Generated to_dict() for a model - assign it in the class body"""
+    return compile_encoder(fields, name='to_dict')
+
+
+# ==================== STREAMING ====================
+
+def stream_json_list(key, items, encode=None, chunk_size=500, **envelope):
+    """
+    Stream {**envelope, key: [...items]} as chunked JSON so a large list is never built as one string.
+    Each chunk of items is encoded with a single dumps call. For list endpoints that are neither
+    cached nor paginated - pass the envelope keys in the order jsonify would sort them.
+    """
+    provider = current_app.json
+
+    def generate():
+        yield b'{'
+        for name, value in envelope.items():
+            yield provider.dumps_bytes(name) + b':' + provider.dumps_bytes(value) + b','
+
+        yield provider.dumps_bytes(key) + b':['
+
+        batch = []
+        first = True
+        for item in items:
+            batch.append(encode(item) if encode else item)
+            if len(batch) >= chunk_size:
+                yield (b'' if first else b',') + provider.dumps_bytes(batch)[1:-1]
+                first = False
+                batch = []
+
+        if batch:
+            yield (b'' if first else b',') + provider.dumps_bytes(batch)[1:-1]
+
+        yield b']}'
+
+    return Response(stream_with_context(generate()), mimetype=provider.mimetype)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.models import db
+from app.json_provider import model_encoder
 
 class VideoAnalysis(db.Model):
     __tablename__ = 'video_analyses'
@@ -13,14 +14,7 @@ class VideoAnalysis(db.Model):
     analysis_data = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'technique_id': self.technique_id,
-            'video_path': self.video_path,
-            'score': self.score,
-            'feedback': self.feedback,
-            'analysis_data': self.analysis_data,
-            'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+    to_dict = model_encoder(
+        'id', 'user_id', 'technique_id', 'video_path', 'score', 'feedback', 'analysis_data',
+        'created_at'
+    )
\ No newline at end of file
@@ -0,0 +1,13 @@
+from datetime import datetime
+from app.models import db
+
+class CatalogState(db.Model):
+    """Single-row table holding the technique catalog version, bumped on every catalog write"""
+    __tablename__ = 'catalog_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogState version:{self.version}>'
\ No newline at end of file
@@ -0,0 +1,26 @@
+from datetime import datetime
+from app.models import db
+
+class ChangeLog(db.Model):
+    """
+    Latest change to each synced record, ordered by seq - maintained by app.services.sync.
+    A record that changes again gets a new row (and seq); deletes leave a tombstone.
+    """
+    __tablename__ = 'change_log'
+
+    # Never reused, even after the highest row is replaced (SQLite AUTOINCREMENT)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    entity = db.Column(db.String(20), nullable=False)    # sessions, videos, progress
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)        # upsert, delete
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_change_log_user_seq', 'user_id', 'seq'),
+        db.Index('ix_change_log_entity', 'entity', 'entity_id', unique=True),
+        {'sqlite_autoincrement': True},
+    )
+
+    def __repr__(self):
+        return f'<ChangeLog #{self.seq} {self.op} {self.entity}:{self.entity_id}>'
@@ -0,0 +1,35 @@
+from datetime import datetime
+from app.models import db
+
+class LeaderboardEntry(db.Model):
+    """
+    One user's place on a leaderboard, precomputed by app.services.leaderboards.
+    rank is shared by ties (1, 2, 2, 4); position is unique and orders the list for paging.
+    """
+    __tablename__ = 'leaderboard_entries'
+
+    board = db.Column(db.String(50), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+    rank = db.Column(db.Integer, nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_leaderboard_entries_position', 'board', 'position', unique=True),
+    )
+
+    def __repr__(self):
+        return f'<LeaderboardEntry {self.board} #{self.rank} User:{self.user_id}>'
+
+
+class LeaderboardState(db.Model):
+    """When each leaderboard was last refreshed, and for which period"""
+    __tablename__ = 'leaderboard_state'
+
+    board = db.Column(db.String(50), primary_key=True)
+    period_start = db.Column(db.Date)
+    entries = db.Column(db.Integer, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LeaderboardState {self.board} at {self.refreshed_at}>'
@@ -0,0 +1,42 @@
+from datetime import datetime
+from app.models import db
+
+# Technique key of the rollup rows that hold a user's totals across every technique
+ALL_TECHNIQUES = 0
+
+class PracticeEvent(db.Model):
+    """One practice of a technique - append-only, written by app.services.practice_log"""
+    __tablename__ = 'practice_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    technique_id = db.Column(db.Integer, db.ForeignKey('techniques.id'), nullable=False)
+    practiced_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    duration = db.Column(db.Integer, nullable=False, default=0)  # in minutes
+
+    __table_args__ = (
+        db.Index('ix_practice_events_user_time', 'user_id', 'practiced_at'),
+    )
+
+    def __repr__(self):
+        return f'<PracticeEvent User:{self.user_id} Technique:{self.technique_id} At:{self.practiced_at}>'
+
+
+class PracticeRollup(db.Model):
+    """
+    Practice totals per user, period ('day' or 'week', starting Monday) and technique, with
+    ALL_TECHNIQUES rows for the user's totals. Maintained incrementally as events are written.
+    """
+    __tablename__ = 'practice_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    period = db.Column(db.String(10), primary_key=True)
+    # Key order matches the trend query: one user, period and technique over a date range
+    technique_id = db.Column(db.Integer, primary_key=True, default=ALL_TECHNIQUES)
+    period_start = db.Column(db.Date, primary_key=True)
+
+    practice_count = db.Column(db.Integer, nullable=False, default=0)
+    practice_time = db.Column(db.Integer, nullable=False, default=0)  # in minutes
+
+    def __repr__(self):
+        return f'<PracticeRollup User:{self.user_id} {self.period}:{self.period_start} Technique:{self.technique_id}>'
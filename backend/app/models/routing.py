@@ -0,0 +1,175 @@
+"""
+Read-Replica Routing
+Sends read-only request handlers to replica engines and everything else to the primary
+
+Read-your-writes: a request that commits a write answers with a short-lived LAST_WRITE_COOKIE
+holding the time of the write, so the client's next reads stay on the primary whichever worker
+process serves them. The per-process map below covers clients that don't send cookies back,
+but only for requests that land on the worker which took the write.
+"""
+
+import math
+import random
+import time
+from functools import wraps
+from threading import Lock
+from flask import g, current_app, has_request_context, request, after_this_request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Insert, Update, Delete
+
+REPLICA_BIND_PREFIX = 'replica_'
+LAST_WRITE_COOKIE = 'last_write'
+
+# user id -> monotonic time of their last committed write (per process)
+_recent_writes = {}
+_recent_writes_lock = Lock()
+
+
+def _current_user_key():
+    """Get the JWT identity if this request has been authenticated"""
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # No JWT was verified for this request - an anonymous caller
+        return None
+    except Exception:
+        current_app.logger.warning('Could not read the JWT identity for replica routing', exc_info=True)
+        return None
+
+
+def _lag_tolerance():
+    return current_app.config.get('REPLICA_LAG_TOLERANCE', 0)
+
+
+def record_write(user_key):
+    """Remember that a user just wrote, so their reads stay on the primary for a while"""
+    if user_key is None:
+        return
+
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_key] = now
+
+        # Drop expired entries so the map doesn't grow with every user ever seen
+        if len(_recent_writes) > 10000:
+            cutoff = now - _lag_tolerance()
+            for key in [k for k, t in _recent_writes.items() if t < cutoff]:
+                del _recent_writes[key]
+
+
+def wrote_recently(user_key):
+    """Check if a user's last write is still within the replica lag tolerance"""
+    if user_key is None:
+        return False
+
+    last_write = _recent_writes.get(user_key)
+    return last_write is not None and time.monotonic() - last_write < _lag_tolerance()
+
+
+def _cookie_wrote_recently():
+    """Check the client's LAST_WRITE_COOKIE - set by whichever worker took its last write"""
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ''))
+    except ValueError:
+        return False
+    return time.time() - last_write < _lag_tolerance()
+
+
+def _send_last_write_cookie():
+    """Tell the client when it last wrote, once per request however many commits it makes"""
+    if g.get('last_write_cookie'):
+        return
+    g.last_write_cookie = True
+
+    @after_this_request
+    def set_cookie(response):
+        tolerance = _lag_tolerance()
+        if tolerance > 0:
+            response.set_cookie(
+                LAST_WRITE_COOKIE, f'{time.time():.3f}',
+                max_age=math.ceil(tolerance), httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def read_only(view):
+    """
+    Mark a view as read-only so its queries may go to a replica.
+    Users who wrote within REPLICA_LAG_TOLERANCE seconds are kept on the primary
+    so they always read their own writes. That check runs when a query picks its engine,
+    so views that verify the JWT in their body are covered as well as @jwt_required() ones.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Session that picks a replica engine for reads inside @read_only views"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._replica_allowed(clause):
+            replica = self._pick_replica()
+            if replica is not None:
+                return replica
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_allowed(self, clause):
+        if not has_request_context() or not g.get('use_replica'):
+            return False
+
+        # Anything that writes, or reads inside a unit of work with pending changes, stays on the primary
+        if self._flushing or self.new or self.dirty or self.deleted:
+            return False
+
+        # So does the rest of a transaction that already wrote - including its commit hooks
+        if self.info.get('wrote'):
+            return False
+
+        if isinstance(clause, (Insert, Update, Delete)):
+            return False
+
+        if _cookie_wrote_recently():
+            return False
+
+        # Resolved per query - the view may only have verified the JWT after it started
+        return not wrote_recently(_current_user_key())
+
+    def _pick_replica(self):
+        replicas = [
+            engine for key, engine in self._db.engines.items()
+            if key and key.startswith(REPLICA_BIND_PREFIX)
+        ]
+        return random.choice(replicas) if replicas else None
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flagged_flush(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _flagged_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _record_committed_write(session):
+    if not session.info.pop('wrote', False) or not has_request_context():
+        return
+
+    # The rest of this request reads its own writes from the primary too
+    g.use_replica = False
+    record_write(_current_user_key())
+    _send_last_write_cookie()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_rolled_back_write(session):
+    session.info.pop('wrote', None)
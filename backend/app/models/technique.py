@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.models import db
+from app.json_provider import model_encoder
 
 class Technique(db.Model):
     __tablename__ = 'techniques'
@@ -15,13 +16,11 @@ class Technique(db.Model):
     # Relationships
     video_analyses = db.relationship('VideoAnalysis', backref='technique', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'style': self.style,
-            'difficulty': self.difficulty,
-            'reference_video_url': self.reference_video_url,
-            'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+    # Each style can only have one technique of a given name - imports upsert on this key
+    __table_args__ = (
+        db.Index('ix_techniques_name_style', 'name', 'style', unique=True),
+    )
+    
+    to_dict = model_encoder(
+        'id', 'name', 'description', 'style', 'difficulty', 'reference_video_url', 'created_at'
+    )
\ No newline at end of file
@@ -0,0 +1,21 @@
+from datetime import datetime
+from app.models import db
+
+# Technique key of the rows listing the most tracked techniques, for users with nothing tracked yet
+POPULAR_TECHNIQUES = 0
+
+class TechniqueNeighbor(db.Model):
+    """
+    Precomputed top-k similar techniques, by how often users track both.
+    Rebuilt as a whole by scripts/build_recommendations.py and served by app.services.technique_recommendations.
+    """
+    __tablename__ = 'technique_neighbors'
+
+    technique_id = db.Column(db.Integer, primary_key=True)
+    neighbor_id = db.Column(db.Integer, primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+    co_count = db.Column(db.Integer, nullable=False, default=0)  # users tracking both
+    built_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TechniqueNeighbor {self.technique_id} -> {self.neighbor_id} ({self.score:.3f})>'
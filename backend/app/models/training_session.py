@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.models import db
+from app.json_provider import model_encoder
 
 class TrainingSession(db.Model):
     __tablename__ = 'training_sessions'
@@ -23,21 +24,15 @@ class TrainingSession(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'title': self.title,
-            'style': self.style,
-            'duration': self.duration,
-            'intensity': self.intensity,
-            'description': self.description,
-            'notes': self.notes,
-            'location': self.location,
-            'session_date': self.session_date.isoformat() if self.session_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Covers the analytics query (app.services.training_analytics) - it never reads the table itself
+    __table_args__ = (
+        db.Index('ix_training_sessions_user_date', 'user_id', 'session_date', 'style', 'duration'),
+    )
+    
+    to_dict = model_encoder(
+        'id', 'user_id', 'title', 'style', 'duration', 'intensity', 'description', 'notes',
+        'location', 'session_date', 'created_at', 'updated_at'
+    )
     
     def __repr__(self):
         return f'<TrainingSession {self.id}: {self.title}>'
\ No newline at end of file
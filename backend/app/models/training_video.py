@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.models import db
+from app.json_provider import model_encoder
 
 class TrainingVideo(db.Model):
     __tablename__ = 'training_videos'
@@ -33,26 +34,11 @@ class TrainingVideo(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'technique_id': self.technique_id,
-            'session_id': self.session_id,
-            'title': self.title,
-            'filename': self.filename,
-            'file_size': self.file_size,
-            'duration': self.duration,
-            'technique_name': self.technique_name,
-            'style': self.style,
-            'description': self.description,
-            'is_private': self.is_private,
-            'analysis_status': self.analysis_status,
-            'analysis_score': self.analysis_score,
-            'analysis_feedback': self.analysis_feedback,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    to_dict = model_encoder(
+        'id', 'user_id', 'technique_id', 'session_id', 'title', 'filename', 'file_size',
+        'duration', 'technique_name', 'style', 'description', 'is_private', 'analysis_status',
+        'analysis_score', 'analysis_feedback', 'created_at', 'updated_at'
+    )
     
     def __repr__(self):
         return f'<TrainingVideo {self.id}: {self.title}>'
\ No newline at end of file
@@ -1,6 +1,7 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.models import db
+from app.json_provider import model_encoder
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -22,10 +23,6 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+    to_dict = model_encoder(
+        'id', 'username', 'email', 'created_at'
+    )
\ No newline at end of file
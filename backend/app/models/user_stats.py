@@ -0,0 +1,35 @@
+from datetime import datetime
+from app.models import db
+
+# Style key of the row that holds a user's totals across every style
+ALL_STYLES = '*'
+
+class UserStats(db.Model):
+    """Per-user, per-style rollup of dashboard counters, maintained by app.services.user_stats"""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    style = db.Column(db.String(50), primary_key=True, default=ALL_STYLES)
+
+    # Training sessions
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+    session_duration = db.Column(db.Integer, nullable=False, default=0)  # in minutes
+
+    # Training videos
+    video_count = db.Column(db.Integer, nullable=False, default=0)
+    video_duration = db.Column(db.Float, nullable=False, default=0)  # in seconds
+    analyzed_video_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Technique progress (only kept on the ALL_STYLES row)
+    tracked_count = db.Column(db.Integer, nullable=False, default=0)
+    learning_count = db.Column(db.Integer, nullable=False, default=0)
+    practicing_count = db.Column(db.Integer, nullable=False, default=0)
+    mastered_count = db.Column(db.Integer, nullable=False, default=0)
+    favorites_count = db.Column(db.Integer, nullable=False, default=0)
+    practice_count = db.Column(db.Integer, nullable=False, default=0)
+    practice_time = db.Column(db.Integer, nullable=False, default=0)  # in minutes
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UserStats User:{self.user_id} Style:{self.style}>'
\ No newline at end of file
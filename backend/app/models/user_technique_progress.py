@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.models import db
+from app.json_provider import model_encoder
 
 class UserTechniqueProgress(db.Model):
     __tablename__ = 'user_technique_progress'
@@ -25,6 +26,9 @@ class UserTechniqueProgress(db.Model):
     last_practiced = db.Column(db.DateTime)
     mastered_at = db.Column(db.DateTime)
     
+    # Spaced repetition - when the technique is next due for practice (app.services.practice_queue)
+    next_due_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -32,25 +36,14 @@ class UserTechniqueProgress(db.Model):
     # Unique constraint - each user can only track a technique once
     __table_args__ = (
         db.UniqueConstraint('user_id', 'technique_id', name='unique_user_technique'),
+        db.Index('ix_progress_user_due', 'user_id', 'next_due_at'),
     )
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'technique_id': self.technique_id,
-            'proficiency_status': self.proficiency_status,
-            'is_favorite': self.is_favorite,
-            'notes': self.notes,
-            'personal_goal': self.personal_goal,
-            'practice_count': self.practice_count,
-            'total_practice_time': self.total_practice_time,
-            'first_practiced': self.first_practiced.isoformat() if self.first_practiced else None,
-            'last_practiced': self.last_practiced.isoformat() if self.last_practiced else None,
-            'mastered_at': self.mastered_at.isoformat() if self.mastered_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    to_dict = model_encoder(
+        'id', 'user_id', 'technique_id', 'proficiency_status', 'is_favorite', 'notes',
+        'personal_goal', 'practice_count', 'total_practice_time', 'first_practiced',
+        'last_practiced', 'mastered_at', 'next_due_at', 'created_at', 'updated_at'
+    )
     
     def to_dict_with_technique(self):
         """Include technique details in the response"""
@@ -3,11 +3,18 @@ Admin Routes for Bulk Operations
 Provides endpoints for bulk importing and managing techniques
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import db
 from app.models.technique import Technique
 from app.models.user import User
+from app.services.technique_catalog import bump_catalog_version
+from app.services.technique_import import (
+    import_technique_batch, stream_import, IMPORT_POLICIES,
+    STREAM_FORMATS, DEFAULT_STREAM_BATCH, MAX_STREAM_BATCH
+)
+from app.services.technique_dedupe import DEDUPE_MODES, DEFAULT_THRESHOLD, catalog_duplicate_pairs
+from app.services.technique_search import sync_search_index, clear_search_index
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -44,7 +51,9 @@ def bulk_import_techniques():
                 "reference_video_url": "https://..."
             },
             ...
-        ]
+        ],
+        "policy": "skip",   # optional: skip | update | replace existing (name, style) matches
+        "dedupe": "off"     # optional: off | report | skip near-duplicates of other techniques
     }
     """
     if not is_admin():
@@ -61,53 +70,23 @@ def bulk_import_techniques():
         if not isinstance(techniques_data, list):
             return jsonify({'error': 'Techniques must be an array'}), 400
         
-        imported = 0
-        skipped = 0
-        errors = []
-        
-        for tech_data in techniques_data:
-            try:
-                # Validate required fields
-                if not tech_data.get('name'):
-                    errors.append({'name': 'missing', 'error': 'Name is required'})
-                    continue
-                
-                # Check if already exists
-                existing = Technique.query.filter_by(
-                    name=tech_data['name'],
-                    style=tech_data.get('style', 'General')
-                ).first()
-                
-                if existing:
-                    skipped += 1
-                    continue
-                
-                # Create new technique
-                technique = Technique(
-                    name=tech_data['name'][:100],
-                    description=tech_data.get('description', '')[:1000],
-                    style=tech_data.get('style', 'General')[:50],
-                    difficulty=tech_data.get('difficulty', 'Intermediate')[:20],
-                    reference_video_url=tech_data.get('reference_video_url')
-                )
-                
-                db.session.add(technique)
-                imported += 1
-                
-            except Exception as e:
-                errors.append({
-                    'name': tech_data.get('name', 'unknown'),
-                    'error': str(e)
-                })
+        policy = data.get('policy', request.args.get('policy', 'skip'))
+        if policy not in IMPORT_POLICIES:
+            return jsonify({'error': f'Invalid policy. Allowed: {", ".join(IMPORT_POLICIES)}'}), 400
+        
+        dedupe = data.get('dedupe', request.args.get('dedupe', 'off'))
+        if dedupe not in DEDUPE_MODES:
+            return jsonify({'error': f'Invalid dedupe mode. Allowed: {", ".join(DEDUPE_MODES)}'}), 400
+        
+        result = import_technique_batch(techniques_data, policy=policy, dedupe=dedupe)
         
         # Commit all changes
         db.session.commit()
         
         return jsonify({
             'message': 'Bulk import completed',
-            'imported': imported,
-            'skipped': skipped,
-            'errors': errors,
+            'policy': policy,
+            **result.to_dict(),
             'total_techniques': Technique.query.count()
         }), 200
         
@@ -116,6 +95,75 @@ def bulk_import_techniques():
         return jsonify({'error': f'Bulk import failed: {str(e)}'}), 500
 
 
+@admin_bp.route('/techniques/import-stream', methods=['POST'])
+@jwt_required()
+def stream_import_techniques():
+    """
+    Import techniques from a streamed request body, one record per line
+    Body: newline-delimited JSON (Content-Type: application/x-ndjson) or CSV with a
+    header row (Content-Type: text/csv) - or pass ?format=ndjson|csv
+    Query params: policy (skip | update | replace), batch_size (records per commit),
+    dedupe (off | report | skip near-duplicates)
+    Responds with application/x-ndjson: one progress line per committed batch, then a summary
+    """
+    if not is_admin():
+        return jsonify({'error': 'Admin access required'}), 403
+
+    fmt = request.args.get('format') or STREAM_FORMATS.get(request.mimetype)
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Unsupported format. Send application/x-ndjson or text/csv'}), 415
+
+    policy = request.args.get('policy', 'skip')
+    if policy not in IMPORT_POLICIES:
+        return jsonify({'error': f'Invalid policy. Allowed: {", ".join(IMPORT_POLICIES)}'}), 400
+
+    batch_size = request.args.get('batch_size', DEFAULT_STREAM_BATCH, type=int)
+    if batch_size < 1:
+        return jsonify({'error': 'batch_size must be positive'}), 400
+    batch_size = min(batch_size, MAX_STREAM_BATCH)
+
+    dedupe = request.args.get('dedupe', 'off')
+    if dedupe not in DEDUPE_MODES:
+        return jsonify({'error': f'Invalid dedupe mode. Allowed: {", ".join(DEDUPE_MODES)}'}), 400
+
+    dumps = current_app.json.dumps_bytes
+    stream = request.stream
+
+    def generate():
+        for progress in stream_import(stream, fmt, policy, batch_size, dedupe):
+            yield dumps(progress) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@admin_bp.route('/techniques/duplicates', methods=['GET'])
+@jwt_required()
+def get_duplicate_techniques():
+    """
+    Merge candidates: pairs of catalog techniques with near-duplicate names in the same style
+    Query params: threshold (0-1, default 0.6), limit (default 100)
+    """
+    if not is_admin():
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    try:
+        threshold = request.args.get('threshold', DEFAULT_THRESHOLD, type=float)
+        limit = request.args.get('limit', 100, type=int)
+        if not 0 < threshold <= 1:
+            return jsonify({'error': 'threshold must be between 0 and 1'}), 400
+        
+        pairs = catalog_duplicate_pairs(threshold, limit)
+        
+        return jsonify({
+            'threshold': threshold,
+            'count': len(pairs),
+            'pairs': pairs
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to find duplicates: {str(e)}'}), 500
+
+
 @admin_bp.route('/techniques/stats', methods=['GET'])
 @jwt_required()
 def get_technique_stats():
@@ -171,6 +219,9 @@ def bulk_delete_techniques():
         
         # Delete techniques
         deleted = Technique.query.filter(Technique.id.in_(technique_ids)).delete(synchronize_session=False)
+        if deleted:
+            sync_search_index(technique_ids)
+            bump_catalog_version()
         db.session.commit()
         
         return jsonify({
@@ -194,6 +245,8 @@ def clear_all_techniques():
     try:
         count = Technique.query.count()
         Technique.query.delete()
+        clear_search_index()
+        bump_catalog_version()
         db.session.commit()
         
         return jsonify({
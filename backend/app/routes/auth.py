@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from sqlalchemy import func
 from app.models import db
+from app.models.routing import read_only
 from app.models.user import User
+from app.services.user_stats import get_user_stats_rows, video_stats_payload
 
 # Import TrainingVideo - may not exist yet
 try:
@@ -137,6 +138,7 @@ def change_password():
 
 @auth_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@read_only
 def get_user_stats():
     """Get user training statistics - safe fallback version"""
     try:
@@ -158,42 +160,10 @@ def get_user_stats():
             return jsonify(default_stats), 200
         
         try:
-            total_videos = TrainingVideo.query.filter_by(user_id=user_id).count()
-            print(f">>> Found {total_videos} videos")
+            stats = video_stats_payload(get_user_stats_rows(user_id))
+            print(f">>> Found {stats['total_videos']} videos")
             
-            total_duration = db.session.query(func.sum(TrainingVideo.duration)).filter_by(user_id=user_id).scalar()
-            total_duration = total_duration if total_duration else 0
-            
-            try:
-                videos_by_style = db.session.query(
-                    TrainingVideo.style,
-                    func.count(TrainingVideo.id)
-                ).filter_by(user_id=user_id).filter(TrainingVideo.style.isnot(None)).group_by(TrainingVideo.style).all()
-                videos_by_style_dict = dict(videos_by_style) if videos_by_style else {}
-            except Exception as e:
-                print(f">>> Error getting videos by style: {e}")
-                videos_by_style_dict = {}
-            
-            try:
-                analyzed_videos = TrainingVideo.query.filter_by(
-                    user_id=user_id,
-                    analysis_status='completed'
-                ).count()
-            except Exception as e:
-                print(f">>> Error getting analyzed videos: {e}")
-                analyzed_videos = 0
-            
-            hours = int(total_duration // 3600)
-            minutes = int((total_duration % 3600) // 60)
-            duration_formatted = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
-            
-            return jsonify({
-                'total_videos': total_videos,
-                'total_duration': total_duration,
-                'duration_formatted': duration_formatted,
-                'analyzed_videos': analyzed_videos,
-                'videos_by_style': videos_by_style_dict
-            }), 200
+            return jsonify(stats), 200
             
         except Exception as db_error:
             print(f">>> Database error in stats: {db_error}")
@@ -0,0 +1,127 @@
+"""
+Dashboard Routes
+Serves the dashboard's stats panels in a single request
+"""
+
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import Session
+from app.models import db
+from app.models.routing import read_only
+from app.models.technique import Technique
+from app.models.training_session import TrainingSession
+from app.models.user_stats import UserStats
+from app.models.user_technique_progress import UserTechniqueProgress
+from app.services.user_stats import video_stats_payload, session_stats_payload, progress_stats_payload
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Panel name -> the endpoint whose payload it mirrors
+PANELS = {
+    'videos': '/api/auth/stats',
+    'sessions': '/api/training/sessions/stats',
+    'progress': '/api/progress/stats',
+}
+
+# Shared pool for running a request's independent queries side by side
+_query_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='dashboard-query')
+
+
+def _load_stats_rows(session, user_id):
+    rows = session.query(UserStats).filter_by(user_id=user_id).all()
+    return {row.style: row for row in rows}
+
+
+def _load_recent_sessions(session, user_id):
+    sessions = session.query(TrainingSession).filter_by(user_id=user_id).order_by(
+        TrainingSession.session_date.desc()
+    ).limit(5).all()
+    return [s.to_dict() for s in sessions]
+
+
+def _load_recently_practiced(session, user_id):
+    rows = session.query(UserTechniqueProgress, Technique).outerjoin(
+        Technique, Technique.id == UserTechniqueProgress.technique_id
+    ).filter(
+        UserTechniqueProgress.user_id == user_id,
+        UserTechniqueProgress.last_practiced.isnot(None)
+    ).order_by(
+        UserTechniqueProgress.last_practiced.desc()
+    ).limit(5).all()
+
+    recent = []
+    for progress, technique in rows:
+        data = progress.to_dict()
+        data['technique'] = technique.to_dict() if technique else None
+        recent.append(data)
+    return recent
+
+
+def _run_queries(loaders, user_id):
+    """
+    Run independent loaders and return their results by name.
+    SQLite serializes access to the file anyway, so loaders share the request session there;
+    other engines get one connection per loader and run concurrently.
+    """
+    engine = db.session.get_bind()
+
+    if engine.dialect.name == 'sqlite' or len(loaders) == 1:
+        return {name: loader(db.session, user_id) for name, loader in loaders.items()}
+
+    def run(loader):
+        with Session(engine) as session:
+            return loader(session, user_id)
+
+    futures = {name: _query_pool.submit(run, loader) for name, loader in loaders.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+@dashboard_bp.route('/', methods=['GET'])
+@jwt_required()
+@read_only
+def get_dashboard():
+    """
+    Get the dashboard stats panels in one round trip
+    Query params:
+        fields - comma-separated panels to include (videos, sessions, progress); defaults to all
+    """
+    try:
+        user_id = int(get_jwt_identity())
+
+        fields = request.args.get('fields')
+        panels = [f.strip() for f in fields.split(',') if f.strip()] if fields else list(PANELS)
+
+        unknown = [p for p in panels if p not in PANELS]
+        if unknown:
+            return jsonify({
+                'error': f'Unknown dashboard fields: {", ".join(unknown)}',
+                'allowed': list(PANELS)
+            }), 400
+
+        loaders = {'stats': _load_stats_rows}
+        if 'sessions' in panels:
+            loaders['recent_sessions'] = _load_recent_sessions
+        if 'progress' in panels:
+            loaders['recently_practiced'] = _load_recently_practiced
+
+        results = _run_queries(loaders, user_id)
+        rows = results['stats']
+
+        dashboard = {}
+        if 'videos' in panels:
+            dashboard['videos'] = video_stats_payload(rows)
+        if 'sessions' in panels:
+            dashboard['sessions'] = session_stats_payload(rows)
+            dashboard['sessions']['recent_sessions'] = results['recent_sessions']
+        if 'progress' in panels:
+            dashboard['progress'] = progress_stats_payload(rows)
+            dashboard['progress']['recently_practiced'] = results['recently_practiced']
+
+        return jsonify(dashboard), 200
+
+    except Exception as e:
+        print(f"Dashboard error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': f'Failed to get dashboard: {str(e)}'}), 500
\ No newline at end of file
@@ -0,0 +1,47 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.utils import secure_filename
+from app.models.routing import read_only
+from app.models.user import User
+from app.services.account_export import export_account, EXPORT_FORMATS
+
+export_bp = Blueprint('export', __name__)
+
+def get_current_user_id():
+    """Get current user ID from JWT token"""
+    user_id_str = get_jwt_identity()
+    return int(user_id_str)
+
+@export_bp.route('/', methods=['GET'])
+@jwt_required()
+@read_only
+def export_my_account():
+    """
+    Download the whole account as a zip: sessions, progress and videos as NDJSON or CSV,
+    the video files under videos/, and a manifest. Streamed as it is built.
+    Query: format=ndjson|csv (default ndjson), videos=0 to leave out the video files
+    """
+    try:
+        user = User.query.get(get_current_user_id())
+        if not user:
+            return jsonify({'message': 'User not found'}), 404
+        
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'message': f'Invalid format. Allowed: {", ".join(EXPORT_FORMATS)}'}), 400
+        
+        include_videos = request.args.get('videos', '1') not in ('0', 'false', 'no')
+        
+        filename = f"dojotracker-{secure_filename(user.username) or user.id}-{datetime.utcnow():%Y%m%d}.zip"
+        print(f">>> Exporting account {user.id} ({fmt}, videos: {include_videos})")
+        
+        return Response(
+            stream_with_context(export_account(user, fmt, include_videos)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except Exception as e:
+        print(f"Error exporting account: {str(e)}")
+        return jsonify({'message': f'Failed to export account: {str(e)}'}), 500
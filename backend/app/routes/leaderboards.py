@@ -0,0 +1,47 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.routing import read_only
+from app.services.leaderboards import (
+    leaderboard_page, list_leaderboards, UnknownBoardError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+
+leaderboards_bp = Blueprint('leaderboards', __name__)
+
+def get_current_user_id():
+    """Get current user ID from JWT token"""
+    user_id_str = get_jwt_identity()
+    return int(user_id_str)
+
+@leaderboards_bp.route('/', methods=['GET'])
+@jwt_required()
+@read_only
+def get_leaderboards():
+    """Available leaderboards and when they were last refreshed"""
+    try:
+        return jsonify({'leaderboards': list_leaderboards()}), 200
+        
+    except Exception as e:
+        print(f"Error listing leaderboards: {str(e)}")
+        return jsonify({'message': f'Failed to list leaderboards: {str(e)}'}), 500
+
+@leaderboards_bp.route('/<board>', methods=['GET'])
+@jwt_required()
+@read_only
+def get_leaderboard(board):
+    """
+    A page of a leaderboard plus the current user's rank.
+    Query: offset=<entries to skip>, limit=<page size>
+    """
+    try:
+        current_user_id = get_current_user_id()
+        
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        
+        return jsonify(leaderboard_page(board, current_user_id, offset, limit)), 200
+        
+    except UnknownBoardError as e:
+        return jsonify({'message': str(e)}), 404
+    except Exception as e:
+        print(f"Error getting leaderboard: {str(e)}")
+        return jsonify({'message': f'Failed to get leaderboard: {str(e)}'}), 500
@@ -1,11 +1,18 @@
-from datetime import datetime
+from datetime import date, datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
 from app.models import db
+from app.models.routing import read_only
 from app.models.user_technique_progress import UserTechniqueProgress
 from app.models.technique import Technique
 from app.models.training_video import TrainingVideo
+from app.json_provider import stream_json_list
+from app.services.read_models import PROGRESS_LIST, progress_with_technique
+from app.services.user_stats import get_user_stats_rows, progress_stats_payload
+from app.services.practice_log import practice_trends, PERIODS, DEFAULT_TREND_PERIODS, MAX_TREND_PERIODS
+from app.services.technique_recommendations import recommend_techniques, DEFAULT_LIMIT, MAX_LIMIT
+from app.services.practice_queue import practice_queue, DEFAULT_QUEUE_SIZE, MAX_QUEUE_SIZE
+from app.services.technique_progress import apply_progress_batch, start_tracking, record_practice, reschedule_progress, ProgressBatchError
 
 progress_bp = Blueprint('progress', __name__)
 
@@ -21,6 +28,7 @@ def test():
 
 @progress_bp.route('/techniques', methods=['GET'])
 @jwt_required()
+@read_only
 def get_all_progress():
     """Get all technique progress for current user"""
     try:
@@ -31,19 +39,19 @@ def get_all_progress():
         favorites_only = request.args.get('favorites', 'false').lower() == 'true'
         
         # Build query
-        query = UserTechniqueProgress.query.filter_by(user_id=current_user_id)
+        criteria = [UserTechniqueProgress.user_id == current_user_id]
         
         if proficiency_status:
-            query = query.filter_by(proficiency_status=proficiency_status)
+            criteria.append(UserTechniqueProgress.proficiency_status == proficiency_status)
         if favorites_only:
-            query = query.filter_by(is_favorite=True)
+            criteria.append(UserTechniqueProgress.is_favorite.is_(True))
         
-        progress_items = query.all()
+        count = db.session.execute(PROGRESS_LIST.count(*criteria)).scalar()
+        stmt, encode = progress_with_technique(*criteria)
+        rows = db.session.execute(stmt.execution_options(yield_per=500))
         
-        return jsonify({
-            'progress': [p.to_dict_with_technique() for p in progress_items],
-            'count': len(progress_items)
-        }), 200
+        # Neither cached nor paginated - stream it rather than build the whole list
+        return stream_json_list('progress', rows, encode=encode, count=count)
         
     except Exception as e:
         print(f"Error getting progress: {str(e)}")
@@ -51,6 +59,7 @@ def get_all_progress():
 
 @progress_bp.route('/techniques/<int:technique_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_technique_progress(technique_id):
     """Get progress for a specific technique"""
     try:
@@ -85,32 +94,20 @@ def start_tracking_technique(technique_id):
         if not technique:
             return jsonify({'message': 'Technique not found'}), 404
         
-        # Check if already tracking
-        existing = UserTechniqueProgress.query.filter_by(
-            user_id=current_user_id,
-            technique_id=technique_id
-        ).first()
+        # Insert-or-get in one statement - a second device starting at the same time gets this row
+        progress, created = start_tracking(current_user_id, technique_id)
+        payload = progress.to_dict_with_technique()
+        db.session.commit()
         
-        if existing:
+        if not created:
             return jsonify({
                 'message': 'Already tracking this technique',
-                'progress': existing.to_dict_with_technique()
+                'progress': payload
             }), 200
         
-        # Create new progress entry
-        new_progress = UserTechniqueProgress(
-            user_id=current_user_id,
-            technique_id=technique_id,
-            proficiency_status='learning',
-            first_practiced=datetime.utcnow()
-        )
-        
-        db.session.add(new_progress)
-        db.session.commit()
-        
         return jsonify({
             'message': 'Started tracking technique',
-            'progress': new_progress.to_dict_with_technique()
+            'progress': payload
         }), 201
         
     except Exception as e:
@@ -136,6 +133,7 @@ def update_technique_progress(technique_id):
         data = request.get_json()
         
         # Update allowed fields
+        status_changed = False
         if 'proficiency_status' in data:
             old_status = progress.proficiency_status
             new_status = data['proficiency_status']
@@ -148,6 +146,7 @@ def update_technique_progress(technique_id):
                     progress.mastered_at = datetime.utcnow()
                 elif new_status != 'mastered':
                     progress.mastered_at = None
+                status_changed = new_status != old_status
         
         if 'is_favorite' in data:
             progress.is_favorite = data['is_favorite']
@@ -158,20 +157,19 @@ def update_technique_progress(technique_id):
         if 'personal_goal' in data:
             progress.personal_goal = data['personal_goal']
         
-        # Update last practiced
+        # Count the practice with an atomic increment (and practice time if provided)
         if 'mark_practiced' in data and data['mark_practiced']:
-            progress.last_practiced = datetime.utcnow()
-            progress.practice_count += 1
-            
-            # Add practice time if provided
-            if 'practice_duration' in data:
-                progress.total_practice_time += int(data['practice_duration'])
+            record_practice(progress, int(data.get('practice_duration') or 0))
+        elif status_changed:
+            # Proficiency sets the spacing - reschedule from the last practice
+            reschedule_progress(progress)
         
+        payload = progress.to_dict_with_technique()
         db.session.commit()
         
         return jsonify({
             'message': 'Progress updated successfully',
-            'progress': progress.to_dict_with_technique()
+            'progress': payload
         }), 200
         
     except Exception as e:
@@ -179,6 +177,40 @@ def update_technique_progress(technique_id):
         print(f"Error updating progress: {str(e)}")
         return jsonify({'message': f'Failed to update progress: {str(e)}'}), 500
 
+@progress_bp.route('/techniques/batch', methods=['POST'])
+@jwt_required()
+def batch_update_progress():
+    """
+    Update progress for many techniques at once, in one transaction
+    Expected JSON:
+    {
+        "updates": [
+            {"technique_id": 12, "mark_practiced": true, "practice_duration": 10, "status": "practicing"},
+            ...
+        ]
+    }
+    Each item gets a result: updated (with the new counters), not_tracked or invalid
+    """
+    try:
+        current_user_id = get_current_user_id()
+        data = request.get_json() or {}
+        
+        results = apply_progress_batch(current_user_id, data.get('updates'))
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Progress updated',
+            'updated': sum(1 for result in results if result['result'] == 'updated'),
+            'results': results
+        }), 200
+        
+    except ProgressBatchError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error updating progress batch: {str(e)}")
+        return jsonify({'message': f'Failed to update progress: {str(e)}'}), 500
+
 @progress_bp.route('/techniques/<int:technique_id>', methods=['DELETE'])
 @jwt_required()
 def stop_tracking_technique(technique_id):
@@ -206,37 +238,13 @@ def stop_tracking_technique(technique_id):
 
 @progress_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@read_only
 def get_progress_stats():
     """Get overall progress statistics for the user"""
     try:
         current_user_id = get_current_user_id()
         
-        # Total techniques being tracked
-        total_tracked = UserTechniqueProgress.query.filter_by(user_id=current_user_id).count()
-        
-        # Count by proficiency status
-        status_counts = db.session.query(
-            UserTechniqueProgress.proficiency_status,
-            func.count(UserTechniqueProgress.id)
-        ).filter_by(user_id=current_user_id).group_by(
-            UserTechniqueProgress.proficiency_status
-        ).all()
-        
-        # Favorites count
-        favorites_count = UserTechniqueProgress.query.filter_by(
-            user_id=current_user_id,
-            is_favorite=True
-        ).count()
-        
-        # Total practice sessions across all techniques
-        total_practices = db.session.query(
-            func.sum(UserTechniqueProgress.practice_count)
-        ).filter_by(user_id=current_user_id).scalar() or 0
-        
-        # Total practice time
-        total_time = db.session.query(
-            func.sum(UserTechniqueProgress.total_practice_time)
-        ).filter_by(user_id=current_user_id).scalar() or 0
+        stats = progress_stats_payload(get_user_stats_rows(current_user_id))
         
         # Recently practiced techniques
         recent = UserTechniqueProgress.query.filter_by(
@@ -247,15 +255,84 @@ def get_progress_stats():
             UserTechniqueProgress.last_practiced.desc()
         ).limit(5).all()
         
+        stats['recently_practiced'] = [p.to_dict_with_technique() for p in recent]
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        print(f"Error getting stats: {str(e)}")
+        return jsonify({'message': f'Failed to get stats: {str(e)}'}), 500
+
+@progress_bp.route('/trends', methods=['GET'])
+@jwt_required()
+@read_only
+def get_practice_trends():
+    """
+    Practice count and time per day or week, oldest first.
+    Query: period=day|week (default week), periods=<n>, technique_id=<id>, end=YYYY-MM-DD
+    """
+    try:
+        current_user_id = get_current_user_id()
+        
+        period = request.args.get('period', 'week')
+        if period not in PERIODS:
+            return jsonify({'message': f'period must be one of: {", ".join(PERIODS)}'}), 400
+        
+        periods = request.args.get('periods', DEFAULT_TREND_PERIODS[period], type=int)
+        periods = min(max(periods, 1), MAX_TREND_PERIODS[period])
+        
+        end = request.args.get('end')
+        if end:
+            try:
+                end = date.fromisoformat(end)
+            except ValueError:
+                return jsonify({'message': 'end must be a date (YYYY-MM-DD)'}), 400
+        
+        technique_id = request.args.get('technique_id', type=int)
+        buckets = practice_trends(current_user_id, period, periods, technique_id, end)
+        
         return jsonify({
-            'total_tracked': total_tracked,
-            'by_status': {status: count for status, count in status_counts},
-            'favorites_count': favorites_count,
-            'total_practices': int(total_practices),
-            'total_practice_time': int(total_time),
-            'recently_practiced': [p.to_dict_with_technique() for p in recent]
+            'period': period,
+            'technique_id': technique_id,
+            'buckets': buckets,
+            'total_practices': sum(bucket['practice_count'] for bucket in buckets),
+            'total_practice_time': sum(bucket['practice_time'] for bucket in buckets)
         }), 200
         
     except Exception as e:
-        print(f"Error getting stats: {str(e)}")
-        return jsonify({'message': f'Failed to get stats: {str(e)}'}), 500
\ No newline at end of file
+        print(f"Error getting practice trends: {str(e)}")
+        return jsonify({'message': f'Failed to get trends: {str(e)}'}), 500
+
+@progress_bp.route('/recommendations', methods=['GET'])
+@jwt_required()
+@read_only
+def get_recommendations():
+    """Techniques to learn next, from what users who track the same techniques also track"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+        limit = min(max(limit, 1), MAX_LIMIT)
+        
+        return jsonify(recommend_techniques(current_user_id, limit)), 200
+        
+    except Exception as e:
+        print(f"Error getting recommendations: {str(e)}")
+        return jsonify({'message': f'Failed to get recommendations: {str(e)}'}), 500
+
+@progress_bp.route('/queue', methods=['GET'])
+@jwt_required()
+@read_only
+def get_practice_queue():
+    """Tracked techniques due for practice today, most overdue first"""
+    try:
+        current_user_id = get_current_user_id()
+        
+        limit = request.args.get('limit', DEFAULT_QUEUE_SIZE, type=int)
+        limit = min(max(limit, 1), MAX_QUEUE_SIZE)
+        
+        return jsonify(practice_queue(current_user_id, limit)), 200
+        
+    except Exception as e:
+        print(f"Error getting practice queue: {str(e)}")
+        return jsonify({'message': f'Failed to get practice queue: {str(e)}'}), 500
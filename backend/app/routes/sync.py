@@ -0,0 +1,36 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.routing import read_only
+from app.services.sync import sync_changes, SyncError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+sync_bp = Blueprint('sync', __name__)
+
+def get_current_user_id():
+    """Get current user ID from JWT token"""
+    user_id_str = get_jwt_identity()
+    return int(user_id_str)
+
+@sync_bp.route('/', methods=['GET'])
+@jwt_required()
+@read_only
+def get_changes():
+    """
+    Sessions, videos and progress changed since the client's watermark.
+    Query: since=<watermark from the last sync, 0 or omitted for everything>, limit=<changes per page>
+    """
+    try:
+        current_user_id = get_current_user_id()
+        
+        since = request.args.get('since', '0')
+        if not since.isdigit():
+            return jsonify({'message': 'since must be a watermark returned by a previous sync'}), 400
+        
+        limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        
+        return jsonify(sync_changes(current_user_id, int(since), limit)), 200
+        
+    except SyncError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        print(f"Error syncing changes: {str(e)}")
+        return jsonify({'message': f'Failed to sync: {str(e)}'}), 500
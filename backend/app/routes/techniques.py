@@ -1,12 +1,29 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 from app.models import db
+from app.models.routing import read_only
 from app.models.technique import Technique
+from app.services.read_models import TECHNIQUE_LIST
+from app.services.technique_catalog import (
+    get_catalog_version, get_cached_payload, build_payload, cached_response, is_cacheable_filter,
+    parse_page_params, query_catalog_page, CatalogQueryError
+)
+from app.services.technique_search import search_techniques
+from app.services.technique_typeahead import autocomplete
 
 techniques_bp = Blueprint('techniques', __name__)
 
 @techniques_bp.route('/', methods=['GET', 'OPTIONS'])
+@read_only
 def get_techniques():
+    """
+    List techniques, optionally filtered by style and difficulty
+    Paging query params (any of them switches to a paginated response):
+        fields - comma-separated columns to return, e.g. id,name,style,difficulty
+        sort   - name, style, difficulty or id; prefix with - for descending (default name)
+        limit  - page size (default 50, max 500)
+        cursor - next_cursor from the previous page
+    """
     # Handle preflight
     if request.method == 'OPTIONS':
         return '', 200
@@ -25,20 +42,117 @@ def get_techniques():
     style = request.args.get('style')
     difficulty = request.args.get('difficulty')
     
-    query = Technique.query
+    criteria = []
     
     if style:
-        query = query.filter_by(style=style)
+        criteria.append(Technique.style == style)
     if difficulty:
-        query = query.filter_by(difficulty=difficulty)
+        criteria.append(Technique.difficulty == difficulty)
     
-    techniques = query.all()
+    version = get_catalog_version()
+    # Unknown filter values are served uncached so they can't push real entries out
+    cacheable = is_cacheable_filter(version, style, difficulty)
+    
+    # Without paging params, keep returning the whole catalog
+    paging_params = ('fields', 'sort', 'limit', 'cursor')
+    if not any(name in request.args for name in paging_params):
+        def build_catalog():
+            rows = db.session.execute(TECHNIQUE_LIST.select().where(*criteria)).all()
+            return {'techniques': TECHNIQUE_LIST.to_dicts(rows)}
+        
+        # Serialized once per catalog version, then served from memory (or as a 304)
+        if cacheable:
+            payload = get_cached_payload((version, style, difficulty), build_catalog)
+        else:
+            payload = build_payload(build_catalog)
+        return cached_response(request, payload)
+    
+    try:
+        fields, sort, limit = parse_page_params(
+            fields=request.args.get('fields'),
+            sort=request.args.get('sort'),
+            limit=request.args.get('limit', type=int)
+        )
+        cursor = request.args.get('cursor')
+        
+        def build_page():
+            return query_catalog_page(criteria, fields=fields, sort=sort, limit=limit, cursor=cursor)
+        
+        # Only first pages are cached - every cursor is a new key, read once
+        if cacheable and not cursor:
+            payload = get_cached_payload((version, style, difficulty, fields, sort, limit), build_page)
+        else:
+            payload = build_payload(build_page)
+    except CatalogQueryError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return cached_response(request, payload)
+
+@techniques_bp.route('/search', methods=['GET', 'OPTIONS'])
+@read_only
+def search():
+    """
+    Full-text search over technique name, description and style
+    Query params: q (required), limit (default 20, max 100), style, difficulty
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        verify_jwt_in_request()
+    except Exception as e:
+        print(f">>> JWT verification failed: {type(e).__name__}: {str(e)}")
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search query'}), 400
+    
+    limit = min(max(request.args.get('limit', type=int, default=20), 1), 100)
+    
+    try:
+        results = search_techniques(
+            query,
+            limit=limit,
+            style=request.args.get('style'),
+            difficulty=request.args.get('difficulty')
+        )
+    except Exception as e:
+        print(f">>> Search failed: {type(e).__name__}: {str(e)}")
+        return jsonify({'error': f'Search failed: {str(e)}'}), 500
+    
+    return jsonify({
+        'query': query,
+        'results': results,
+        'count': len(results)
+    }), 200
+
+@techniques_bp.route('/autocomplete', methods=['GET', 'OPTIONS'])
+@read_only
+def autocomplete_techniques():
+    """
+    Typeahead suggestions for technique names and aliases, served from memory
+    Query params: q (required), limit (default 10, max 50)
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        verify_jwt_in_request()
+    except Exception as e:
+        print(f">>> JWT verification failed: {type(e).__name__}: {str(e)}")
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', type=int, default=10), 1), 50)
     
     return jsonify({
-        'techniques': [t.to_dict() for t in techniques]
+        'query': query,
+        'suggestions': autocomplete(query, limit)
     }), 200
 
 @techniques_bp.route('/<int:technique_id>', methods=['GET', 'OPTIONS'])
+@read_only
 def get_technique(technique_id):
     if request.method == 'OPTIONS':
         return '', 200
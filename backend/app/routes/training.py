@@ -2,14 +2,20 @@ from datetime import datetime
 import os
 import uuid
 import traceback
-from sqlalchemy import func
 from werkzeug.utils import secure_filename
 from flask import Blueprint, request, jsonify, send_file, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request, decode_token
 from app.models import db
+from app.models.routing import read_only
 from app.models.training_video import TrainingVideo
 from app.models.technique import Technique
 from app.models.training_session import TrainingSession
+from app.services.read_models import VIDEO_LIST, SESSION_LIST
+from app.services.user_stats import get_user_stats_rows, session_stats_payload, is_reserved_style
+from app.services.sync import record_changes
+from app.services.training_analytics import (
+    training_analytics, DEFAULT_HEATMAP_DAYS, MAX_HEATMAP_DAYS, DEFAULT_VOLUME_WEEKS, MAX_VOLUME_WEEKS
+)
 
 training_bp = Blueprint('training', __name__)
 
@@ -132,6 +138,7 @@ def stream_video(video_id):
 
 @training_bp.route('/videos', methods=['GET'])
 @jwt_required()
+@read_only
 def get_videos():
     """Get all videos for current user"""
     try:
@@ -148,31 +155,33 @@ def get_videos():
         
         print(f">>> Building query for user {current_user_id}...")
         # Build query
-        query = TrainingVideo.query.filter_by(user_id=current_user_id)
+        criteria = [TrainingVideo.user_id == current_user_id]
         
         if technique_id:
-            query = query.filter_by(technique_id=technique_id)
+            criteria.append(TrainingVideo.technique_id == technique_id)
         if style:
-            query = query.filter_by(style=style)
+            criteria.append(TrainingVideo.style == style)
         if technique_name:
-            query = query.filter_by(technique_name=technique_name)
+            criteria.append(TrainingVideo.technique_name == technique_name)
         
         print(">>> Getting count...")
         # Get total count
-        total_count = query.count()
+        total_count = db.session.execute(VIDEO_LIST.count(*criteria)).scalar()
         print(f">>> Total videos: {total_count}")
         
         print(">>> Fetching videos...")
-        # Apply pagination
-        videos = query.order_by(TrainingVideo.created_at.desc()).limit(limit).offset(offset).all()
-        print(f">>> Found {len(videos)} videos")
+        # Apply pagination - only the listed columns, no ORM instances
+        rows = db.session.execute(
+            VIDEO_LIST.select().where(*criteria)
+            .order_by(TrainingVideo.created_at.desc()).limit(limit).offset(offset)
+        ).all()
+        print(f">>> Found {len(rows)} videos")
         
-        print(">>> Converting to dict...")
-        video_dicts = [video.to_dict() for video in videos]
+        video_dicts = VIDEO_LIST.to_dicts(rows)
         
         return jsonify({
             'videos': video_dicts,
-            'count': len(videos),
+            'count': len(video_dicts),
             'total': total_count,
             'limit': limit,
             'offset': offset
@@ -187,6 +196,7 @@ def get_videos():
 
 @training_bp.route('/videos/<int:video_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_video(video_id):
     """Get a specific video"""
     try:
@@ -233,6 +243,9 @@ def upload_video():
         description = request.form.get('description', '')
         is_private = request.form.get('is_private', 'true').lower() == 'true'
         technique_id = request.form.get('technique_id', type=int)
+
+        if is_reserved_style(style):
+            return jsonify({'message': f'Invalid style: {style}'}), 400
         
         print(f">>> Technique ID: {technique_id}, Name: {technique_name}")
         
@@ -289,6 +302,9 @@ def update_video(video_id):
         
         if not video:
             return jsonify({'message': 'Video not found'}), 404
+
+        if is_reserved_style(data.get('style')):
+            return jsonify({'message': f"Invalid style: {data['style']}"}), 400
         
         # Update fields
         if 'title' in data:
@@ -354,6 +370,7 @@ def delete_video(video_id):
 
 @training_bp.route('/sessions', methods=['GET'])
 @jwt_required()
+@read_only
 def get_sessions():
     """Get all training sessions for current user"""
     try:
@@ -365,21 +382,24 @@ def get_sessions():
         limit = request.args.get('limit', type=int, default=50)
         offset = request.args.get('offset', type=int, default=0)
         
-        query = TrainingSession.query.filter_by(user_id=current_user_id)
+        criteria = [TrainingSession.user_id == current_user_id]
         
         if style:
-            query = query.filter_by(style=style)
+            criteria.append(TrainingSession.style == style)
         if start_date:
-            query = query.filter(TrainingSession.session_date >= start_date)
+            criteria.append(TrainingSession.session_date >= start_date)
         if end_date:
-            query = query.filter(TrainingSession.session_date <= end_date)
+            criteria.append(TrainingSession.session_date <= end_date)
         
-        total_count = query.count()
-        sessions = query.order_by(TrainingSession.session_date.desc()).limit(limit).offset(offset).all()
+        total_count = db.session.execute(SESSION_LIST.count(*criteria)).scalar()
+        rows = db.session.execute(
+            SESSION_LIST.select().where(*criteria)
+            .order_by(TrainingSession.session_date.desc()).limit(limit).offset(offset)
+        ).all()
         
         return jsonify({
-            'sessions': [session.to_dict() for session in sessions],
-            'count': len(sessions),
+            'sessions': SESSION_LIST.to_dicts(rows),
+            'count': len(rows),
             'total': total_count,
             'limit': limit,
             'offset': offset
@@ -392,6 +412,7 @@ def get_sessions():
 
 @training_bp.route('/sessions/<int:session_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_session(session_id):
     """Get a specific training session with linked videos"""
     try:
@@ -425,6 +446,9 @@ def create_session():
         
         if not data.get('title'):
             return jsonify({'message': 'Title is required'}), 400
+
+        if is_reserved_style(data.get('style')):
+            return jsonify({'message': f"Invalid style: {data['style']}"}), 400
         
         session_date = datetime.utcnow()
         if data.get('session_date'):
@@ -472,6 +496,9 @@ def update_session(session_id):
             return jsonify({'message': 'Session not found'}), 404
         
         data = request.get_json()
+
+        if is_reserved_style(data.get('style')):
+            return jsonify({'message': f"Invalid style: {data['style']}"}), 400
         
         if 'title' in data:
             session.title = data['title']
@@ -519,7 +546,12 @@ def delete_session(session_id):
             return jsonify({'message': 'Session not found'}), 404
         
         # Unlink videos (don't delete them, just remove session_id)
-        TrainingVideo.query.filter_by(session_id=session_id).update({'session_id': None})
+        unlinked = [video_id for (video_id,) in db.session.query(TrainingVideo.id).filter_by(session_id=session_id)]
+        if unlinked:
+            TrainingVideo.query.filter(TrainingVideo.id.in_(unlinked)).update(
+                {'session_id': None}, synchronize_session=False
+            )
+            record_changes(db.session, current_user_id, 'videos', unlinked)
         
         db.session.delete(session)
         db.session.commit()
@@ -534,41 +566,46 @@ def delete_session(session_id):
 
 @training_bp.route('/sessions/stats', methods=['GET'])
 @jwt_required()
+@read_only
 def get_session_stats():
     """Get training session statistics"""
     try:
         current_user_id = get_current_user_id()
         
-        total_sessions = TrainingSession.query.filter_by(user_id=current_user_id).count()
-        
-        total_duration = db.session.query(func.sum(TrainingSession.duration)).filter_by(user_id=current_user_id).scalar() or 0
-        
-        sessions_by_style = db.session.query(
-            TrainingSession.style,
-            func.count(TrainingSession.id),
-            func.sum(TrainingSession.duration)
-        ).filter_by(user_id=current_user_id).group_by(TrainingSession.style).all()
+        stats = session_stats_payload(get_user_stats_rows(current_user_id))
         
         recent_sessions = TrainingSession.query.filter_by(user_id=current_user_id).order_by(
             TrainingSession.session_date.desc()
         ).limit(5).all()
         
-        hours = int(total_duration // 60)
-        minutes = int(total_duration % 60)
-        duration_formatted = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+        stats['recent_sessions'] = [session.to_dict() for session in recent_sessions]
         
-        return jsonify({
-            'total_sessions': total_sessions,
-            'total_duration': total_duration,
-            'duration_formatted': duration_formatted,
-            'sessions_by_style': [
-                {'style': style, 'count': count, 'total_duration': duration}
-                for style, count, duration in sessions_by_style
-            ],
-            'recent_sessions': [session.to_dict() for session in recent_sessions]
-        }), 200
+        return jsonify(stats), 200
         
     except Exception as e:
         print(f"Stats error: {str(e)}")
         traceback.print_exc()
-        return jsonify({'error': f'Failed to get stats: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Failed to get stats: {str(e)}'}), 500
+
+@training_bp.route('/sessions/analytics', methods=['GET'])
+@jwt_required()
+@read_only
+def get_session_analytics():
+    """
+    Calendar heatmap, current/longest streak and weekly minutes per style.
+    Query: days=<heatmap days, default 365>, weeks=<volume weeks, default 12>
+    """
+    try:
+        current_user_id = get_current_user_id()
+        
+        days = request.args.get('days', DEFAULT_HEATMAP_DAYS, type=int)
+        weeks = request.args.get('weeks', DEFAULT_VOLUME_WEEKS, type=int)
+        days = min(max(days, 1), MAX_HEATMAP_DAYS)
+        weeks = min(max(weeks, 1), MAX_VOLUME_WEEKS)
+        
+        return jsonify(training_analytics(current_user_id, days, weeks)), 200
+        
+    except Exception as e:
+        print(f"Analytics error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': f'Failed to get analytics: {str(e)}'}), 500
@@ -0,0 +1,216 @@
+"""
+Account Export
+A user's whole account - sessions, technique progress, video metadata and the video files
+themselves - as one zip archive built while it is downloaded.
+
+The archive is written with zipfile onto a sink that can't seek, so every entry is followed by
+a data descriptor instead of being patched in place, and whatever the sink holds is handed to
+the response after each chunk. Records are streamed from the database in batches and video
+files are copied in CHUNK_SIZE reads, so memory stays flat however large the account is -
+nothing is staged in a temp file. Only the central directory (one small entry per file) grows.
+"""
+
+import csv
+import io
+import os
+import zipfile
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import select
+from werkzeug.utils import secure_filename
+from app.models import db
+from app.models.technique import Technique
+from app.models.training_video import TrainingVideo
+from app.services.read_models import SESSION_LIST, VIDEO_LIST, PROGRESS_LIST
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+CHUNK_SIZE = 1024 * 1024
+ROW_BATCH = 1000
+
+# Video containers are already compressed - deflating them again only costs CPU
+DATA_COMPRESSION = zipfile.ZIP_DEFLATED
+VIDEO_COMPRESSION = zipfile.ZIP_STORED
+
+
+class _ZipSink:
+    """Write-only file object the archive is written to; drain() hands over what has piled up"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _cell(value):
+    """CSV text for a value - datetimes in the same ISO 8601 form as the JSON files"""
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _video_archive_path(video_id, filename):
+    return f"videos/{video_id}-{secure_filename(filename or '') or 'video'}"
+
+
+# ==================== RECORDS ====================
+
+def _session_records(user_id):
+    rows = db.session.execute(
+        SESSION_LIST.select()
+        .where(SESSION_LIST.model.user_id == user_id)
+        .order_by(SESSION_LIST.model.id)
+        .execution_options(yield_per=ROW_BATCH)
+    )
+    return SESSION_LIST.fields, map(SESSION_LIST.encode, rows)
+
+
+def _progress_records(user_id):
+    fields = PROGRESS_LIST.fields + ('technique_name', 'technique_style')
+    progress = PROGRESS_LIST.model
+    rows = db.session.execute(
+        select(*PROGRESS_LIST.columns, Technique.name, Technique.style)
+        .join(Technique, Technique.id == progress.technique_id)
+        .where(progress.user_id == user_id)
+        .order_by(progress.id)
+        .execution_options(yield_per=ROW_BATCH)
+    )
+    return fields, (dict(zip(fields, row)) for row in rows)
+
+
+def _video_records(user_id):
+    fields = VIDEO_LIST.fields + ('archive_path',)
+    rows = db.session.execute(
+        VIDEO_LIST.select()
+        .where(VIDEO_LIST.model.user_id == user_id)
+        .order_by(VIDEO_LIST.model.id)
+        .execution_options(yield_per=ROW_BATCH)
+    )
+
+    def records():
+        for row in rows:
+            record = VIDEO_LIST.encode(row)
+            record['archive_path'] = _video_archive_path(record['id'], record['filename'])
+            yield record
+
+    return fields, records()
+
+
+EXPORT_TABLES = (
+    ('sessions', _session_records),
+    ('progress', _progress_records),
+    ('videos', _video_records),
+)
+
+
+# ==================== ARCHIVE ====================
+
+def _write_records(archive, sink, name, fields, records, fmt):
+    """Write one table as an archive entry, yielding archive bytes every ROW_BATCH records"""
+    info = zipfile.ZipInfo(f'{name}.{fmt}', date_time=datetime.utcnow().timetuple()[:6])
+    info.compress_type = DATA_COMPRESSION
+    count = 0
+
+    with archive.open(info, 'w') as entry:
+        if fmt == 'csv':
+            text = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+            writer = csv.writer(text)
+            writer.writerow(fields)
+            for record in records:
+                writer.writerow([_cell(record[field]) for field in fields])
+                count += 1
+                if count % ROW_BATCH == 0:
+                    text.flush()
+                    yield sink.drain()
+            text.flush()
+            text.detach()
+        else:
+            dumps = current_app.json.dumps_bytes
+            for record in records:
+                entry.write(dumps(record) + b'\n')
+                count += 1
+                if count % ROW_BATCH == 0:
+                    yield sink.drain()
+
+    yield sink.drain()
+    return count
+
+
+def _write_file(archive, sink, arcname, path):
+    """Copy a file into the archive CHUNK_SIZE bytes at a time"""
+    stat = os.stat(path)
+    info = zipfile.ZipInfo(arcname, date_time=datetime.fromtimestamp(stat.st_mtime).timetuple()[:6])
+    info.compress_type = VIDEO_COMPRESSION
+    # A known size lets zipfile switch to zip64 headers for files over 4 GB
+    info.file_size = stat.st_size
+
+    with open(path, 'rb') as source, archive.open(info, 'w') as entry:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            entry.write(chunk)
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def export_account(user, fmt='ndjson', include_videos=True):
+    """
+    Generator of the export archive's bytes for a user: a manifest, one file per table in
+    `fmt` and, unless include_videos is off, every video file that is still on disk.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {fmt}')
+
+    user_id, profile = user.id, user.to_dict()
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, 'w', allowZip64=True)
+    counts = {}
+
+    for name, source in EXPORT_TABLES:
+        fields, records = source(user_id)
+        counts[name] = yield from _write_records(archive, sink, name, fields, records, fmt)
+
+    videos = []
+    if include_videos:
+        # Paths only - a few bytes per video, fetched before the long copy so no cursor stays open
+        videos = db.session.execute(
+            select(TrainingVideo.id, TrainingVideo.filename, TrainingVideo.file_path)
+            .where(TrainingVideo.user_id == user_id)
+            .order_by(TrainingVideo.id)
+        ).all()
+    db.session.close()
+
+    missing = []
+    for video_id, filename, path in videos:
+        arcname = _video_archive_path(video_id, filename)
+        if not path or not os.path.isfile(path):
+            missing.append(arcname)
+            continue
+        yield from _write_file(archive, sink, arcname, path)
+
+    manifest = {
+        'user': profile,
+        'exported_at': datetime.utcnow(),
+        'format': fmt,
+        'records': counts,
+        'video_files': len(videos) - len(missing) if include_videos else 0,
+        'missing_video_files': missing,
+    }
+    archive.writestr('manifest.json', current_app.json.dumps_bytes(manifest, indent=2), DATA_COMPRESSION)
+    archive.close()
+
+    yield sink.drain()
@@ -0,0 +1,211 @@
+"""
+Leaderboards
+Cross-user rankings precomputed into leaderboard_entries, so viewing a board never groups
+over everyone's progress or sessions. Each board is rebuilt as a whole from the cheapest
+source available (the user_stats and practice rollups where they exist), either by
+scripts/refresh_leaderboards.py or lazily when a viewer finds it older than MAX_AGE_SECONDS.
+
+Reads are index lookups: a user's rank is a primary-key lookup on (board, user_id) and a page
+of the top list is a range scan of (board, position).
+"""
+
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from threading import Lock
+from flask import g, has_request_context
+from sqlalchemy import select, insert, delete, func
+from app.models import db
+from app.models.leaderboard import LeaderboardEntry, LeaderboardState
+from app.models.practice_event import PracticeRollup, ALL_TECHNIQUES
+from app.models.training_session import TrainingSession
+from app.models.user import User
+from app.models.user_stats import UserStats, ALL_STYLES
+from app.services.training_analytics import training_streaks
+
+MAX_AGE_SECONDS = 15 * 60
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+# Streaks are counted back at most this far
+STREAK_LOOKBACK_DAYS = 400
+
+_refresh_lock = Lock()
+
+
+class UnknownBoardError(ValueError):
+    """No leaderboard with that name"""
+
+
+# ==================== SCORES ====================
+
+def _mastered_scores(today):
+    return db.session.execute(
+        select(UserStats.user_id, UserStats.mastered_count)
+        .where(UserStats.style == ALL_STYLES, UserStats.mastered_count > 0)
+    ).all()
+
+
+def _month_minutes_scores(today):
+    minutes = func.sum(PracticeRollup.practice_time)
+    return db.session.execute(
+        select(PracticeRollup.user_id, minutes)
+        .where(
+            PracticeRollup.period == 'day',
+            PracticeRollup.technique_id == ALL_TECHNIQUES,
+            PracticeRollup.period_start >= today.replace(day=1),
+            PracticeRollup.period_start <= today
+        )
+        .group_by(PracticeRollup.user_id)
+        .having(minutes > 0)
+    ).all()
+
+
+def _session_streak_scores(today):
+    day = func.date(TrainingSession.session_date)
+    rows = db.session.execute(
+        select(TrainingSession.user_id, day)
+        .distinct()
+        .where(TrainingSession.session_date >= today - timedelta(days=STREAK_LOOKBACK_DAYS))
+        .order_by(TrainingSession.user_id, day)
+    )
+
+    scores = []
+    for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+        # SQLite returns the date as text
+        days = [date.fromisoformat(d) if isinstance(d, str) else d for _, d in user_rows]
+        current, _ = training_streaks(days, today)
+        if current['length']:
+            scores.append((user_id, current['length']))
+    return scores
+
+
+# name -> (description, score source, whether the board restarts every month)
+BOARDS = {
+    'techniques_mastered': ('Most techniques mastered', _mastered_scores, False),
+    'practice_minutes_month': ('Practice minutes this month', _month_minutes_scores, True),
+    'session_streak': ('Current training streak (days)', _session_streak_scores, False),
+}
+
+
+def _period_start(board, today):
+    return today.replace(day=1) if BOARDS[board][2] else None
+
+
+# ==================== REFRESH ====================
+
+def refresh_leaderboard(board, today=None):
+    """Recompute one board from its source and replace its entries. Returns the number of entries."""
+    if board not in BOARDS:
+        raise UnknownBoardError(f'Unknown leaderboard: {board}')
+
+    today = today or datetime.utcnow().date()
+    scores = sorted(BOARDS[board][1](today), key=lambda item: (-item[1], item[0]))
+
+    rows = []
+    rank = 0
+    previous = None
+    for position, (user_id, score) in enumerate(scores, start=1):
+        if score != previous:
+            rank, previous = position, score
+        rows.append({'board': board, 'user_id': user_id, 'score': score, 'rank': rank, 'position': position})
+
+    db.session.execute(delete(LeaderboardEntry).where(LeaderboardEntry.board == board))
+    if rows:
+        db.session.execute(insert(LeaderboardEntry.__table__), rows)
+
+    state = db.session.get(LeaderboardState, board) or LeaderboardState(board=board)
+    state.period_start = _period_start(board, today)
+    state.entries = len(rows)
+    state.refreshed_at = datetime.utcnow()
+    db.session.add(state)
+    db.session.commit()
+
+    return len(rows)
+
+
+def _is_stale(state, board, today):
+    if state is None:
+        return True
+    if state.period_start != _period_start(board, today):
+        return True
+    return datetime.utcnow() - state.refreshed_at > timedelta(seconds=MAX_AGE_SECONDS)
+
+
+def ensure_fresh(board):
+    """The board's state, refreshing it first if it is missing, out of date or from an earlier period"""
+    today = datetime.utcnow().date()
+    state = db.session.get(LeaderboardState, board)
+    if not _is_stale(state, board, today):
+        return state
+
+    # One refresh per process at a time - other viewers get the current entries meanwhile
+    if not _refresh_lock.acquire(blocking=state is None):
+        return state
+    try:
+        # Refresh against the primary even when the view may read from a replica
+        if has_request_context():
+            g.use_replica = False
+        db.session.expire_all()
+        state = db.session.get(LeaderboardState, board)
+        if _is_stale(state, board, today):
+            try:
+                refresh_leaderboard(board, today)
+            except Exception as e:
+                # Another process refreshing at the same time - serve what is there
+                db.session.rollback()
+                print(f"⚠️  Leaderboard {board} refresh failed: {e}")
+            state = db.session.get(LeaderboardState, board)
+        return state
+    finally:
+        _refresh_lock.release()
+
+
+# ==================== READS ====================
+
+def _score_value(score):
+    return int(score) if float(score).is_integer() else round(score, 1)
+
+
+def leaderboard_page(board, user_id=None, offset=0, limit=DEFAULT_PAGE_SIZE):
+    """A page of the ranked list plus the viewing user's own entry"""
+    if board not in BOARDS:
+        raise UnknownBoardError(f'Unknown leaderboard: {board}')
+
+    state = ensure_fresh(board)
+
+    rows = db.session.execute(
+        select(LeaderboardEntry.position, LeaderboardEntry.rank, LeaderboardEntry.score,
+               LeaderboardEntry.user_id, User.username)
+        .join(User, User.id == LeaderboardEntry.user_id)
+        .where(LeaderboardEntry.board == board, LeaderboardEntry.position > offset)
+        .order_by(LeaderboardEntry.position)
+        .limit(limit)
+    ).all()
+
+    me = db.session.get(LeaderboardEntry, (board, user_id)) if user_id is not None else None
+
+    return {
+        'board': board,
+        'title': BOARDS[board][0],
+        'total': state.entries if state else 0,
+        'refreshed_at': state.refreshed_at.isoformat() if state else None,
+        'offset': offset,
+        'entries': [
+            {'rank': row.rank, 'user_id': row.user_id, 'username': row.username, 'score': _score_value(row.score)}
+            for row in rows
+        ],
+        'me': {'rank': me.rank, 'score': _score_value(me.score)} if me else None
+    }
+
+
+def list_leaderboards():
+    states = {state.board: state for state in LeaderboardState.query.all()}
+    return [
+        {
+            'board': board,
+            'title': title,
+            'total': states[board].entries if board in states else 0,
+            'refreshed_at': states[board].refreshed_at.isoformat() if board in states else None
+        }
+        for board, (title, _, _) in BOARDS.items()
+    ]
@@ -0,0 +1,171 @@
+"""
+Practice Log
+Append-only history of technique practices plus daily and weekly rollups of it.
+Events are written in bulk, and each write adds its totals to the rollup rows in the same
+transaction, so trend charts over years of practice read one row per period instead of
+scanning the raw events.
+"""
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db
+from app.models.practice_event import PracticeEvent, PracticeRollup, ALL_TECHNIQUES
+
+PERIODS = ('day', 'week')
+# Longest trend a single request can ask for, in periods
+MAX_TREND_PERIODS = {'day': 731, 'week': 520}
+DEFAULT_TREND_PERIODS = {'day': 30, 'week': 12}
+
+COUNTER_COLUMNS = ('practice_count', 'practice_time')
+
+
+def period_start(day, period):
+    """First day of the period containing `day` - weeks start on Monday"""
+    if isinstance(day, datetime):
+        day = day.date()
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def period_step(period):
+    return timedelta(days=7 if period == 'week' else 1)
+
+
+def _rollup_deltas(events):
+    """{(period, technique key, period start): [count, minutes]} for (technique_id, practiced_at, duration) events"""
+    deltas = {}
+    for technique_id, practiced_at, duration in events:
+        for period in PERIODS:
+            start = period_start(practiced_at, period)
+            for key in (ALL_TECHNIQUES, technique_id):
+                totals = deltas.setdefault((period, key, start), [0, 0])
+                totals[0] += 1
+                totals[1] += duration or 0
+    return deltas
+
+
+def _bump_rollups(connection, user_id, deltas):
+    table = PracticeRollup.__table__
+    rows = [
+        {'user_id': user_id, 'period': period, 'technique_id': technique_id, 'period_start': start,
+         'practice_count': count, 'practice_time': minutes}
+        for (period, technique_id, start), (count, minutes) in deltas.items()
+    ]
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        # executemany of one cached statement - a multi-row VALUES would be recompiled per batch
+        stmt = dialect_insert(table)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.period, table.c.technique_id, table.c.period_start],
+            set_={name: table.c[name] + stmt.excluded[name] for name in COUNTER_COLUMNS}
+        ), rows)
+        return
+
+    # Generic fallback: update, then insert the row if it wasn't there yet
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(table.c.user_id == row['user_id'], table.c.period == row['period'],
+                   table.c.technique_id == row['technique_id'], table.c.period_start == row['period_start'])
+            .values({name: table.c[name] + row[name] for name in COUNTER_COLUMNS})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+
+def record_practice_events(connection, user_id, events):
+    """
+    Append (technique_id, practiced_at, duration) practices for a user and add them to the
+    rollups. Runs on the caller's connection so it commits or rolls back with the change itself.
+    """
+    events = list(events)
+    if not events:
+        return
+
+    connection.execute(insert(PracticeEvent.__table__), [
+        {'user_id': user_id, 'technique_id': technique_id, 'practiced_at': practiced_at, 'duration': duration or 0}
+        for technique_id, practiced_at, duration in events
+    ])
+    _bump_rollups(connection, user_id, _rollup_deltas(events))
+
+
+def practice_trends(user_id, period='week', periods=None, technique_id=None, end=None):
+    """
+    Practice totals for the last `periods` days or weeks up to `end` (default today), oldest
+    first, with empty periods included. Reads only the rollups.
+    """
+    periods = periods or DEFAULT_TREND_PERIODS[period]
+    last = period_start(end or datetime.utcnow().date(), period)
+    first = last - period_step(period) * (periods - 1)
+    key = technique_id if technique_id is not None else ALL_TECHNIQUES
+
+    rows = db.session.query(
+        PracticeRollup.period_start, PracticeRollup.practice_count, PracticeRollup.practice_time
+    ).filter(
+        PracticeRollup.user_id == user_id,
+        PracticeRollup.period == period,
+        PracticeRollup.technique_id == key,
+        PracticeRollup.period_start.between(first, last)
+    ).all()
+    found = {start: (count, minutes) for start, count, minutes in rows}
+
+    buckets = []
+    start = first
+    for _ in range(periods):
+        count, minutes = found.get(start, (0, 0))
+        buckets.append({'start': start.isoformat(), 'practice_count': count, 'practice_time': minutes})
+        start += period_step(period)
+    return buckets
+
+
+def rebuild_practice_rollups(user_id=None):
+    """
+    Recompute the rollups from the event log to fix any drift.
+    Rebuilds one user if user_id is given, otherwise everyone. Returns the number of rows written.
+    """
+    day = func.date(PracticeEvent.practiced_at)
+    query = db.session.query(
+        PracticeEvent.user_id,
+        PracticeEvent.technique_id,
+        day,
+        func.count(PracticeEvent.id),
+        func.sum(PracticeEvent.duration)
+    )
+    if user_id is not None:
+        query = query.filter(PracticeEvent.user_id == user_id)
+
+    query = query.group_by(PracticeEvent.user_id, PracticeEvent.technique_id, day)
+
+    totals = {}
+    for user, technique_id, practiced_on, count, minutes in query:
+        # SQLite returns the date as text
+        if isinstance(practiced_on, str):
+            practiced_on = date.fromisoformat(practiced_on)
+        for period in PERIODS:
+            start = period_start(practiced_on, period)
+            for key in (ALL_TECHNIQUES, technique_id):
+                row = totals.setdefault((user, period, key, start), [0, 0])
+                row[0] += count
+                row[1] += minutes or 0
+
+    delete_query = PracticeRollup.query
+    if user_id is not None:
+        delete_query = delete_query.filter_by(user_id=user_id)
+    delete_query.delete(synchronize_session=False)
+
+    rows = [
+        {'user_id': user, 'period': period, 'technique_id': key, 'period_start': start,
+         'practice_count': count, 'practice_time': minutes}
+        for (user, period, key, start), (count, minutes) in totals.items()
+    ]
+    if rows:
+        db.session.execute(insert(PracticeRollup.__table__), rows)
+    db.session.commit()
+
+    return len(rows)
@@ -0,0 +1,155 @@
+"""
+Practice Queue
+Spaced-repetition scheduling for tracked techniques. Each progress row stores when it is
+next due (next_due_at), computed SM-2 style from its practice count and proficiency status
+whenever it is practiced or its status changes. The "practice today" queue is then a range
+scan of the (user_id, next_due_at) index instead of scoring every row.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import inspect, select, text, update, bindparam
+from app.models import db
+from app.models.technique import Technique
+from app.models.user_technique_progress import UserTechniqueProgress
+from app.services.read_models import TECHNIQUE_LIST
+
+# SM-2: the first two reviews come after 1 and 6 days, then each interval is the last one
+# times the ease factor. Proficiency stands in for SM-2's per-review quality grade.
+FIRST_INTERVALS = (1, 6)
+EASE_FACTORS = {'learning': 1.3, 'practicing': 1.9, 'mastered': 2.5}
+MAX_INTERVAL_DAYS = 180
+
+DEFAULT_QUEUE_SIZE = 20
+MAX_QUEUE_SIZE = 100
+BACKFILL_BATCH = 1000
+
+
+def interval_days(practice_count, status):
+    """Days until a technique practiced practice_count times is due again"""
+    count = practice_count or 0
+    if count <= len(FIRST_INTERVALS):
+        return FIRST_INTERVALS[max(count, 1) - 1]
+    ease = EASE_FACTORS.get(status or 'learning', EASE_FACTORS['learning'])
+    return min(round(FIRST_INTERVALS[-1] * ease ** (count - len(FIRST_INTERVALS))), MAX_INTERVAL_DAYS)
+
+
+def next_due_at(last_practiced, practice_count, status, tracked_since=None):
+    """When a technique is next due - right away if it was never practiced"""
+    if last_practiced is None or not practice_count:
+        return tracked_since or datetime.utcnow()
+    return last_practiced + timedelta(days=interval_days(practice_count, status))
+
+
+# ==================== SCHEMA ====================
+
+def ensure_next_due_column():
+    """
+    Add next_due_at and its index to databases created before they existed, then schedule the
+    existing rows. Runs before anything else loads progress rows, since the model maps the column.
+    """
+    table = UserTechniqueProgress.__table__
+    columns = {column['name'] for column in inspect(db.engine).get_columns(table.name)}
+
+    added = 'next_due_at' not in columns
+    if added:
+        with db.engine.begin() as connection:
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN next_due_at TIMESTAMP'))
+
+    index = next(i for i in table.indexes if i.name == 'ix_progress_user_due')
+    index.create(db.engine, checkfirst=True)
+
+    if added:
+        scheduled = backfill_next_due()
+        print(f"✅ Added user_technique_progress.next_due_at and scheduled {scheduled} tracked techniques")
+
+
+def backfill_next_due():
+    """Compute next_due_at for progress rows that don't have one yet. Returns the number of rows updated."""
+    table = UserTechniqueProgress.__table__
+    total = 0
+
+    while True:
+        ids = db.session.execute(
+            select(table.c.id).where(table.c.next_due_at.is_(None)).limit(BACKFILL_BATCH)
+        ).scalars().all()
+        if not ids:
+            break
+
+        reschedule(db.session.connection(), ids)
+        db.session.commit()
+        total += len(ids)
+
+    return total
+
+
+def reschedule(connection, progress_ids):
+    """
+    Recompute next_due_at for progress rows from their stored practice count, status and last
+    practice, within the caller's transaction. Run it after the UPDATE that changed those: the
+    row lock that UPDATE took keeps concurrent practices waiting until commit, so the schedule
+    always matches the counters it is committed with. Returns {progress id: next_due_at}.
+    """
+    table = UserTechniqueProgress.__table__
+    rows = connection.execute(
+        select(table.c.id, table.c.last_practiced, table.c.practice_count,
+               table.c.proficiency_status, table.c.created_at)
+        .where(table.c.id.in_(list(progress_ids)))
+    ).all()
+
+    due = {
+        row.id: next_due_at(row.last_practiced, row.practice_count, row.proficiency_status, row.created_at)
+        for row in rows
+    }
+    if due:
+        connection.execute(
+            update(table).where(table.c.id == bindparam('progress_id')).values(next_due_at=bindparam('due')),
+            [{'progress_id': progress_id, 'due': value} for progress_id, value in due.items()]
+        )
+    return due
+
+
+# ==================== QUEUE ====================
+
+def practice_queue(user_id, limit=DEFAULT_QUEUE_SIZE, until=None):
+    """
+    Tracked techniques due by `until` (default: the end of today, UTC), most overdue first,
+    with how many are due in total and when the next one after those comes up.
+    """
+    now = datetime.utcnow()
+    until = until or datetime.combine(now.date(), datetime.max.time())
+    progress = UserTechniqueProgress
+
+    due = progress.query.filter(
+        progress.user_id == user_id,
+        progress.next_due_at <= until
+    ).order_by(progress.next_due_at, progress.id).limit(limit).all()
+
+    due_count = len(due)
+    if due_count == limit:
+        due_count = db.session.query(db.func.count(progress.id)).filter(
+            progress.user_id == user_id,
+            progress.next_due_at <= until
+        ).scalar()
+
+    upcoming = db.session.query(db.func.min(progress.next_due_at)).filter(
+        progress.user_id == user_id,
+        progress.next_due_at > until
+    ).scalar()
+
+    # One query for the techniques instead of one per item
+    ids = list({item.technique_id for item in due})
+    rows = db.session.execute(TECHNIQUE_LIST.select().where(Technique.id.in_(ids))).all() if ids else []
+    techniques = {technique['id']: technique for technique in TECHNIQUE_LIST.to_dicts(rows)}
+
+    items = []
+    for item in due:
+        data = item.to_dict()
+        data['technique'] = techniques.get(item.technique_id)
+        data['overdue_days'] = max((now - item.next_due_at).days, 0)
+        items.append(data)
+
+    return {
+        'due': items,
+        'due_count': due_count,
+        'next_due_at': upcoming.isoformat() if upcoming else None
+    }
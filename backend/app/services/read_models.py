@@ -0,0 +1,88 @@
+"""
+Read Models
+Lean read path for list endpoints - selects only the projected columns with Core
+and serializes the result rows directly, skipping ORM instances and the identity map
+"""
+
+from functools import lru_cache
+from sqlalchemy import select, func
+from app.json_provider import compile_encoder
+from app.models.training_video import TrainingVideo
+from app.models.training_session import TrainingSession
+from app.models.technique import Technique
+from app.models.user_technique_progress import UserTechniqueProgress
+
+
+class ReadModel:
+    """A column projection of a model whose rows serialize to the model's to_dict() shape"""
+    __slots__ = ('model', 'fields', 'columns', 'encode')
+
+    def __init__(self, model, fields):
+        table = model.__table__
+        self.model = model
+        self.fields = tuple(fields)
+        self.columns = [table.c[name] for name in self.fields]
+        self.encode = compile_encoder(self.fields, from_row=True)
+
+    def select(self):
+        return select(*self.columns)
+
+    def count(self, *criteria):
+        return select(func.count()).select_from(self.model.__table__).where(*criteria)
+
+    def to_dicts(self, rows):
+        """Turn result rows into dicts with the model's to_dict() keys"""
+        return list(map(self.encode, rows))
+
+
+# Same keys as the models' to_dict() - videos never expose file_path
+VIDEO_LIST = ReadModel(TrainingVideo, [
+    'id', 'user_id', 'technique_id', 'session_id', 'title', 'filename', 'file_size', 'duration',
+    'technique_name', 'style', 'description', 'is_private', 'analysis_status', 'analysis_score',
+    'analysis_feedback', 'created_at', 'updated_at'
+])
+
+SESSION_LIST = ReadModel(TrainingSession, [
+    'id', 'user_id', 'title', 'style', 'duration', 'intensity', 'description', 'notes',
+    'location', 'session_date', 'created_at', 'updated_at'
+])
+
+PROGRESS_LIST = ReadModel(UserTechniqueProgress, [
+    'id', 'user_id', 'technique_id', 'proficiency_status', 'is_favorite', 'notes',
+    'personal_goal', 'practice_count', 'total_practice_time', 'first_practiced',
+    'last_practiced', 'mastered_at', 'next_due_at', 'created_at', 'updated_at'
+])
+
+TECHNIQUE_LIST = ReadModel(Technique, [
+    'id', 'name', 'description', 'style', 'difficulty', 'reference_video_url', 'created_at'
+])
+
+
+@lru_cache(maxsize=64)
+def technique_projection(fields):
+    """Read model for a subset of TECHNIQUE_LIST fields (a tuple, in output order)"""
+    unknown = [name for name in fields if name not in TECHNIQUE_LIST.fields]
+    if unknown:
+        raise ValueError(f'Unknown technique fields: {", ".join(unknown)}')
+    return ReadModel(Technique, fields)
+
+
+def progress_with_technique(*criteria):
+    """
+    Select of PROGRESS_LIST rows joined to their technique, and the encoder of its rows -
+    the same shape as UserTechniqueProgress.to_dict_with_technique() without a query per row
+    """
+    split = len(PROGRESS_LIST.fields)
+    stmt = (
+        select(*PROGRESS_LIST.columns, *TECHNIQUE_LIST.columns)
+        .outerjoin(Technique, Technique.id == UserTechniqueProgress.technique_id)
+        .where(*criteria)
+        .order_by(UserTechniqueProgress.id)
+    )
+
+    def encode(row):
+        data = PROGRESS_LIST.encode(row[:split])
+        data['technique'] = TECHNIQUE_LIST.encode(row[split:]) if row[split] is not None else None
+        return data
+
+    return stmt, encode
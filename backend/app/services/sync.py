@@ -0,0 +1,170 @@
+"""
+Delta Sync
+Lets clients keep a local copy of a user's sessions, videos and progress and fetch only
+what changed. Every write to those tables replaces the record's row in change_log with a
+new one, taking the next seq, so change_log holds exactly one row per record - its latest
+change, or a tombstone once it is deleted. A client passes the highest seq it has seen and
+gets everything after it from a range scan of the (user_id, seq) index.
+
+ORM writes are captured by mapper events. Core statements that bypass them must call
+record_changes() themselves, inside the same transaction.
+
+Changes are queued on the session and logged when it commits, after locking the owners'
+user rows. A user's transactions therefore take their seqs one at a time, in commit order,
+and once a client has seen seq N every change of theirs below N is already visible - the
+watermark never skips one. Taking the lock last, once every other row is written, keeps
+it from deadlocking against the rows those transactions update.
+"""
+
+from datetime import datetime
+from sqlalchemy import event, select, insert, delete, literal
+from sqlalchemy.orm import Session, object_session
+from app.models import db
+from app.models.change_log import ChangeLog
+from app.models.user import User
+from app.models.training_session import TrainingSession
+from app.models.training_video import TrainingVideo
+from app.models.user_technique_progress import UserTechniqueProgress
+from app.services.read_models import SESSION_LIST, VIDEO_LIST, PROGRESS_LIST
+
+# entity name -> read model serving its records
+SYNC_ENTITIES = {
+    'sessions': SESSION_LIST,
+    'videos': VIDEO_LIST,
+    'progress': PROGRESS_LIST,
+}
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+class SyncError(ValueError):
+    """The client's watermark isn't usable"""
+
+
+# ==================== RECORDING ====================
+
+def record_changes(session, user_id, entity, ids, op='upsert'):
+    """
+    Log that records of one entity changed (op='upsert') or were deleted (op='delete').
+    The change is written when the session commits, and dropped if it rolls back.
+    """
+    pending = session.info.setdefault('sync_changes', {})
+    for entity_id in ids:
+        # The last change of a record in the transaction is the one that counts
+        pending[(entity, entity_id)] = (user_id, op)
+
+
+@event.listens_for(Session, 'before_commit')
+def _write_change_log(session):
+    # Flush first - changes still pending in the session are queued by their mapper events
+    session.flush()
+    pending = session.info.pop('sync_changes', None)
+    if not pending:
+        return
+
+    # Lock the owners in id order so two multi-user transactions can't wait on each other
+    user_ids = sorted({user_id for user_id, _ in pending.values()})
+    session.execute(select(User.id).where(User.id.in_(user_ids)).order_by(User.id).with_for_update())
+
+    table = ChangeLog.__table__
+    now = datetime.utcnow()
+    for entity in {entity for entity, _ in pending}:
+        session.execute(delete(table).where(
+            table.c.entity == entity,
+            table.c.entity_id.in_([entity_id for (e, entity_id) in pending if e == entity])
+        ))
+    session.execute(insert(table), [
+        {'user_id': user_id, 'entity': entity, 'entity_id': entity_id, 'op': op, 'changed_at': now}
+        for (entity, entity_id), (user_id, op) in pending.items()
+    ])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_rolled_back_changes(session):
+    session.info.pop('sync_changes', None)
+
+
+def _track(model, entity):
+    """Register insert/update/delete listeners that log a model's changes"""
+
+    @event.listens_for(model, 'after_insert')
+    @event.listens_for(model, 'after_update')
+    def after_write(mapper, connection, target):
+        record_changes(object_session(target), target.user_id, entity, [target.id])
+
+    @event.listens_for(model, 'after_delete')
+    def after_delete(mapper, connection, target):
+        record_changes(object_session(target), target.user_id, entity, [target.id], op='delete')
+
+
+_track(TrainingSession, 'sessions')
+_track(TrainingVideo, 'videos')
+_track(UserTechniqueProgress, 'progress')
+
+
+def ensure_change_log():
+    """Log every existing record once, the first time sync runs against an existing database"""
+    if db.session.execute(select(ChangeLog.seq).limit(1)).first() is not None:
+        return
+
+    table = ChangeLog.__table__
+    now = datetime.utcnow()
+    logged = 0
+    for entity, read_model in SYNC_ENTITIES.items():
+        source = read_model.model.__table__
+        result = db.session.execute(insert(table).from_select(
+            ['user_id', 'entity', 'entity_id', 'op', 'changed_at'],
+            select(source.c.user_id, literal(entity), source.c.id, literal('upsert'), literal(now))
+            .order_by(source.c.updated_at, source.c.id)
+        ))
+        logged += result.rowcount or 0
+    db.session.commit()
+
+    if logged:
+        print(f"✅ Change log backfilled ({logged} records)")
+
+
+# ==================== READS ====================
+
+def sync_changes(user_id, since=0, limit=DEFAULT_PAGE_SIZE):
+    """
+    Records changed after seq `since`: current versions of upserted records and ids of deleted
+    ones, grouped by entity. `watermark` is the seq to pass next time; when has_more is set,
+    call again right away for the rest.
+    """
+    if since < 0:
+        raise SyncError('since must be a non-negative change sequence')
+
+    rows = db.session.execute(
+        select(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op)
+        .where(ChangeLog.user_id == user_id, ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    upserted = {entity: [] for entity in SYNC_ENTITIES}
+    deleted = {entity: [] for entity in SYNC_ENTITIES}
+    for row in rows:
+        (deleted if row.op == 'delete' else upserted)[row.entity].append(row.entity_id)
+
+    upserts = {}
+    for entity, ids in upserted.items():
+        read_model = SYNC_ENTITIES[entity]
+        records = []
+        if ids:
+            source = read_model.model.__table__
+            records = read_model.to_dicts(db.session.execute(
+                read_model.select().where(source.c.id.in_(ids), source.c.user_id == user_id)
+            ).all())
+        upserts[entity] = records
+
+    return {
+        'watermark': rows[-1].seq if rows else since,
+        'has_more': has_more,
+        'upserts': upserts,
+        'deletes': deleted
+    }
@@ -0,0 +1,265 @@
+"""
+Technique Catalog Cache
+The catalog only changes through admin imports/deletes, so serialized list payloads
+are cached per catalog version and served with strong ETags.
+Only filters on styles/difficulties that exist in the catalog and first pages are cached -
+keys built from arbitrary client values or cursors would just churn the LRU.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app
+from sqlalchemy import event, select, update, insert, func, tuple_
+from sqlalchemy.orm import Session
+from app.models import db
+from app.models.catalog_state import CatalogState
+from app.models.technique import Technique
+from app.services.read_models import TECHNIQUE_LIST, technique_projection
+
+CATALOG_STATE_ID = 1
+
+# How long a process trusts its last read of the version before checking the database again
+VERSION_TTL_SECONDS = 2.0
+MAX_CACHED_PAYLOADS = 64
+
+SORTABLE_FIELDS = ('name', 'style', 'difficulty', 'id')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+_version_cache = {'version': None, 'checked_at': 0.0}
+_payloads = OrderedDict()
+_payloads_lock = Lock()
+_filter_values = {'version': None, 'styles': frozenset(), 'difficulties': frozenset()}
+
+
+# ==================== VERSION ====================
+
+def get_catalog_version():
+    """Current catalog version - re-read from the database at most every VERSION_TTL_SECONDS"""
+    now = time.monotonic()
+    if _version_cache['version'] is not None and now - _version_cache['checked_at'] < VERSION_TTL_SECONDS:
+        return _version_cache['version']
+
+    version = db.session.execute(
+        select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)
+    ).scalar() or 1
+
+    _version_cache.update(version=version, checked_at=now)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Mark the catalog as changed. Call inside the transaction that changes techniques,
+    before its commit, so cached payloads and ETags roll over together with the data.
+    Returns the new version. This process only drops its cached version once the
+    transaction commits - a read before that would cache a version that may roll back.
+    """
+    result = db.session.execute(
+        update(CatalogState)
+        .where(CatalogState.id == CATALOG_STATE_ID)
+        .values(version=CatalogState.version + 1)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(CatalogState).values(id=CATALOG_STATE_ID, version=2))
+
+    db.session.info['catalog_changed'] = True
+    return db.session.execute(
+        select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)
+    ).scalar()
+
+
+@event.listens_for(Session, 'after_commit')
+def _reread_committed_version(session):
+    if session.info.pop('catalog_changed', False):
+        # Make this process re-read the version on its next request
+        _version_cache['version'] = None
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_version(session):
+    session.info.pop('catalog_changed', None)
+
+
+# ==================== PAYLOAD CACHE ====================
+
+class CachedPayload:
+    """A serialized response body, its gzip-compressed copy and their strong ETags"""
+    __slots__ = ('body', 'gzip_body', 'etag', 'gzip_etag')
+
+    def __init__(self, body):
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.etag = digest
+        self.gzip_etag = f'{digest}-gz'
+
+
+def catalog_filter_values(version):
+    """Distinct styles and difficulties of a catalog version, read once per version"""
+    global _filter_values
+    cached = _filter_values
+    if cached['version'] != version:
+        cached = {
+            'version': version,
+            'styles': frozenset(db.session.execute(select(Technique.style).distinct()).scalars()),
+            'difficulties': frozenset(db.session.execute(select(Technique.difficulty).distinct()).scalars()),
+        }
+        # Swapped in whole so concurrent readers never see a half-built entry
+        _filter_values = cached
+    return cached['styles'], cached['difficulties']
+
+
+def is_cacheable_filter(version, style=None, difficulty=None):
+    """Check if payloads for these filters belong in the cache - only values the catalog has"""
+    styles, difficulties = catalog_filter_values(version)
+    return (not style or style in styles) and (not difficulty or difficulty in difficulties)
+
+
+def build_payload(build):
+    """Serialize build()'s result into a payload without caching it"""
+    return CachedPayload(current_app.json.dumps_bytes(build()))
+
+
+def get_cached_payload(key, build):
+    """
+    Get the cached payload for key (which should start with the catalog version),
+    calling build() to produce the object to serialize on a miss.
+    """
+    with _payloads_lock:
+        cached = _payloads.get(key)
+        if cached is not None:
+            _payloads.move_to_end(key)
+            return cached
+
+    payload = build_payload(build)
+
+    with _payloads_lock:
+        # Entries for older catalog versions can never be served again
+        for stale in [k for k in _payloads if k[0] < key[0]]:
+            del _payloads[stale]
+
+        _payloads[key] = payload
+        while len(_payloads) > MAX_CACHED_PAYLOADS:
+            _payloads.popitem(last=False)
+
+    return payload
+
+
+def cached_response(request, payload):
+    """Build a response for a cached payload, honoring If-None-Match and Accept-Encoding"""
+    use_gzip = 'gzip' in request.accept_encodings
+    etag = payload.gzip_etag if use_gzip else payload.etag
+
+    response = current_app.response_class(mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding, Authorization'
+    response.headers['Cache-Control'] = 'private, no-cache'
+
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+
+    response.set_data(payload.gzip_body if use_gzip else payload.body)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+# ==================== PAGINATION ====================
+
+class CatalogQueryError(ValueError):
+    """Invalid fields, sort, limit or cursor parameter"""
+
+
+def parse_page_params(fields=None, sort=None, limit=None):
+    """Validate and normalize page parameters into a hashable (fields, sort, limit) tuple"""
+    if fields:
+        names = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+        # The cursor is keyed on id, so it is always returned
+        if 'id' not in names:
+            names = ('id',) + names
+        try:
+            technique_projection(names)
+        except ValueError as e:
+            raise CatalogQueryError(str(e))
+    else:
+        names = None
+
+    sort = sort or 'name'
+    if sort.lstrip('-') not in SORTABLE_FIELDS:
+        raise CatalogQueryError(f'Invalid sort field. Allowed: {", ".join(SORTABLE_FIELDS)} (prefix with - to reverse)')
+
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise CatalogQueryError('limit must be positive')
+
+    return names, sort, min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(sort, value, last_id):
+    raw = json.dumps([sort, value, last_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise CatalogQueryError('Invalid cursor')
+
+    if cursor_sort != sort:
+        raise CatalogQueryError('Cursor was issued for a different sort order')
+
+    # The values are bound straight into the keyset comparison - anything else is a crafted cursor
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, type(None))):
+        raise CatalogQueryError('Invalid cursor')
+    if isinstance(last_id, bool) or not isinstance(last_id, int):
+        raise CatalogQueryError('Invalid cursor')
+    return value, last_id
+
+
+def query_catalog_page(criteria, fields=None, sort='name', limit=DEFAULT_PAGE_SIZE, cursor=None):
+    """
+    One keyset-paginated page of the catalog, selecting only the requested columns.
+    Rows are ordered by the sort field then id, so the cursor is stable while the catalog changes.
+    """
+    projection = technique_projection(fields) if fields else TECHNIQUE_LIST
+    field = sort.lstrip('-')
+    descending = sort.startswith('-')
+
+    column = Technique.__table__.c[field]
+    # NULL styles/difficulties sort as empty strings so the keyset comparison stays total
+    sort_expr = column if field == 'id' else func.coalesce(column, '')
+
+    stmt = projection.select().add_columns(sort_expr.label('sort_value')).where(*criteria)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        key = tuple_(sort_expr, Technique.id)
+        boundary = tuple_(value, last_id)
+        stmt = stmt.where(key < boundary if descending else key > boundary)
+
+    if descending:
+        stmt = stmt.order_by(sort_expr.desc(), Technique.id.desc())
+    else:
+        stmt = stmt.order_by(sort_expr, Technique.id)
+
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'techniques': projection.to_dicts(rows),
+        'next_cursor': encode_cursor(sort, rows[-1].sort_value, rows[-1].id) if has_more else None,
+        'count': len(rows),
+        'limit': limit,
+        'sort': sort
+    }
\ No newline at end of file
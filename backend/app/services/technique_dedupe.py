@@ -0,0 +1,271 @@
+"""
+Technique Dedupe
+Near-duplicate detection for technique names, e.g. "Front Kick", "Front kick (Mae Geri)"
+and "Mae-Geri". Each name alias is reduced to character trigrams, MinHashed, and bucketed
+with LSH banding, so only techniques sharing a bucket are compared - near-linear in the
+catalog size instead of pairwise. Candidates are scored with the exact Jaccard similarity
+of their closest aliases and only compared within the same style.
+"""
+
+import random
+import zlib
+from functools import lru_cache
+from threading import Lock
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.models import db
+from app.models.technique import Technique
+from app.services.technique_catalog import get_catalog_version
+from app.services.technique_typeahead import normalize, name_aliases
+
+# off: no detection, report: list candidates, skip: also leave out incoming near-duplicates
+DEDUPE_MODES = ('off', 'report', 'skip')
+DEFAULT_THRESHOLD = 0.6
+
+SHINGLE_SIZE = 3
+# 12 bands of 3 rows: pairs at 0.6 similarity share a bucket ~95% of the time, 0.8 ~100%, 0.3 ~28%
+BANDS = 12
+ROWS = 3
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(BANDS * ROWS)]
+
+# Distinct trigrams cached with their hashes under every permutation (~1.5 KB each).
+# Names share few distinct trigrams, so nearly every lookup hits once the catalog has been indexed.
+SHINGLE_CACHE_SIZE = 16384
+
+_style_key = lru_cache(maxsize=256)(normalize)
+
+
+def alias_shingles(alias):
+    """Character trigrams of an alias, ignoring spaces"""
+    compact = alias.replace(' ', '')
+    if len(compact) <= SHINGLE_SIZE:
+        return frozenset([compact])
+    return frozenset(compact[i:i + SHINGLE_SIZE] for i in range(len(compact) - SHINGLE_SIZE + 1))
+
+
+@lru_cache(maxsize=SHINGLE_CACHE_SIZE)
+def _permuted(shingle):
+    """A shingle's hash under every permutation - a signature is a column-wise min over these"""
+    x = zlib.crc32(shingle.encode('utf-8'))
+    return tuple((a * x + b) % _PRIME for a, b in _PERMUTATIONS)
+
+
+def minhash(shingles):
+    return list(map(min, zip(*map(_permuted, shingles))))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def name_similarity(shingles_a, shingles_b):
+    """Similarity of two techniques: their closest pair of aliases"""
+    return max(jaccard(a, b) for a in shingles_a for b in shingles_b)
+
+
+class DedupeIndex:
+    """
+    LSH buckets over technique aliases - supports adding and removing single techniques.
+    The shared catalog index is never changed once published: changes go to a copy() that
+    replaces it, so lock-free readers always see a consistent snapshot.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.entries = {}   # key -> (name, style, [alias shingles], band keys)
+        self.buckets = {}   # (style, band, band hash) -> set of keys
+
+    def copy(self, version=None):
+        """An independent index with the same techniques, to change and publish in its place"""
+        index = DedupeIndex(version)
+        index.entries = dict(self.entries)
+        index.buckets = {band_key: set(keys) for band_key, keys in self.buckets.items()}
+        return index
+
+    @staticmethod
+    def _band_keys(style, shingles):
+        signature = minhash(shingles)
+        return {
+            (style, band, hash(tuple(signature[band * ROWS:(band + 1) * ROWS])))
+            for band in range(BANDS)
+        }
+
+    @classmethod
+    def signature(cls, name, style):
+        """(alias shingles, LSH band keys) for a technique"""
+        style_key = _style_key(style or '')
+        aliases = [alias_shingles(alias) for alias in name_aliases(name)]
+        band_keys = set()
+        for shingles in aliases:
+            band_keys |= cls._band_keys(style_key, shingles)
+        return aliases, band_keys
+
+    def add(self, key, name, style, signature=None):
+        aliases, band_keys = signature or self.signature(name, style)
+        if not aliases:
+            return
+        self.entries[key] = (name, style, aliases, band_keys)
+        for band_key in band_keys:
+            self.buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in entry[3]:
+            bucket = self.buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band_key]
+
+    def matches(self, name, style, threshold=DEFAULT_THRESHOLD, exclude=None, signature=None):
+        """[(similarity, key)] of indexed techniques similar to name, best first"""
+        aliases, band_keys = signature or self.signature(name, style)
+        found = set()
+        for band_key in band_keys:
+            found |= self.buckets.get(band_key, set())
+        found.discard(exclude)
+
+        scored = []
+        for key in found:
+            entry = self.entries.get(key)
+            if entry is None:
+                continue
+            score = name_similarity(aliases, entry[2])
+            if score >= threshold:
+                scored.append((round(score, 3), key))
+        scored.sort(key=lambda match: (-match[0], str(match[1])))
+        return scored
+
+
+_catalog_index = None
+_catalog_index_lock = Lock()
+
+
+def get_catalog_dedupe_index():
+    """Index of the whole catalog keyed by technique id, refreshed when the catalog version changes"""
+    global _catalog_index
+    version = get_catalog_version()
+    index = _catalog_index
+    if index is not None and index.version == version:
+        return index
+
+    with _catalog_index_lock:
+        index = _catalog_index
+        if index is not None and index.version == version:
+            return index
+
+        rows = db.session.execute(select(Technique.id, Technique.name, Technique.style)).all()
+        techniques = {row.id: (row.name, row.style) for row in rows}
+
+        # Patch a copy - requests may still be matching against the published index
+        index = index.copy() if index is not None else DedupeIndex()
+        for technique_id in [i for i in index.entries if i not in techniques]:
+            index.remove(technique_id)
+        for technique_id, (name, style) in techniques.items():
+            entry = index.entries.get(technique_id)
+            if entry is None or entry[:2] != (name, style):
+                index.remove(technique_id)
+                index.add(technique_id, name, style)
+
+        index.version = version
+        _catalog_index = index
+        return index
+
+
+def add_to_catalog_index(techniques, version):
+    """
+    Add just-inserted (id, name, style) techniques to the catalog index once the transaction
+    that inserted them commits, so the next import batch doesn't reload the catalog.
+    version is the catalog version bump_catalog_version() returned for them. Dropped on rollback.
+    """
+    db.session.info.setdefault('catalog_index_additions', []).append((version, list(techniques)))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed_additions(session):
+    additions = session.info.pop('catalog_index_additions', None)
+    if not additions:
+        return
+
+    global _catalog_index
+    with _catalog_index_lock:
+        published = _catalog_index
+        if published is None:
+            return
+
+        index = published.copy(published.version)
+        for version, techniques in additions:
+            # Only up to date if our bump was the only change since the index was synced
+            if index.version is None or version != index.version + 1:
+                # Published as stale - the next get_catalog_dedupe_index() resyncs it from the catalog
+                index.version = None
+                break
+            for technique_id, name, style in techniques:
+                index.add(technique_id, name, style)
+            index.version = version
+
+        _catalog_index = index
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_rolled_back_additions(session):
+    session.info.pop('catalog_index_additions', None)
+
+
+def find_duplicates(rows, threshold=DEFAULT_THRESHOLD):
+    """
+    Near-duplicates for incoming technique rows (dicts with name and style), checked against
+    the catalog and against earlier rows of the same batch. Exact (name, style) matches aren't
+    reported - the import policy handles those.
+    Returns {row index: [candidate dicts]} for the rows that have any.
+    """
+    catalog = get_catalog_dedupe_index()
+    batch = DedupeIndex()
+    found = {}
+
+    for i, row in enumerate(rows):
+        name, style = row['name'], row['style']
+        signature = DedupeIndex.signature(name, style)
+        candidates = []
+
+        for score, technique_id in catalog.matches(name, style, threshold, signature=signature):
+            match_name, match_style = catalog.entries[technique_id][:2]
+            if (match_name, match_style) != (name, style):
+                candidates.append({'id': technique_id, 'name': match_name, 'style': match_style, 'similarity': score})
+
+        for score, j in batch.matches(name, style, threshold, signature=signature):
+            candidates.append({'id': None, 'name': rows[j]['name'], 'style': rows[j]['style'], 'similarity': score})
+
+        if candidates:
+            candidates.sort(key=lambda c: -c['similarity'])
+            found[i] = candidates
+        batch.add(i, name, style, signature)
+
+    return found
+
+
+def catalog_duplicate_pairs(threshold=DEFAULT_THRESHOLD, limit=None):
+    """Merge candidates within the catalog: pairs of similar techniques, most similar first"""
+    index = get_catalog_dedupe_index()
+    pairs = []
+
+    for technique_id, entry in list(index.entries.items()):
+        name, style = entry[:2]
+        signature = (entry[2], entry[3])
+        for score, other_id in index.matches(name, style, threshold, exclude=technique_id, signature=signature):
+            # Each pair is found from both sides - keep one
+            if other_id > technique_id:
+                other_name, other_style = index.entries[other_id][:2]
+                pairs.append({
+                    'similarity': score,
+                    'technique': {'id': technique_id, 'name': name, 'style': style},
+                    'duplicate': {'id': other_id, 'name': other_name, 'style': other_style}
+                })
+
+    pairs.sort(key=lambda pair: (-pair['similarity'], pair['technique']['id']))
+    return pairs[:limit] if limit else pairs
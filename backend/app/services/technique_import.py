@@ -0,0 +1,361 @@
+"""
+Technique Import
+Set-based bulk import used by the admin API and scripts/import_techniques.py.
+A batch is deduped in memory, existing (name, style) keys are prefetched in bulk,
+and rows are written with executemany instead of one query per technique.
+"""
+
+import codecs
+import csv
+from itertools import islice
+from flask import current_app
+from sqlalchemy import select, insert, update, bindparam, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.models import db
+from app.models.technique import Technique
+from app.services.technique_catalog import bump_catalog_version
+from app.services.technique_dedupe import DEDUPE_MODES, DEFAULT_THRESHOLD, find_duplicates, add_to_catalog_index
+from app.services.technique_search import sync_search_index
+
+# skip: leave existing techniques alone
+# update: overwrite existing techniques with the fields present in the record
+# replace: overwrite every field of existing techniques, resetting missing ones to defaults
+IMPORT_POLICIES = ('skip', 'update', 'replace')
+
+TECHNIQUE_FIELDS = ('description', 'difficulty', 'reference_video_url')
+
+# Formats accepted by the streaming import, keyed by the content types that select them
+STREAM_FORMATS = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/json': 'ndjson',
+    'text/csv': 'csv'
+}
+DEFAULT_STREAM_BATCH = 1000
+MAX_STREAM_BATCH = 10000
+STREAM_READ_SIZE = 64 * 1024
+
+# Keys per prefetch query - keeps well under SQLite's bound parameter limit
+PREFETCH_CHUNK = 900
+
+# False when the unique (name, style) index couldn't be created because of existing duplicates
+_unique_key_index = True
+
+
+def ensure_technique_key_index():
+    """Create the unique (name, style) index on databases created before it existed"""
+    global _unique_key_index
+    index = next(i for i in Technique.__table__.indexes if i.name == 'ix_techniques_name_style')
+
+    try:
+        index.create(db.engine, checkfirst=True)
+        _unique_key_index = True
+    except (IntegrityError, OperationalError) as e:
+        _unique_key_index = False
+        print(f"⚠️  Duplicate (name, style) techniques found, imports will not use upserts: {e}")
+
+
+def clean_technique_data(technique):
+    """Normalize one incoming record into column values. Raises ValueError if it can't be imported."""
+    if not isinstance(technique, dict):
+        raise ValueError('Technique must be an object')
+
+    name = technique.get('name')
+    if not name or not isinstance(name, str):
+        raise ValueError('Name is required')
+
+    return {
+        'name': name.strip()[:100],
+        'description': (technique.get('description') or '')[:1000],
+        'style': (technique.get('style') or 'General')[:50],
+        'difficulty': (technique.get('difficulty') or 'Intermediate')[:20],
+        'reference_video_url': technique.get('reference_video_url')
+    }
+
+
+class ImportResult:
+    """Counts and errors for one import batch"""
+    __slots__ = ('imported', 'updated', 'skipped', 'errors', 'changed_ids', 'duplicates')
+
+    def __init__(self):
+        self.imported = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors = []
+        self.changed_ids = []
+        # Near-duplicate candidates, when dedupe is enabled
+        self.duplicates = None
+
+    def merge(self, other):
+        self.imported += other.imported
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.errors.extend(other.errors)
+        self.changed_ids.extend(other.changed_ids)
+        if other.duplicates is not None:
+            self.duplicates = (self.duplicates or []) + other.duplicates
+        return self
+
+    def to_dict(self):
+        data = {
+            'imported': self.imported,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'errors': self.errors
+        }
+        if self.duplicates is not None:
+            data['duplicates'] = self.duplicates
+        return data
+
+
+def _prefetch_existing(keys):
+    """Map (name, style) -> id for the keys already in the catalog"""
+    existing = {}
+    names = sorted({name for name, _ in keys})
+
+    for start in range(0, len(names), PREFETCH_CHUNK):
+        rows = db.session.execute(
+            select(Technique.id, Technique.name, Technique.style)
+            .where(Technique.name.in_(names[start:start + PREFETCH_CHUNK]))
+        )
+        for technique_id, name, style in rows:
+            if (name, style) in keys:
+                existing.setdefault((name, style), technique_id)
+
+    return existing
+
+
+def _insert_new(rows):
+    """
+    Insert rows and return ((id, name, style) for the techniques that were created, the number created).
+    Without RETURNING the triples are looked up afterwards and may include keys another import
+    added meanwhile, so the count comes from the statement's rowcount.
+    """
+    table = Technique.__table__
+    dialect = db.session.get_bind().dialect
+
+    stmt = insert(table)
+    if _unique_key_index and dialect.name in ('sqlite', 'postgresql'):
+        # Another import may have added the same key since the prefetch
+        dialect_insert = sqlite.insert if dialect.name == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(table).on_conflict_do_nothing(index_elements=['name', 'style'])
+
+    if dialect.insert_executemany_returning:
+        inserted = [tuple(r) for r in db.session.execute(stmt.returning(table.c.id, table.c.name, table.c.style), rows)]
+        return inserted, len(inserted)
+
+    rowcount = db.session.execute(stmt, rows).rowcount
+    created = _prefetch_existing({(row['name'], row['style']) for row in rows})
+    inserted = [(technique_id, name, style) for (name, style), technique_id in created.items()]
+    # Some drivers can't count an executemany (-1)
+    return inserted, rowcount if rowcount >= 0 else len(inserted)
+
+
+def _update_existing(rows, policy):
+    """Overwrite existing techniques by id with one executemany UPDATE"""
+    table = Technique.__table__
+
+    if policy == 'replace':
+        values = {field: bindparam(f'new_{field}') for field in TECHNIQUE_FIELDS}
+    else:
+        # Missing fields come through as NULL and keep the stored value
+        values = {field: func.coalesce(bindparam(f'new_{field}'), table.c[field]) for field in TECHNIQUE_FIELDS}
+
+    stmt = update(table).where(table.c.id == bindparam('technique_id')).values(values)
+    params = [
+        {'technique_id': technique_id, **{f'new_{field}': row[field] for field in TECHNIQUE_FIELDS}}
+        for technique_id, row in rows
+    ]
+    db.session.execute(stmt, params, execution_options={'synchronize_session': False})
+
+
+def import_technique_batch(records, policy='skip', dedupe='off', threshold=DEFAULT_THRESHOLD):
+    """
+    Import a batch of technique records within the current transaction (the caller commits).
+    Keeps the search index and catalog version in step with whatever changed.
+    With dedupe, new techniques similar to existing ones (or to earlier records in the batch)
+    are reported in result.duplicates - and left out when dedupe is 'skip'.
+    """
+    if policy not in IMPORT_POLICIES:
+        raise ValueError(f'Invalid import policy. Allowed: {", ".join(IMPORT_POLICIES)}')
+    if dedupe not in DEDUPE_MODES:
+        raise ValueError(f'Invalid dedupe mode. Allowed: {", ".join(DEDUPE_MODES)}')
+
+    result = ImportResult()
+    batch = {}
+
+    for record in records:
+        try:
+            row = clean_technique_data(record)
+        except ValueError as e:
+            name = record.get('name') if isinstance(record, dict) else None
+            result.errors.append({'name': name or 'missing', 'error': str(e)})
+            continue
+
+        if policy == 'update':
+            # Only fields present in the record overwrite stored values
+            for field in TECHNIQUE_FIELDS:
+                if not record.get(field):
+                    row[field] = None
+
+        key = (row['name'], row['style'])
+        if key in batch and policy == 'skip':
+            # Duplicate within the batch - the first one wins when skipping, the last one otherwise
+            result.skipped += 1
+            continue
+        batch[key] = row
+
+    if not batch:
+        return result
+
+    existing = _prefetch_existing(set(batch))
+
+    new_rows = [row for key, row in batch.items() if key not in existing]
+
+    if dedupe != 'off':
+        # Only new techniques - exact matches are handled by the policy
+        duplicates = find_duplicates(new_rows, threshold)
+        result.duplicates = [
+            {'name': new_rows[i]['name'], 'style': new_rows[i]['style'], 'candidates': candidates}
+            for i, candidates in duplicates.items()
+        ]
+        if dedupe == 'skip' and duplicates:
+            new_rows = [row for i, row in enumerate(new_rows) if i not in duplicates]
+            result.skipped += len(duplicates)
+    if policy == 'update':
+        defaults = clean_technique_data({'name': '-'})
+        for row in new_rows:
+            for field in TECHNIQUE_FIELDS:
+                if row[field] is None:
+                    row[field] = defaults[field]
+
+    inserted = []
+    if new_rows:
+        inserted, created = _insert_new(new_rows)
+        result.imported = created
+        result.skipped += len(new_rows) - created
+        result.changed_ids.extend(technique_id for technique_id, _, _ in inserted)
+
+    if existing:
+        if policy == 'skip':
+            result.skipped += len(existing)
+        else:
+            _update_existing([(technique_id, batch[key]) for key, technique_id in existing.items()], policy)
+            result.updated = len(existing)
+            result.changed_ids.extend(existing.values())
+
+    if result.changed_ids:
+        sync_search_index(result.changed_ids)
+        version = bump_catalog_version()
+        if dedupe != 'off' and inserted:
+            add_to_catalog_index(inserted, version)
+
+    return result
+
+
+# ==================== STREAMING ====================
+
+def _text_lines(stream):
+    """
+    Decode a binary stream into '\n'-terminated lines without reading it all.
+    Only '\n' ends a line - str.splitlines() would also break on U+2028 and the like, which
+    are legal inside JSON strings - and a '\r' before it is dropped.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    pending = ''
+
+    while True:
+        chunk = stream.read(STREAM_READ_SIZE)
+        text = decoder.decode(chunk or b'', final=not chunk)
+        if text:
+            lines = (pending + text).split('\n')
+            # The last piece is the start of a line that continues in the next chunk
+            pending = lines.pop()
+            for line in lines:
+                yield (line[:-1] if line.endswith('\r') else line) + '\n'
+        if not chunk:
+            break
+
+    if pending:
+        yield pending[:-1] if pending.endswith('\r') else pending
+
+
+def iter_stream_records(stream, fmt):
+    """
+    Parse an NDJSON or CSV stream one record at a time.
+    Yields (line_number, record, error) - record is None when the line couldn't be parsed.
+    """
+    lines = _text_lines(stream)
+
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        try:
+            for row in reader:
+                # Empty cells count as missing fields
+                yield reader.line_num, {k: v for k, v in row.items() if k and v not in ('', None)}, None
+        except csv.Error as e:
+            yield reader.line_num, None, f'Invalid CSV: {e}'
+        return
+
+    loads = current_app.json.loads
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, loads(line), None
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+
+
+def stream_import(stream, fmt='ndjson', policy='skip', batch_size=DEFAULT_STREAM_BATCH, dedupe='off'):
+    """
+    Import techniques from an NDJSON/CSV stream, committing every batch_size records.
+    Yields a progress dict per batch and a final summary; only one batch is held in memory.
+    A failed batch is rolled back and ends the import - earlier batches stay committed.
+    """
+    if policy not in IMPORT_POLICIES:
+        raise ValueError(f'Invalid import policy. Allowed: {", ".join(IMPORT_POLICIES)}')
+
+    records = iter_stream_records(stream, fmt)
+    totals = {'imported': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+    processed = 0
+    batch_number = 0
+
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            break
+
+        batch_number += 1
+        parse_errors = [{'line': line, 'error': error} for line, _, error in chunk if error]
+        batch = [record for _, record, error in chunk if not error]
+
+        try:
+            result = import_technique_batch(batch, policy=policy, dedupe=dedupe)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            yield {
+                'batch': batch_number,
+                'status': 'failed',
+                'error': f'Batch failed: {str(e)}',
+                'processed': processed,
+                **totals
+            }
+            return
+
+        result.errors = parse_errors + result.errors
+        processed += len(chunk)
+        for key in ('imported', 'updated', 'skipped'):
+            totals[key] += getattr(result, key)
+        totals['errors'] += len(result.errors)
+
+        yield {
+            'batch': batch_number,
+            'status': 'committed',
+            'processed': processed,
+            **result.to_dict()
+        }
+
+    yield {'status': 'done', 'batches': batch_number, 'processed': processed, **totals}
@@ -0,0 +1,286 @@
+"""
+Technique Progress
+Set-based progress updates - marking a whole class worth of techniques is one locking read,
+one executemany UPDATE and one commit instead of a request per technique.
+Every practice is also appended to the practice log (app.services.practice_log).
+Counters are always incremented in SQL (x = x + :n) so practices posted from two devices
+at once both count, and tracking starts with INSERT ... ON CONFLICT DO NOTHING.
+"""
+
+from datetime import datetime
+from sqlalchemy import select, update, bindparam, case, func, Boolean, DateTime, String
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models import db
+from app.models.user_technique_progress import UserTechniqueProgress
+from app.services.user_stats import bump_user_stats, progress_stats_deltas
+from app.services.practice_log import record_practice_events
+from app.services.practice_queue import reschedule
+from app.services.sync import record_changes
+
+PROFICIENCY_STATUSES = ('learning', 'practicing', 'mastered')
+MAX_BATCH_ITEMS = 200
+
+
+class ProgressBatchError(ValueError):
+    """The request isn't a usable list of updates"""
+
+
+def _parse_item(item):
+    """Validate one update into (technique_id, practiced, duration, status). Raises ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError('Update must be an object')
+
+    technique_id = item.get('technique_id')
+    if not isinstance(technique_id, int) or isinstance(technique_id, bool):
+        raise ValueError('technique_id must be an integer')
+
+    status = item.get('status', item.get('proficiency_status'))
+    if status is not None and status not in PROFICIENCY_STATUSES:
+        raise ValueError(f'status must be one of: {", ".join(PROFICIENCY_STATUSES)}')
+
+    practiced = bool(item.get('mark_practiced'))
+    try:
+        duration = int(item.get('practice_duration') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('practice_duration must be a number of minutes')
+    if duration < 0:
+        raise ValueError('practice_duration cannot be negative')
+
+    if not practiced and status is None:
+        raise ValueError('Nothing to update - set mark_practiced or status')
+
+    # As with the single-technique update, practice time only counts when practice is marked
+    return technique_id, practiced, duration if practiced else 0, status
+
+
+def _batch_update_statement():
+    table = UserTechniqueProgress.__table__
+    return (
+        update(table)
+        .where(table.c.id == bindparam('progress_id'))
+        .values(
+            proficiency_status=func.coalesce(bindparam('new_status', type_=String), table.c.proficiency_status),
+            practice_count=func.coalesce(table.c.practice_count, 0) + bindparam('practice_increment'),
+            total_practice_time=func.coalesce(table.c.total_practice_time, 0) + bindparam('practice_minutes'),
+            last_practiced=func.coalesce(bindparam('practiced_at', type_=DateTime), table.c.last_practiced),
+            mastered_at=case(
+                (bindparam('set_mastered_at', type_=Boolean), bindparam('new_mastered_at', type_=DateTime)),
+                else_=table.c.mastered_at
+            ),
+            updated_at=bindparam('updated_at', type_=DateTime)
+        )
+    )
+
+
+def start_tracking(user_id, technique_id):
+    """
+    Start tracking a technique for the user unless they already do, within the current
+    transaction. Returns (progress, created). Safe against two requests racing to start the
+    same technique: the loser gets the winner's row instead of a unique constraint error.
+    """
+    now = datetime.utcnow()
+    values = {
+        'user_id': user_id,
+        'technique_id': technique_id,
+        'proficiency_status': 'learning',
+        'first_practiced': now,
+        # Due for its first practice right away
+        'next_due_at': now
+    }
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = (
+            dialect_insert(UserTechniqueProgress)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=['user_id', 'technique_id'])
+            .returning(UserTechniqueProgress)
+        )
+        progress = db.session.scalars(stmt).first()
+        if progress is not None:
+            # Core-level INSERTs skip the rollup's and change log's mapper events
+            connection = db.session.connection()
+            bump_user_stats(connection, user_id, None, **progress_stats_deltas(None, values))
+            record_changes(db.session, user_id, 'progress', [progress.id])
+            return progress, True
+    else:
+        # Generic fallback: insert in a savepoint and fall back to the existing row on conflict
+        try:
+            with db.session.begin_nested():
+                progress = UserTechniqueProgress(**values)
+                db.session.add(progress)
+            return progress, True
+        except IntegrityError:
+            pass
+
+    progress = UserTechniqueProgress.query.filter_by(user_id=user_id, technique_id=technique_id).one()
+    return progress, False
+
+
+def record_practice(progress, minutes=0):
+    """
+    Count one practice of `minutes` on a loaded progress row, within the current transaction.
+    The counters are incremented by a single UPDATE ... SET x = x + :n rather than read, bumped
+    and written back, so concurrent practices are never lost. The row's counters are refreshed
+    from the database afterwards. Also schedules the next practice.
+    """
+    table = UserTechniqueProgress.__table__
+    counters = ('practice_count', 'total_practice_time', 'last_practiced', 'updated_at')
+    now = datetime.utcnow()
+
+    # Write any pending field changes first - their UPDATE leaves the counters alone
+    db.session.flush()
+
+    stmt = (
+        update(table)
+        .where(table.c.id == progress.id)
+        .values(
+            practice_count=func.coalesce(table.c.practice_count, 0) + 1,
+            total_practice_time=func.coalesce(table.c.total_practice_time, 0) + minutes,
+            last_practiced=now,
+            updated_at=now
+        )
+    )
+    connection = db.session.connection()
+
+    if connection.dialect.update_returning:
+        row = db.session.execute(stmt.returning(*(table.c[name] for name in counters))).one()
+        for name, value in zip(counters, row):
+            set_committed_value(progress, name, value)
+    else:
+        db.session.execute(stmt)
+        db.session.expire(progress, counters)
+
+    # From the count this UPDATE committed to, not the one loaded before it
+    set_committed_value(progress, 'next_due_at', reschedule(connection, [progress.id])[progress.id])
+
+    bump_user_stats(connection, progress.user_id, None, practice_count=1, practice_time=minutes)
+    record_practice_events(connection, progress.user_id, [(progress.technique_id, now, minutes)])
+    record_changes(db.session, progress.user_id, 'progress', [progress.id])
+    return progress
+
+
+def reschedule_progress(progress):
+    """Recompute a loaded progress row's next_due_at after changing its status, within the current transaction"""
+    db.session.flush()
+    due = reschedule(db.session.connection(), [progress.id])
+    set_committed_value(progress, 'next_due_at', due[progress.id])
+    return progress
+
+
+def apply_progress_batch(user_id, items):
+    """
+    Apply a list of {technique_id, mark_practiced, practice_duration, status} updates to the
+    user's progress within the current transaction (the caller commits). Updates for the same
+    technique are combined. Returns one compact result per item, in order.
+    """
+    if not isinstance(items, list) or not items:
+        raise ProgressBatchError('updates must be a non-empty list')
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ProgressBatchError(f'At most {MAX_BATCH_ITEMS} updates per request')
+
+    results = [None] * len(items)
+    changes = {}
+
+    for i, item in enumerate(items):
+        try:
+            technique_id, practiced, duration, status = _parse_item(item)
+        except ValueError as e:
+            technique_id = item.get('technique_id') if isinstance(item, dict) else None
+            results[i] = {'technique_id': technique_id, 'result': 'invalid', 'error': str(e)}
+            continue
+
+        change = changes.setdefault(
+            technique_id, {'practiced': 0, 'minutes': 0, 'status': None, 'items': [], 'events': []}
+        )
+        change['practiced'] += practiced
+        change['minutes'] += duration
+        if practiced:
+            change['events'].append(duration)
+        if status is not None:
+            change['status'] = status
+        change['items'].append(i)
+
+    if not changes:
+        return results
+
+    table = UserTechniqueProgress.__table__
+    now = datetime.utcnow()
+    columns = (
+        table.c.id, table.c.technique_id, table.c.proficiency_status, table.c.is_favorite,
+        table.c.practice_count, table.c.total_practice_time, table.c.last_practiced
+    )
+    tracked = (table.c.user_id == user_id, table.c.technique_id.in_(list(changes)))
+
+    # The old values feed the stats deltas and the returned counters, so they're read under a
+    # lock that holds until commit. SQLite ignores FOR UPDATE - there, touching the rows takes
+    # the database write lock and reads them in the same statement (each is updated below anyway).
+    if db.session.get_bind().dialect.name == 'sqlite':
+        stmt = update(table).where(*tracked).values(updated_at=now).returning(*columns)
+    else:
+        stmt = select(*columns).where(*tracked).order_by(table.c.id).with_for_update()
+    current = {row['technique_id']: dict(row) for row in db.session.execute(stmt).mappings()}
+
+    params = []
+    stats_deltas = {}
+    events = []
+
+    for technique_id, change in changes.items():
+        old = current.get(technique_id)
+        if old is None:
+            for i in change['items']:
+                results[i] = {'technique_id': technique_id, 'result': 'not_tracked'}
+            continue
+
+        old_status = old['proficiency_status'] or 'learning'
+        new_status = change['status'] or old_status
+
+        # Same mastered_at rules as the single-technique update
+        set_mastered_at = change['status'] is not None and (new_status != 'mastered' or old_status != 'mastered')
+        new_mastered_at = now if new_status == 'mastered' else None
+
+        new = {
+            **old,
+            'proficiency_status': new_status,
+            'practice_count': (old['practice_count'] or 0) + change['practiced'],
+            'total_practice_time': (old['total_practice_time'] or 0) + change['minutes']
+        }
+
+        params.append({
+            'progress_id': old['id'],
+            'new_status': change['status'],
+            'practice_increment': change['practiced'],
+            'practice_minutes': change['minutes'],
+            'practiced_at': now if change['practiced'] else None,
+            'set_mastered_at': set_mastered_at,
+            'new_mastered_at': new_mastered_at,
+            'updated_at': now
+        })
+
+        for name, amount in progress_stats_deltas(old, new).items():
+            stats_deltas[name] = stats_deltas.get(name, 0) + amount
+        events.extend((technique_id, now, duration) for duration in change['events'])
+
+        result = {
+            'technique_id': technique_id,
+            'result': 'updated',
+            'proficiency_status': new_status,
+            'practice_count': new['practice_count'],
+            'total_practice_time': new['total_practice_time']
+        }
+        for i in change['items']:
+            results[i] = result
+
+    if params:
+        db.session.execute(_batch_update_statement(), params)
+        connection = db.session.connection()
+        reschedule(connection, [param['progress_id'] for param in params])
+        # Core UPDATEs skip the rollup's and change log's mapper events, so apply them here
+        bump_user_stats(connection, user_id, None, **stats_deltas)
+        record_practice_events(connection, user_id, events)
+        record_changes(db.session, user_id, 'progress', [param['progress_id'] for param in params])
+
+    return results
@@ -0,0 +1,211 @@
+"""
+Technique Recommendations
+"What to learn next" from techniques other users track together.
+
+Offline (scripts/build_recommendations.py): progress rows are streamed in user order and
+each user's tracked techniques add to a sparse pair-count table - only pairs that actually
+co-occur are stored, never a dense technique x technique matrix. Pair counts become cosine
+similarities, and the top-k neighbors of every technique are written to technique_neighbors.
+
+Online: the neighbor table is loaded into memory once per build and a user's recommendations
+are the neighbors of what they track, weighted by how far along they are, minus what they
+already track.
+"""
+
+import heapq
+import math
+import time
+from datetime import datetime
+from threading import Lock
+from sqlalchemy import select, insert, delete, func
+from app.models import db
+from app.models.technique_neighbor import TechniqueNeighbor, POPULAR_TECHNIQUES
+from app.models.user_technique_progress import UserTechniqueProgress
+from app.services.read_models import TECHNIQUE_LIST
+
+DEFAULT_TOP_K = 20
+# Pairs tracked together by fewer users than this are noise
+DEFAULT_MIN_SUPPORT = 2
+STREAM_BATCH = 10000
+
+# How much a tracked technique's neighbors count towards recommendations
+STATUS_WEIGHTS = {'mastered': 1.0, 'practicing': 0.75, 'learning': 0.5}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# How long a process trusts its loaded neighbor table before checking for a newer build
+BUILD_CHECK_SECONDS = 60.0
+
+_neighbors = {'built_at': None, 'checked_at': 0.0, 'table': {}}
+_neighbors_lock = Lock()
+
+
+# ==================== OFFLINE BUILD ====================
+
+def _user_weight(tracked):
+    """Users who track everything say little about any one pair - damp their votes"""
+    return 1.0 / math.log2(2 + tracked)
+
+
+def _iter_baskets():
+    """(user_id, [technique ids]) per user, streamed in user order"""
+    table = UserTechniqueProgress.__table__
+    rows = db.session.execute(
+        select(table.c.user_id, table.c.technique_id)
+        .order_by(table.c.user_id)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+    user_id, basket = None, []
+    for row_user, technique_id in rows:
+        if row_user != user_id:
+            if basket:
+                yield user_id, basket
+            user_id, basket = row_user, []
+        basket.append(technique_id)
+    if basket:
+        yield user_id, basket
+
+
+def compute_neighbors(baskets, top_k=DEFAULT_TOP_K, min_support=DEFAULT_MIN_SUPPORT):
+    """
+    Top-k neighbors per technique from an iterable of per-user technique lists.
+    Returns ({technique_id: [(score, neighbor_id, co_count)]} best first, {technique_id: users tracking it}).
+    """
+    norms = {}          # technique -> sum of user weights
+    counts = {}         # technique -> users tracking it
+    pair_weights = {}   # (low id, high id) -> sum of weights of users tracking both
+    pair_counts = {}    # (low id, high id) -> users tracking both
+
+    for _, basket in baskets:
+        basket = sorted(set(basket))
+        weight = _user_weight(len(basket))
+        for technique_id in basket:
+            norms[technique_id] = norms.get(technique_id, 0.0) + weight
+            counts[technique_id] = counts.get(technique_id, 0) + 1
+
+        for i, low in enumerate(basket):
+            for high in basket[i + 1:]:
+                key = (low, high)
+                pair_weights[key] = pair_weights.get(key, 0.0) + weight
+                pair_counts[key] = pair_counts.get(key, 0) + 1
+
+    candidates = {}
+    for key, co_count in pair_counts.items():
+        if co_count < min_support:
+            continue
+        low, high = key
+        score = pair_weights[key] / math.sqrt(norms[low] * norms[high])
+        candidates.setdefault(low, []).append((score, high, co_count))
+        candidates.setdefault(high, []).append((score, low, co_count))
+
+    neighbors = {
+        technique_id: heapq.nlargest(top_k, scored)
+        for technique_id, scored in candidates.items()
+    }
+    return neighbors, counts
+
+
+def build_technique_neighbors(top_k=DEFAULT_TOP_K, min_support=DEFAULT_MIN_SUPPORT):
+    """Recompute technique_neighbors from every user's progress. Returns (techniques with neighbors, rows written)."""
+    neighbors, counts = compute_neighbors(_iter_baskets(), top_k, min_support)
+    now = datetime.utcnow()
+
+    rows = [
+        {'technique_id': technique_id, 'neighbor_id': neighbor_id, 'score': score,
+         'co_count': co_count, 'built_at': now}
+        for technique_id, scored in neighbors.items()
+        for score, neighbor_id, co_count in scored
+    ]
+    # Most tracked techniques, for users with nothing (useful) tracked yet
+    total = max(counts.values(), default=1)
+    rows.extend(
+        {'technique_id': POPULAR_TECHNIQUES, 'neighbor_id': technique_id, 'score': count / total,
+         'co_count': count, 'built_at': now}
+        for technique_id, count in heapq.nlargest(top_k * 5, counts.items(), key=lambda item: item[1])
+    )
+
+    table = TechniqueNeighbor.__table__
+    db.session.execute(delete(table))
+    if rows:
+        db.session.execute(insert(table), rows)
+    db.session.commit()
+
+    return len(neighbors), len(rows)
+
+
+# ==================== SERVING ====================
+
+def _load_neighbor_table():
+    """{technique_id: [(neighbor_id, score)]} best first, as of the latest build"""
+    now = time.monotonic()
+    if _neighbors['built_at'] is not None and now - _neighbors['checked_at'] < BUILD_CHECK_SECONDS:
+        return _neighbors['table']
+
+    with _neighbors_lock:
+        if _neighbors['built_at'] is not None and now - _neighbors['checked_at'] < BUILD_CHECK_SECONDS:
+            return _neighbors['table']
+
+        built_at = db.session.execute(select(func.max(TechniqueNeighbor.built_at))).scalar()
+        if built_at != _neighbors['built_at']:
+            table = {}
+            rows = db.session.execute(
+                select(TechniqueNeighbor.technique_id, TechniqueNeighbor.neighbor_id, TechniqueNeighbor.score)
+                .order_by(TechniqueNeighbor.technique_id, TechniqueNeighbor.score.desc())
+            )
+            for technique_id, neighbor_id, score in rows:
+                table.setdefault(technique_id, []).append((neighbor_id, score))
+            _neighbors['table'] = table
+
+        _neighbors.update(built_at=built_at or datetime.min, checked_at=now)
+        return _neighbors['table']
+
+
+def recommend_techniques(user_id, limit=DEFAULT_LIMIT):
+    """
+    Techniques the user doesn't track yet, best first, each with the tracked technique that
+    contributed most to it. Falls back to the most tracked techniques.
+    """
+    table = _load_neighbor_table()
+    tracked = dict(db.session.execute(
+        select(UserTechniqueProgress.technique_id, UserTechniqueProgress.proficiency_status)
+        .where(UserTechniqueProgress.user_id == user_id)
+    ).all())
+
+    scores = {}
+    because = {}
+    for technique_id, status in tracked.items():
+        weight = STATUS_WEIGHTS.get(status or 'learning', STATUS_WEIGHTS['learning'])
+        for neighbor_id, similarity in table.get(technique_id, ()):
+            if neighbor_id in tracked:
+                continue
+            contribution = weight * similarity
+            scores[neighbor_id] = scores.get(neighbor_id, 0.0) + contribution
+            if contribution > because.get(neighbor_id, (0.0, None))[0]:
+                because[neighbor_id] = (contribution, technique_id)
+
+    source = 'similar'
+    best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    if not best:
+        source = 'popular'
+        best = [(neighbor_id, score) for neighbor_id, score in table.get(POPULAR_TECHNIQUES, ())
+                if neighbor_id not in tracked][:limit]
+
+    ids = [technique_id for technique_id, _ in best]
+    rows = db.session.execute(TECHNIQUE_LIST.select().where(TECHNIQUE_LIST.model.id.in_(ids))).all() if ids else []
+    techniques = {technique['id']: technique for technique in TECHNIQUE_LIST.to_dicts(rows)}
+
+    recommendations = []
+    for technique_id, score in best:
+        technique = techniques.get(technique_id)
+        if technique is None:
+            # Deleted since the last build
+            continue
+        recommendations.append({
+            'technique': technique,
+            'score': round(score, 4),
+            'because_of': because[technique_id][1] if source == 'similar' else None
+        })
+
+    return {'source': source, 'recommendations': recommendations}
@@ -0,0 +1,210 @@
+"""
+Technique Search
+Server-side full-text search over technique name, description and style.
+SQLite uses an FTS5 table ranked with BM25; PostgreSQL uses a GIN-indexed tsvector
+ranked with ts_rank_cd. Other engines fall back to LIKE matching.
+"""
+
+import html
+import re
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.models import db
+
+FTS_TABLE = 'techniques_fts'
+
+# Column weights for bm25(): name, description, style
+BM25_WEIGHTS = (10.0, 1.0, 3.0)
+
+SNIPPET_OPEN = '<mark>'
+SNIPPET_CLOSE = '</mark>'
+
+# The database marks matches with these private-use characters; the text around them is
+# escaped before they become SNIPPET_OPEN/SNIPPET_CLOSE, so descriptions can't inject markup
+_SENTINEL_OPEN = '\ue000'
+_SENTINEL_CLOSE = '\ue001'
+
+# Must match the indexed expression exactly for PostgreSQL to use the GIN index
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(style, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Set when SQLite was built without FTS5
+_fts5_unavailable = False
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def _use_fts5():
+    return _dialect() == 'sqlite' and not _fts5_unavailable
+
+
+def render_snippet(snippet):
+    """HTML for a snippet highlighted with the sentinels - escaped, with <mark> around matches"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_SENTINEL_OPEN, SNIPPET_OPEN).replace(_SENTINEL_CLOSE, SNIPPET_CLOSE)
+
+
+def query_tokens(query):
+    """Split user input into search tokens, dropping FTS syntax characters"""
+    return _TOKEN_RE.findall(query.lower())
+
+
+# ==================== INDEX MAINTENANCE ====================
+
+def ensure_search_index():
+    """Create the search index if needed and fill it when it is empty but the catalog isn't"""
+    global _fts5_unavailable
+    dialect = _dialect()
+
+    if dialect == 'postgresql':
+        db.session.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_techniques_search ON techniques USING GIN (({PG_DOCUMENT}))"
+        ))
+        db.session.commit()
+        return
+
+    if dialect != 'sqlite':
+        return
+
+    try:
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, description, style, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+    except OperationalError as e:
+        db.session.rollback()
+        _fts5_unavailable = True
+        print(f"⚠️  FTS5 not available, technique search will use LIKE matching: {e}")
+        return
+
+    index_empty = db.session.execute(text(f"SELECT 1 FROM {FTS_TABLE} LIMIT 1")).first() is None
+    catalog_empty = db.session.execute(text("SELECT 1 FROM techniques LIMIT 1")).first() is None
+    if index_empty and not catalog_empty:
+        rebuild_search_index()
+        print("✅ Technique search index built")
+
+    db.session.commit()
+
+
+def sync_search_index(technique_ids):
+    """
+    Re-index the given techniques from the techniques table. Ids that no longer exist
+    are dropped from the index. Call inside the transaction that changed them.
+    """
+    if not _use_fts5() or not technique_ids:
+        return
+
+    ids = sorted(set(technique_ids))
+    # Stay under SQLite's bound parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        params = {f'id{i}': technique_id for i, technique_id in enumerate(chunk)}
+        placeholders = ', '.join(f':{name}' for name in params)
+
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})"), params)
+        db.session.execute(text(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, style) "
+            f"SELECT id, name, description, style FROM techniques WHERE id IN ({placeholders})"
+        ), params)
+
+
+def clear_search_index():
+    """Empty the index - for when the whole catalog is deleted"""
+    if _use_fts5():
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+
+
+def rebuild_search_index():
+    """Re-index the whole catalog"""
+    if not _use_fts5():
+        return
+
+    clear_search_index()
+    db.session.execute(text(
+        f"INSERT INTO {FTS_TABLE} (rowid, name, description, style) "
+        "SELECT id, name, description, style FROM techniques"
+    ))
+
+
+# ==================== SEARCH ====================
+
+def search_techniques(query, limit=20, style=None, difficulty=None):
+    """
+    Search the catalog, best matches first. Every token must match as a prefix,
+    so results update while the user is still typing.
+    Returns dicts with id, name, style, difficulty, snippet and rank (lower ranks first).
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+
+    params = {'limit': limit}
+    filters = ''
+    if style:
+        filters += ' AND t.style = :style'
+        params['style'] = style
+    if difficulty:
+        filters += ' AND t.difficulty = :difficulty'
+        params['difficulty'] = difficulty
+
+    dialect = _dialect()
+
+    if _use_fts5():
+        params['match'] = ' '.join(f'"{token}"*' for token in tokens)
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        sql = (
+            f"SELECT t.id, t.name, t.style, t.difficulty, "
+            f"snippet({FTS_TABLE}, -1, :open, :close, '…', 12) AS snippet, "
+            f"bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} JOIN techniques t ON t.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match{filters} "
+            f"ORDER BY rank LIMIT :limit"
+        )
+        params.update(open=_SENTINEL_OPEN, close=_SENTINEL_CLOSE)
+
+    elif dialect == 'postgresql':
+        params['tsquery'] = ' & '.join(f'{token}:*' for token in tokens)
+        params['headline_options'] = f'StartSel={_SENTINEL_OPEN}, StopSel={_SENTINEL_CLOSE}, MaxWords=20, MinWords=6'
+        sql = (
+            f"SELECT t.id, t.name, t.style, t.difficulty, "
+            f"ts_headline('simple', coalesce(t.description, ''), q, :headline_options) AS snippet, "
+            f"-ts_rank_cd({PG_DOCUMENT}, q) AS rank "
+            f"FROM techniques t, to_tsquery('simple', :tsquery) q "
+            f"WHERE ({PG_DOCUMENT}) @@ q{filters} "
+            f"ORDER BY rank LIMIT :limit"
+        )
+
+    else:
+        conditions = []
+        for i, token in enumerate(tokens):
+            params[f'like{i}'] = f'%{token}%'
+            conditions.append(
+                f"(lower(t.name) LIKE :like{i} OR lower(t.description) LIKE :like{i} OR lower(t.style) LIKE :like{i})"
+            )
+        sql = (
+            f"SELECT t.id, t.name, t.style, t.difficulty, substr(t.description, 1, 120) AS snippet, 0 AS rank "
+            f"FROM techniques t WHERE {' AND '.join(conditions)}{filters} "
+            f"ORDER BY t.name LIMIT :limit"
+        )
+
+    rows = db.session.execute(text(sql), params).all()
+    return [
+        {
+            'id': row.id,
+            'name': row.name,
+            'style': row.style,
+            'difficulty': row.difficulty,
+            'snippet': render_snippet(row.snippet),
+            'rank': row.rank
+        }
+        for row in rows
+    ]
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Technique Typeahead
+In-process prefix index over technique names and their parenthesized aliases,
+e.g. "Roundhouse Kick (Mawashi Geri)" is found by "round", "kick", "mawa" or "mawashigeri".
+Matching ignores case, diacritics, hyphens and punctuation. Lookups never touch the database.
+When the catalog version changes the whole catalog's id/name/style/difficulty rows are reloaded
+(one narrow query) and diffed against the index; only the changed techniques' keys are re-derived
+and merged into the sorted arrays. Requests keep using the previous index while that runs.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from threading import Lock
+from sqlalchemy import select
+from app.models import db
+from app.models.technique import Technique
+from app.services.technique_catalog import get_catalog_version
+
+_ALIAS_RE = re.compile(r'\(([^)]*)\)')
+_SEPARATOR_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+# Above this many changed techniques a full rebuild is cheaper than patching the arrays
+INCREMENTAL_LIMIT = 200
+
+
+def normalize(text):
+    """Lowercase, strip diacritics and turn hyphens/punctuation into single spaces"""
+    text = text or ''
+    if not text.isascii():
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(_SEPARATOR_RE.sub(' ', text.lower()).split())
+
+
+def name_aliases(name):
+    """Split "Front Kick (Mae Geri)" into its names: ['front kick', 'mae geri']"""
+    aliases = [_ALIAS_RE.sub(' ', name or '')] + _ALIAS_RE.findall(name or '')
+    return [alias for alias in (normalize(a) for a in aliases) if alias]
+
+
+def index_keys(name):
+    """
+    Keys to index a technique under. Whole aliases (and their space-free forms) are primary;
+    aliases starting at a later word are secondary so "geri" still finds "Mae Geri".
+    """
+    primary, secondary = set(), set()
+    for alias in name_aliases(name):
+        words = alias.split()
+        primary.add(alias)
+        primary.add(''.join(words))
+        for i in range(1, len(words)):
+            secondary.add(' '.join(words[i:]))
+    return primary, secondary - primary
+
+
+class _PrefixArray:
+    """Sorted (key, technique_id) pairs searched by bisection - immutable once built"""
+    __slots__ = ('keys', 'ids')
+
+    def __init__(self, pairs, presorted=False):
+        pairs = list(pairs) if presorted else sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ids = [technique_id for _, technique_id in pairs]
+
+    def pairs(self):
+        return zip(self.keys, self.ids)
+
+    def scan(self, prefix):
+        keys, ids = self.keys, self.ids
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield ids[i]
+            i += 1
+
+
+class TypeaheadIndex:
+    """Snapshot of the catalog's names for one catalog version"""
+
+    def __init__(self, version, techniques, primary, secondary):
+        self.version = version
+        self.techniques = techniques  # id -> (name, style, difficulty)
+        self.primary = primary
+        self.secondary = secondary
+
+    @classmethod
+    def build(cls, version, techniques):
+        primary, secondary = [], []
+        for technique_id, (name, _, _) in techniques.items():
+            first, rest = index_keys(name)
+            primary.extend((key, technique_id) for key in first)
+            secondary.extend((key, technique_id) for key in rest)
+        return cls(version, techniques, _PrefixArray(primary), _PrefixArray(secondary))
+
+    def patched(self, version, techniques, changed_ids):
+        """
+        New index with only the changed techniques' keys removed and re-added.
+        The kept pairs are already sorted, so the new ones are merged in rather than re-sorted.
+        """
+        added_primary, added_secondary = [], []
+        for technique_id in changed_ids:
+            if technique_id in techniques:
+                first, rest = index_keys(techniques[technique_id][0])
+                added_primary.extend((key, technique_id) for key in first)
+                added_secondary.extend((key, technique_id) for key in rest)
+
+        def merge(array, added):
+            kept = ((k, i) for k, i in array.pairs() if i not in changed_ids)
+            return _PrefixArray(heapq.merge(kept, sorted(added)), presorted=True)
+
+        return TypeaheadIndex(
+            version, techniques, merge(self.primary, added_primary), merge(self.secondary, added_secondary)
+        )
+
+    def lookup(self, query, limit=10):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        prefixes = [prefix]
+        compact = prefix.replace(' ', '')
+        if compact != prefix:
+            prefixes.append(compact)
+
+        found = []
+        seen = set()
+        for array in (self.primary, self.secondary):
+            for p in prefixes:
+                for technique_id in array.scan(p):
+                    if technique_id in seen:
+                        continue
+                    seen.add(technique_id)
+                    found.append(technique_id)
+                    if len(found) >= limit:
+                        return self._results(found)
+        return self._results(found)
+
+    def _results(self, ids):
+        results = []
+        for technique_id in ids:
+            name, style, difficulty = self.techniques[technique_id]
+            results.append({'id': technique_id, 'name': name, 'style': style, 'difficulty': difficulty})
+        return results
+
+
+_index = None
+_index_lock = Lock()
+
+
+def _load_techniques():
+    rows = db.session.execute(
+        select(Technique.id, Technique.name, Technique.style, Technique.difficulty)
+    ).all()
+    return {row.id: (row.name, row.style, row.difficulty) for row in rows}
+
+
+def get_typeahead_index():
+    """
+    The index for the current catalog version, refreshing it if the catalog changed.
+    The refresh reloads the whole catalog's names to find what changed; while one request
+    runs it, others get the previous version's index instead of waiting.
+    """
+    global _index
+    version = get_catalog_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    # Only the very first build has nothing to fall back to
+    if not _index_lock.acquire(blocking=index is None):
+        return index
+
+    try:
+        index = _index
+        if index is not None and index.version == version:
+            return index
+
+        techniques = _load_techniques()
+
+        if index is None:
+            _index = TypeaheadIndex.build(version, techniques)
+        else:
+            changed = {i for i in techniques.keys() | index.techniques.keys()
+                       if techniques.get(i) != index.techniques.get(i)}
+            if len(changed) > INCREMENTAL_LIMIT:
+                _index = TypeaheadIndex.build(version, techniques)
+            else:
+                _index = index.patched(version, techniques, changed)
+
+        return _index
+    finally:
+        _index_lock.release()
+
+
+def autocomplete(query, limit=10):
+    """Techniques whose name or alias starts with (a word of) the query, whole-name matches first"""
+    return get_typeahead_index().lookup(query, limit)
\ No newline at end of file
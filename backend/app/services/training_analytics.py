@@ -0,0 +1,182 @@
+"""
+Training Analytics
+Calendar heatmap, streaks and weekly minutes per style from a user's training sessions.
+The database bins the sessions by day and style in a single GROUP BY over a covering index,
+so only one small row per training day comes back; streaks and weekly volume are one pass
+over those bins. The bins are cached per user and dropped when one of their sessions is
+written, so repeat views don't touch the sessions table at all.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+from app.models import db
+from app.models.training_session import TrainingSession
+from app.services.user_stats import style_key
+
+DEFAULT_HEATMAP_DAYS = 365
+MAX_HEATMAP_DAYS = 366 * 5
+DEFAULT_VOLUME_WEEKS = 12
+MAX_VOLUME_WEEKS = 260
+
+MAX_CACHED_USERS = 1024
+# Writes made by other processes are only seen once an entry is this old
+CACHE_TTL_SECONDS = 300
+
+_cache = OrderedDict()      # user_id -> (cached_at, generation, bins)
+_generations = {}           # user_id -> bumped on every invalidation
+_cache_lock = Lock()
+
+
+# ==================== BINNING ====================
+
+def ensure_session_date_index():
+    """Create the analytics index on databases created before it existed"""
+    index = next(i for i in TrainingSession.__table__.indexes if i.name == 'ix_training_sessions_user_date')
+    index.create(db.engine, checkfirst=True)
+
+
+def _load_bins(user_id):
+    """[(day, style, sessions, minutes)] for every day the user trained, oldest first"""
+    day = func.date(TrainingSession.session_date)
+    rows = db.session.execute(
+        select(day, TrainingSession.style, func.count(), func.coalesce(func.sum(TrainingSession.duration), 0))
+        .where(TrainingSession.user_id == user_id)
+        .group_by(day, TrainingSession.style)
+        .order_by(day)
+    ).all()
+
+    bins = []
+    for practiced_on, style, sessions, minutes in rows:
+        # SQLite returns the date as text
+        if isinstance(practiced_on, str):
+            practiced_on = date.fromisoformat(practiced_on)
+        bins.append((practiced_on, style_key(style), sessions, int(minutes)))
+    return bins
+
+
+def get_session_bins(user_id):
+    """Cached per-day, per-style session bins for a user"""
+    now = time.monotonic()
+    with _cache_lock:
+        generation = _generations.get(user_id, 0)
+        entry = _cache.get(user_id)
+        if entry is not None and entry[1] == generation and now - entry[0] < CACHE_TTL_SECONDS:
+            _cache.move_to_end(user_id)
+            return entry[2]
+
+    bins = _load_bins(user_id)
+
+    with _cache_lock:
+        # A session committed while we were reading - don't cache what may be stale
+        if _generations.get(user_id, 0) == generation:
+            _cache[user_id] = (now, generation, bins)
+            _cache.move_to_end(user_id)
+            while len(_cache) > MAX_CACHED_USERS:
+                _cache.popitem(last=False)
+    return bins
+
+
+def invalidate_user_analytics(user_id):
+    with _cache_lock:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+        _cache.pop(user_id, None)
+
+
+# ==================== INVALIDATION ====================
+
+def _mark_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('analytics_dirty_users', set()).add(target.user_id)
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(TrainingSession, _event_name, _mark_dirty)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    # Only once the write is visible, so a concurrent read can't cache the old bins again
+    for user_id in session.info.pop('analytics_dirty_users', ()):
+        invalidate_user_analytics(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop('analytics_dirty_users', None)
+
+
+# ==================== ANALYTICS ====================
+
+def training_streaks(days, today):
+    """(current, longest) streaks of consecutive training days. days: sorted distinct dates"""
+    longest = {'length': 0, 'start': None, 'end': None}
+    run_start = previous = None
+    length = 0
+
+    for day in days:
+        if previous is not None and (day - previous).days == 1:
+            length += 1
+        else:
+            run_start, length = day, 1
+        if length > longest['length']:
+            longest = {'length': length, 'start': run_start.isoformat(), 'end': day.isoformat()}
+        previous = day
+
+    # A streak is still alive until a full day passes without training
+    alive = previous is not None and (today - previous).days <= 1
+    current = {
+        'length': length if alive else 0,
+        'start': run_start.isoformat() if alive else None,
+        'end': previous.isoformat() if alive else None
+    }
+    return current, longest
+
+
+def training_analytics(user_id, days=DEFAULT_HEATMAP_DAYS, weeks=DEFAULT_VOLUME_WEEKS, today=None):
+    """Heatmap of the last `days` days, current and longest streak, and the last `weeks` weeks of minutes per style"""
+    today = today or datetime.utcnow().date()
+    bins = get_session_bins(user_id)
+
+    heatmap_start = today - timedelta(days=days - 1)
+    this_week = today - timedelta(days=today.weekday())
+    volume_start = this_week - timedelta(weeks=weeks - 1)
+
+    daily = OrderedDict()
+    weekly = {}
+    for day, style, sessions, minutes in bins:
+        if heatmap_start <= day <= today:
+            cell = daily.setdefault(day, [0, 0])
+            cell[0] += sessions
+            cell[1] += minutes
+        if volume_start <= day <= today:
+            week = weekly.setdefault(day - timedelta(days=day.weekday()), {})
+            week[style] = week.get(style, 0) + minutes
+
+    current, longest = training_streaks(sorted({day for day, _, _, _ in bins if day <= today}), today)
+
+    volume = []
+    for i in range(weeks):
+        week_start = volume_start + timedelta(weeks=i)
+        styles = weekly.get(week_start, {})
+        volume.append({
+            'week_start': week_start.isoformat(),
+            'total_minutes': sum(styles.values()),
+            'by_style': styles
+        })
+
+    return {
+        'heatmap': {
+            'start': heatmap_start.isoformat(),
+            'end': today.isoformat(),
+            'days': [{'date': day.isoformat(), 'sessions': sessions, 'minutes': minutes}
+                     for day, (sessions, minutes) in daily.items()]
+        },
+        'streaks': {'current': current, 'longest': longest},
+        'weekly_volume': volume,
+        'training_days': len({day for day, _, _, _ in bins})
+    }
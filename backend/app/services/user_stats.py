@@ -0,0 +1,357 @@
+"""
+User Stats Rollup
+Keeps the user_stats table in step with sessions, videos and progress rows,
+so dashboard aggregates are a primary-key lookup instead of GROUP BY scans
+"""
+
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, func, inspect, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db
+from app.models.user_stats import UserStats, ALL_STYLES
+from app.models.training_session import TrainingSession
+from app.models.training_video import TrainingVideo
+from app.models.user_technique_progress import UserTechniqueProgress
+
+PROFICIENCY_COUNTERS = {
+    'learning': 'learning_count',
+    'practicing': 'practicing_count',
+    'mastered': 'mastered_count',
+}
+
+COUNTER_COLUMNS = [
+    'session_count', 'session_duration',
+    'video_count', 'video_duration', 'analyzed_video_count',
+    'tracked_count', 'learning_count', 'practicing_count', 'mastered_count',
+    'favorites_count', 'practice_count', 'practice_time',
+]
+
+
+def style_key(style):
+    """Rollup key for a row's style - None and '' share the unnamed bucket"""
+    return style or ''
+
+
+def is_reserved_style(style):
+    """Check if a style name would land on the ALL_STYLES totals row - callers reject it"""
+    return style == ALL_STYLES
+
+
+# ==================== DELTA UPDATES ====================
+
+def bump_user_stats(connection, user_id, style=None, **deltas):
+    """
+    Add deltas to a user's ALL_STYLES row and, if a style is given, that style's row.
+    Runs on the caller's connection so it commits or rolls back with the change itself.
+    """
+    deltas = {name: amount for name, amount in deltas.items() if amount}
+    if user_id is None or not deltas:
+        return
+
+    keys = [ALL_STYLES] if style is None else [ALL_STYLES, style_key(style)]
+    now = datetime.utcnow()
+    table = UserStats.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(table).values([
+            {'user_id': user_id, 'style': key, 'updated_at': now, **deltas} for key in keys
+        ])
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in deltas}
+        set_['updated_at'] = now
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.style],
+            set_=set_
+        ))
+        return
+
+    # Generic fallback: update, then insert the row if it wasn't there yet
+    for key in keys:
+        result = connection.execute(
+            update(table)
+            .where(table.c.user_id == user_id, table.c.style == key)
+            .values({name: table.c[name] + amount for name, amount in deltas.items()}, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(user_id=user_id, style=key, updated_at=now, **deltas))
+
+
+def _session_contribution(get):
+    return get('user_id'), style_key(get('style')), {
+        'session_count': 1,
+        'session_duration': get('duration') or 0,
+    }
+
+
+def _video_contribution(get):
+    return get('user_id'), style_key(get('style')), {
+        'video_count': 1,
+        'video_duration': get('duration') or 0,
+        'analyzed_video_count': 1 if get('analysis_status') == 'completed' else 0,
+    }
+
+
+def _progress_contribution(get):
+    contribution = {
+        'tracked_count': 1,
+        'favorites_count': 1 if get('is_favorite') else 0,
+        'practice_count': get('practice_count') or 0,
+        'practice_time': get('total_practice_time') or 0,
+    }
+    status_counter = PROFICIENCY_COUNTERS.get(get('proficiency_status') or 'learning')
+    if status_counter:
+        contribution[status_counter] = 1
+    return get('user_id'), None, contribution
+
+
+def _new_value(target):
+    return lambda attr: getattr(target, attr)
+
+
+def _old_value(target):
+    state = inspect(target)
+
+    def get(attr):
+        history = state.attrs[attr].history
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        return None
+    return get
+
+
+def _negate(deltas):
+    return {name: -amount for name, amount in deltas.items()}
+
+
+def _load_tracked(target, attrs):
+    """
+    Load tracked attributes that were expired (e.g. by a commit) before the row is written.
+    Unchanged ones otherwise have no history to read the old contribution from.
+    """
+    state = inspect(target)
+    if state.expired_attributes & set(attrs):
+        state.session.refresh(target, attribute_names=[attr for attr in attrs if attr in state.expired_attributes])
+
+
+def _on_set(target, value, oldvalue, initiator):
+    pass
+
+
+def _track(model, contribution, attrs):
+    """Register insert/update/delete listeners that feed a model's contribution into the rollup"""
+
+    # Load the committed value when a tracked attribute is assigned, so history always holds it
+    for attr in attrs:
+        event.listen(getattr(model, attr), 'set', _on_set, active_history=True)
+
+    @event.listens_for(model, 'before_update')
+    @event.listens_for(model, 'before_delete')
+    def before_write(mapper, connection, target):
+        _load_tracked(target, attrs)
+
+    @event.listens_for(model, 'after_insert')
+    def after_insert(mapper, connection, target):
+        user_id, style, deltas = contribution(_new_value(target))
+        bump_user_stats(connection, user_id, style, **deltas)
+
+    @event.listens_for(model, 'after_delete')
+    def after_delete(mapper, connection, target):
+        user_id, style, deltas = contribution(_old_value(target))
+        bump_user_stats(connection, user_id, style, **_negate(deltas))
+
+    @event.listens_for(model, 'after_update')
+    def after_update(mapper, connection, target):
+        old = contribution(_old_value(target))
+        new = contribution(_new_value(target))
+        if old == new:
+            return
+
+        old_user, old_style, old_deltas = old
+        new_user, new_style, new_deltas = new
+        if old_user is None or new_user is None:
+            # Adding one side without taking off the other would double count - leave it to a rebuild
+            current_app.logger.warning(
+                'User stats: no owner for %s %s, skipped - run rebuild_user_stats()', model.__name__, target.id
+            )
+            return
+
+        if (old_user, old_style) == (new_user, new_style):
+            combined = {name: new_deltas.get(name, 0) - old_deltas.get(name, 0)
+                        for name in set(old_deltas) | set(new_deltas)}
+            bump_user_stats(connection, new_user, new_style, **combined)
+        else:
+            bump_user_stats(connection, old_user, old_style, **_negate(old_deltas))
+            bump_user_stats(connection, new_user, new_style, **new_deltas)
+
+
+def progress_stats_deltas(old, new):
+    """
+    Rollup deltas for a progress row changing from old to new (dicts of column values, or None
+    for a row that didn't exist / no longer exists).
+    For Core INSERTs and UPDATEs, which don't fire the mapper events above.
+    """
+    old_deltas = _progress_contribution(old.get)[2] if old is not None else {}
+    new_deltas = _progress_contribution(new.get)[2] if new is not None else {}
+    return {name: new_deltas.get(name, 0) - old_deltas.get(name, 0) for name in set(old_deltas) | set(new_deltas)}
+
+
+_track(TrainingSession, _session_contribution, ('user_id', 'style', 'duration'))
+_track(TrainingVideo, _video_contribution, ('user_id', 'style', 'duration', 'analysis_status'))
+_track(UserTechniqueProgress, _progress_contribution, (
+    'user_id', 'is_favorite', 'practice_count', 'total_practice_time', 'proficiency_status'
+))
+
+
+# ==================== READS ====================
+
+def get_user_stats_rows(user_id):
+    """Fetch every rollup row for a user, keyed by style"""
+    rows = UserStats.query.filter_by(user_id=user_id).all()
+    return {row.style: row for row in rows}
+
+
+def _totals(rows):
+    return rows.get(ALL_STYLES) or UserStats(user_id=None, style=ALL_STYLES, **{name: 0 for name in COUNTER_COLUMNS})
+
+
+def _style_rows(rows):
+    return [row for style, row in rows.items() if style != ALL_STYLES]
+
+
+def format_duration(hours, minutes):
+    return f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+
+
+def video_stats_payload(rows):
+    """Payload of /api/auth/stats"""
+    totals = _totals(rows)
+    total_duration = totals.video_duration or 0
+
+    return {
+        'total_videos': totals.video_count,
+        'total_duration': total_duration,
+        'duration_formatted': format_duration(int(total_duration // 3600), int((total_duration % 3600) // 60)),
+        'analyzed_videos': totals.analyzed_video_count,
+        # The unnamed bucket counts towards the totals but isn't a style of its own
+        'videos_by_style': {row.style: row.video_count for row in _style_rows(rows) if row.style and row.video_count}
+    }
+
+
+def session_stats_payload(rows):
+    """Aggregate part of /api/training/sessions/stats"""
+    totals = _totals(rows)
+    total_duration = totals.session_duration or 0
+
+    return {
+        'total_sessions': totals.session_count,
+        'total_duration': total_duration,
+        'duration_formatted': format_duration(int(total_duration // 60), int(total_duration % 60)),
+        'sessions_by_style': [
+            {'style': row.style, 'count': row.session_count, 'total_duration': row.session_duration}
+            for row in _style_rows(rows) if row.session_count
+        ]
+    }
+
+
+def progress_stats_payload(rows):
+    """Aggregate part of /api/progress/stats"""
+    totals = _totals(rows)
+    by_status = {status: getattr(totals, counter) for status, counter in PROFICIENCY_COUNTERS.items()}
+
+    return {
+        'total_tracked': totals.tracked_count,
+        'by_status': {status: count for status, count in by_status.items() if count},
+        'favorites_count': totals.favorites_count,
+        'total_practices': int(totals.practice_count),
+        'total_practice_time': int(totals.practice_time)
+    }
+
+
+# ==================== REBUILD ====================
+
+def rebuild_user_stats(user_id=None):
+    """
+    Recompute the rollup from the source tables to fix any drift.
+    Rebuilds one user if user_id is given, otherwise everyone. Returns the number of rows written.
+    """
+    totals = {}
+
+    # Same buckets as bump_user_stats: by_style rows count towards their style_key() too
+    def add(user, style, by_style=True, **deltas):
+        for key in ([ALL_STYLES, style_key(style)] if by_style else [ALL_STYLES]):
+            row = totals.setdefault((user, key), dict.fromkeys(COUNTER_COLUMNS, 0))
+            for name, amount in deltas.items():
+                row[name] += amount or 0
+
+    def scoped(query, model):
+        return query.filter(model.user_id == user_id) if user_id is not None else query
+
+    sessions = scoped(db.session.query(
+        TrainingSession.user_id,
+        TrainingSession.style,
+        func.count(TrainingSession.id),
+        func.sum(TrainingSession.duration)
+    ), TrainingSession).group_by(TrainingSession.user_id, TrainingSession.style)
+
+    for user, style, count, duration in sessions:
+        add(user, style, session_count=count, session_duration=duration)
+
+    videos = scoped(db.session.query(
+        TrainingVideo.user_id,
+        TrainingVideo.style,
+        func.count(TrainingVideo.id),
+        func.sum(TrainingVideo.duration),
+        func.sum(db.case((TrainingVideo.analysis_status == 'completed', 1), else_=0))
+    ), TrainingVideo).group_by(TrainingVideo.user_id, TrainingVideo.style)
+
+    for user, style, count, duration, analyzed in videos:
+        add(user, style, video_count=count, video_duration=duration, analyzed_video_count=analyzed)
+
+    progress = scoped(db.session.query(
+        UserTechniqueProgress.user_id,
+        UserTechniqueProgress.proficiency_status,
+        func.count(UserTechniqueProgress.id),
+        func.sum(db.case((UserTechniqueProgress.is_favorite.is_(True), 1), else_=0)),
+        func.sum(UserTechniqueProgress.practice_count),
+        func.sum(UserTechniqueProgress.total_practice_time)
+    ), UserTechniqueProgress).group_by(UserTechniqueProgress.user_id, UserTechniqueProgress.proficiency_status)
+
+    for user, status, count, favorites, practices, practice_time in progress:
+        deltas = {'tracked_count': count, 'favorites_count': favorites,
+                  'practice_count': practices, 'practice_time': practice_time}
+        status_counter = PROFICIENCY_COUNTERS.get(status or 'learning')
+        if status_counter:
+            deltas[status_counter] = count
+        add(user, None, by_style=False, **deltas)
+
+    delete_query = UserStats.query
+    if user_id is not None:
+        delete_query = delete_query.filter_by(user_id=user_id)
+    delete_query.delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    rows = [
+        {'user_id': user, 'style': style, 'updated_at': now, **counters}
+        for (user, style), counters in totals.items()
+    ]
+    if rows:
+        db.session.execute(insert(UserStats.__table__), rows)
+    db.session.commit()
+
+    return len(rows)
+
+
+def ensure_user_stats():
+    """Backfill the rollup the first time it runs against an existing database"""
+    if UserStats.query.first() is not None:
+        return
+
+    has_history = (TrainingSession.query.first() or TrainingVideo.query.first()
+                   or UserTechniqueProgress.query.first())
+    if has_history:
+        written = rebuild_user_stats()
+        print(f"✅ User stats rollup backfilled ({written} rows)")
\ No newline at end of file
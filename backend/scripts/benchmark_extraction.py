@@ -0,0 +1,120 @@
+"""
+Extraction Benchmark
+Times the scraper's page parsing + style/difficulty/category extraction against the
+previous implementation (html.parser, page text extracted per field, nested keyword scans)
+and checks both produce the same labels.
+
+Usage:
+    python benchmark_extraction.py                     # generated pages
+    python benchmark_extraction.py --html-dir pages/   # saved *.html pages
+"""
+
+import argparse
+import glob
+import os
+import random
+import time
+from bs4 import BeautifulSoup
+from page_classifier import STYLE_RULES, DIFFICULTY_RULES, CATEGORY_RULES, ahocorasick
+from scrape_blackbeltwiki import BlackBeltWikiScraper, HTML_PARSER
+
+FILLER = ('the', 'kick', 'leg', 'hip', 'turn', 'strike', 'target', 'foot', 'balance', 'practice',
+          'opponent', 'guard', 'stance', 'weight', 'chamber', 'extend', 'retract', 'speed', 'power')
+
+
+def legacy_labels(html, url):
+    """The extraction as it was before the single-pass classifier"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    text = soup.get_text().lower()
+    style = next((label for label, keywords in STYLE_RULES if any(k in text for k in keywords)), 'General')
+
+    text = soup.get_text().lower()
+    difficulty = next((label for label, keywords in DIFFICULTY_RULES if any(k in text for k in keywords)), 'Intermediate')
+
+    url_lower = url.lower()
+    category = next((label for label, keywords in CATEGORY_RULES if any(k in url_lower for k in keywords)), 'Techniques')
+
+    return {'style': style, 'difficulty': difficulty, 'category': category}
+
+
+def current_labels(scraper, html, url):
+    return scraper.classify_page(BeautifulSoup(html, HTML_PARSER), url)
+
+
+def generated_pages(count, words_per_page, seed=7):
+    """Wiki-like pages with a few keywords placed at random - some with none at all"""
+    rng = random.Random(seed)
+    keywords = [k for _, ks in STYLE_RULES + DIFFICULTY_RULES for k in ks]
+    slugs = ['front-kick', 'jab-punch', 'high-block', 'hip-throw', 'heian-kata', 'armbar', 'elbow']
+
+    pages = []
+    for i in range(count):
+        words = [rng.choice(FILLER) for _ in range(words_per_page)]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+
+        paragraphs = ''.join(f'<p>{" ".join(words[j:j + 60])}</p>' for j in range(0, len(words), 60))
+        html = (
+            f'<html><head><title>Technique {i} | Black Belt Wiki</title></head><body>'
+            f'<nav><ul>{"".join(f"<li><a href=/p{n}>Link {n}</a></li>" for n in range(40))}</ul></nav>'
+            f'<h1>Technique {i}</h1><div class="entry-content">{paragraphs}</div></body></html>'
+        )
+        pages.append((f'https://www.blackbeltwiki.com/{rng.choice(slugs)}-{i}', html))
+    return pages
+
+
+def saved_pages(html_dir):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(html_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            slug = os.path.splitext(os.path.basename(path))[0]
+            pages.append((f'https://www.blackbeltwiki.com/{slug}', f.read()))
+    return pages
+
+
+def timed(func, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, html in pages:
+            func(html, url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraped page extraction')
+    parser.add_argument('--html-dir', help='Directory of saved technique pages (*.html)')
+    parser.add_argument('--pages', type=int, default=200, help='Generated pages (default: 200)')
+    parser.add_argument('--words', type=int, default=3000, help='Words per generated page (default: 3000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = saved_pages(args.html_dir) if args.html_dir else generated_pages(args.pages, args.words)
+    if not pages:
+        print(f"❌ No .html files found in {args.html_dir}")
+        return
+
+    scraper = BlackBeltWikiScraper()
+    mismatches = [
+        url for url, html in pages
+        if legacy_labels(html, url) != current_labels(scraper, html, url)
+    ]
+
+    legacy = timed(legacy_labels, pages, args.repeat)
+    current = timed(lambda html, url: current_labels(scraper, html, url), pages, args.repeat)
+
+    print(f"\n📊 {len(pages)} pages, best of {args.repeat}")
+    print(f"   Parser: {HTML_PARSER}, matcher: {'aho-corasick' if ahocorasick else 'substring scan'}")
+    print(f"   Legacy:  {legacy * 1000 / len(pages):.2f} ms/page")
+    print(f"   Current: {current * 1000 / len(pages):.2f} ms/page ({legacy / current:.1f}x)")
+    if mismatches:
+        print(f"   ⚠️  {len(mismatches)} pages labeled differently, e.g. {mismatches[0]}")
+    else:
+        print("   ✅ Same labels for every page")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Build Recommendations Script
+Recomputes the technique_neighbors table from every user's tracked techniques.
+Run it periodically (e.g. nightly) - running servers pick up a new build within a minute.
+Usage: python scripts/build_recommendations.py [--top-k 20] [--min-support 2]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.technique_recommendations import build_technique_neighbors, DEFAULT_TOP_K, DEFAULT_MIN_SUPPORT
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute similar techniques for recommendations')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help=f'Neighbors kept per technique (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--min-support', type=int, default=DEFAULT_MIN_SUPPORT,
+                        help=f'Users that must track both techniques of a pair (default: {DEFAULT_MIN_SUPPORT})')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n🔄 Building technique neighbors from progress...")
+        start = time.perf_counter()
+
+        techniques, written = build_technique_neighbors(args.top_k, args.min_support)
+
+        print(f"✅ {techniques} techniques with neighbors, {written} rows written "
+              f"in {time.perf_counter() - start:.1f}s\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Crawl Cache
+On-disk HTTP cache and resume checkpoint for the BlackBeltWiki scraper.
+The cache stores each page's validators (ETag, Last-Modified), a hash of its body and
+the parsed result, so re-crawls can send conditional requests and skip re-parsing
+pages that haven't changed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class CachedPage:
+    __slots__ = ('url', 'etag', 'last_modified', 'content_hash', 'result', 'fetched_at')
+
+    def __init__(self, url, etag, last_modified, content_hash, result, fetched_at):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.result = result
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self):
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class CrawlCache:
+    """SQLite store of URL -> validators, content hash and parsed result. Safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "content_hash TEXT NOT NULL, result TEXT, fetched_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, etag, last_modified, content_hash, result, fetched_at FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        url, etag, last_modified, digest, result, fetched_at = row
+        return CachedPage(url, etag, last_modified, digest, json.loads(result), fetched_at)
+
+    def store(self, url, etag, last_modified, digest, result):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO pages (url, etag, last_modified, content_hash, result, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                "content_hash = excluded.content_hash, result = excluded.result, fetched_at = excluded.fetched_at",
+                (url, etag, last_modified, digest, json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Record that a cached page was revalidated, keeping any new validators the server sent"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET etag = coalesce(?, etag), last_modified = coalesce(?, last_modified), "
+                "fetched_at = ? WHERE url = ?",
+                (etag, last_modified, time.time(), url)
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CrawlCheckpoint:
+    """
+    Append-only list of detail pages finished in the current crawl.
+    A crawl that is interrupted resumes from it; it is removed once the crawl completes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = set()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self.done.add(line)
+
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def mark_done(self, url):
+        with self.lock:
+            self.done.add(url)
+            self.file.write(url + '\n')
+            # Flushed per page so a killed process loses at most the pages in flight
+            self.file.flush()
+
+    def complete(self):
+        """The crawl finished - start from scratch next time"""
+        with self.lock:
+            self.file.close()
+            os.remove(self.path)
+            self.done = set()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
@@ -12,27 +12,13 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app import create_app, db
 from app.models.technique import Technique
-from scrape_blackbeltwiki import BlackBeltWikiScraper
+from app.services.technique_import import import_technique_batch, ImportResult, IMPORT_POLICIES
+from app.services.technique_dedupe import DEDUPE_MODES
+from scrape_blackbeltwiki import BlackBeltWikiScraper, DEFAULT_CACHE_PATH
+from scrape_pipeline import scrape_to_database, replay_spool, DEFAULT_SPOOL_PATH
 
 
-def clean_technique_data(technique):
-    """Clean and validate technique data"""
-    return {
-        'name': technique.get('name', 'Unknown')[:100],  # Limit to 100 chars
-        'description': technique.get('description', '')[:1000],  # Limit to 1000 chars
-        'style': technique.get('style', 'General')[:50],
-        'difficulty': technique.get('difficulty', 'Intermediate')[:20],
-        'category': technique.get('category', 'Techniques')[:50],
-        'reference_video_url': technique.get('reference_video_url', None)
-    }
-
-
-def technique_exists(name, style):
-    """Check if technique already exists in database"""
-    return Technique.query.filter_by(name=name, style=style).first() is not None
-
-
-def import_from_json(json_file):
+def import_from_json(json_file, policy='skip', dedupe='off'):
     """Import techniques from a JSON file"""
     print(f"\n📂 Loading techniques from {json_file}")
     
@@ -46,88 +32,85 @@ def import_from_json(json_file):
         print(f"❌ Invalid JSON file: {json_file}")
         return 0
     
-    return import_techniques(techniques)
+    if not isinstance(techniques, list):
+        print(f"❌ Expected a list of techniques in {json_file}")
+        return 0
+    
+    return import_techniques(techniques, policy=policy, dedupe=dedupe)
 
 
-def import_techniques(techniques):
+def import_techniques(techniques, policy='skip', batch_size=500, dedupe='off'):
     """Import techniques into database"""
-    print(f"\n🚀 Starting import of {len(techniques)} techniques...")
+    print(f"\n🚀 Starting import of {len(techniques)} techniques (policy: {policy})...")
     
-    imported = 0
-    skipped = 0
-    errors = 0
+    totals = ImportResult()
     
-    for i, tech_data in enumerate(techniques, 1):
+    for start in range(0, len(techniques), batch_size):
+        batch = techniques[start:start + batch_size]
         try:
-            # Clean the data
-            clean_data = clean_technique_data(tech_data)
-            
-            # Check if already exists
-            if technique_exists(clean_data['name'], clean_data['style']):
-                print(f"⏭️  Skipped (exists): {clean_data['name']}")
-                skipped += 1
-                continue
-            
-            # Create new technique
-            technique = Technique(
-                name=clean_data['name'],
-                description=clean_data['description'],
-                style=clean_data['style'],
-                difficulty=clean_data['difficulty'],
-                reference_video_url=clean_data['reference_video_url']
-            )
-            
-            db.session.add(technique)
-            imported += 1
-            
-            # Commit every 50 techniques
-            if imported % 50 == 0:
-                db.session.commit()
-                print(f"💾 Committed {imported} techniques")
-        
+            result = import_technique_batch(batch, policy=policy, dedupe=dedupe)
+            db.session.commit()
+            totals.merge(result)
+            print(f"💾 Committed {start + len(batch)}/{len(techniques)} "
+                  f"(+{result.imported} new, {result.updated} updated, {result.skipped} skipped)")
         except Exception as e:
-            print(f"❌ Error importing {tech_data.get('name', 'Unknown')}: {e}")
-            errors += 1
+            print(f"❌ Batch starting at {start} failed: {e}")
             db.session.rollback()
-            continue
+            totals.errors.extend(
+                {'name': (t.get('name') if isinstance(t, dict) else None) or 'Unknown', 'error': str(e)}
+                for t in batch
+            )
     
-    # Final commit
-    try:
-        db.session.commit()
-        print(f"\n✅ Final commit successful")
-    except Exception as e:
-        print(f"❌ Final commit failed: {e}")
-        db.session.rollback()
+    print_summary(totals)
+    return totals.imported
+
+
+def print_summary(totals):
+    for error in totals.errors[:20]:
+        print(f"❌ Error importing {error['name']}: {error['error']}")
+    
+    for duplicate in (totals.duplicates or [])[:20]:
+        best = duplicate['candidates'][0]
+        print(f"👯 {duplicate['name']} ({duplicate['style']}) looks like {best['name']} "
+              f"({best['similarity']:.0%} similar)")
     
     # Summary
     print(f"\n" + "="*50)
     print(f"📊 IMPORT SUMMARY")
     print(f"="*50)
-    print(f"✅ Imported: {imported}")
-    print(f"⏭️  Skipped: {skipped}")
-    print(f"❌ Errors: {errors}")
+    print(f"✅ Imported: {totals.imported}")
+    print(f"🔁 Updated: {totals.updated}")
+    print(f"⏭️  Skipped: {totals.skipped}")
+    print(f"❌ Errors: {len(totals.errors)}")
+    if totals.duplicates is not None:
+        print(f"👯 Near-duplicates: {len(totals.duplicates)}")
     print(f"📚 Total in DB: {Technique.query.count()}")
     print(f"="*50 + "\n")
-    
-    return imported
 
 
-def scrape_and_import():
-    """Scrape BlackBeltWiki and import directly"""
+def scrape_and_import(policy='skip', dedupe='off'):
+    """Scrape BlackBeltWiki and import techniques in batches while the crawl runs"""
     print("\n🕷️  Starting web scraping...")
     
-    scraper = BlackBeltWikiScraper()
-    techniques = scraper.scrape_all()
+    # Re-runs only re-parse pages that changed since the last scrape
+    scraper = BlackBeltWikiScraper(cache_path=DEFAULT_CACHE_PATH)
     
-    if not techniques:
-        print("❌ No techniques scraped")
+    # Everything scraped is also spooled to JSONL, for replay if an import batch fails
+    totals = scrape_to_database(scraper, DEFAULT_SPOOL_PATH, policy=policy, dedupe=dedupe)
+    print_summary(totals)
+    return totals.imported
+
+
+def replay_and_import(spool_path=DEFAULT_SPOOL_PATH, policy='skip', from_start=False, dedupe='off'):
+    """Import techniques from a scrape spool without crawling again"""
+    if not os.path.exists(spool_path):
+        print(f"❌ File not found: {spool_path}")
         return 0
     
-    # Save to JSON for backup
-    scraper.save_to_json('techniques_scraped.json')
-    
-    # Import to database
-    return import_techniques(techniques)
+    print(f"\n♻️  Replaying {spool_path}...")
+    totals = replay_spool(spool_path, policy=policy, from_start=from_start, dedupe=dedupe)
+    print_summary(totals)
+    return totals.imported
 
 
 def main():
@@ -147,17 +130,32 @@ def main():
         print("\nOptions:")
         print("1. Scrape BlackBeltWiki and import")
         print("2. Import from existing JSON file")
-        print("3. Cancel")
+        print("3. Replay the last scrape's spool (imports whatever a failed run didn't)")
+        print("4. Cancel")
+        
+        choice = input("\nEnter choice (1-4): ").strip()
         
-        choice = input("\nEnter choice (1-3): ").strip()
+        if choice in ('1', '2', '3'):
+            policy = input(f"Existing techniques - {'/'.join(IMPORT_POLICIES)} (default: skip): ").strip() or 'skip'
+            if policy not in IMPORT_POLICIES:
+                print(f"❌ Unknown policy: {policy}")
+                return
+            dedupe = input(f"Near-duplicate names - {'/'.join(DEDUPE_MODES)} (default: off): ").strip() or 'off'
+            if dedupe not in DEDUPE_MODES:
+                print(f"❌ Unknown dedupe mode: {dedupe}")
+                return
         
         if choice == '1':
-            imported = scrape_and_import()
+            imported = scrape_and_import(policy, dedupe)
         elif choice == '2':
             json_file = input("Enter JSON filename (default: techniques_scraped.json): ").strip()
             if not json_file:
                 json_file = 'techniques_scraped.json'
-            imported = import_from_json(json_file)
+            imported = import_from_json(json_file, policy, dedupe)
+        elif choice == '3':
+            spool_file = input(f"Enter spool filename (default: {DEFAULT_SPOOL_PATH}): ").strip()
+            from_start = input("Replay from the start instead of after the last committed batch? (y/N): ").strip().lower() == 'y'
+            imported = replay_and_import(spool_file or DEFAULT_SPOOL_PATH, policy, from_start, dedupe)
         else:
             print("❌ Cancelled")
             return
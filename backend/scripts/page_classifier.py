@@ -0,0 +1,103 @@
+"""
+Page Classifier
+Keyword rules that label scraped pages with style, difficulty and category.
+All fields are matched in one pass over the text with an Aho-Corasick automaton when
+pyahocorasick is installed, otherwise with ordered substring checks. Both give the same
+labels: a keyword matches anywhere in the text and the earliest matching rule wins.
+"""
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+STYLE_RULES = [
+    ('Karate', ['karate', 'shotokan', 'kyokushin', 'goju-ryu']),
+    ('Taekwondo', ['taekwondo', 'tae kwon do', 'tkd']),
+    ('Kung Fu', ['kung fu', 'wushu', 'shaolin']),
+    ('Muay Thai', ['muay thai', 'thai boxing']),
+    ('Boxing', ['boxing', 'pugilism']),
+    ('Judo', ['judo']),
+    ('Jiu-Jitsu', ['jiu-jitsu', 'jujutsu', 'bjj']),
+    ('Mixed Martial Arts', ['mma', 'mixed martial']),
+    ('Kickboxing', ['kickboxing']),
+    ('Capoeira', ['capoeira'])
+]
+
+DIFFICULTY_RULES = [
+    ('Advanced', ['advanced', 'expert', 'difficult', 'complex']),
+    ('Intermediate', ['intermediate', 'moderate']),
+    ('Beginner', ['beginner', 'basic', 'simple', 'easy'])
+]
+
+# Matched against the page URL
+CATEGORY_RULES = [
+    ('Kicks', ['kick']),
+    ('Strikes', ['punch', 'strike']),
+    ('Blocks', ['block', 'defense']),
+    ('Throws', ['throw', 'takedown']),
+    ('Grappling', ['grappling', 'submission']),
+    ('Forms', ['kata', 'form'])
+]
+
+
+class TextClassifier:
+    """
+    Labels lowercase text for several fields at once.
+    fields maps a field name to (rules, default), where rules is an ordered list of (label, keywords).
+    """
+
+    def __init__(self, fields):
+        self.names = list(fields)
+        self.rules = [[(label, tuple(keywords)) for label, keywords in fields[name][0]] for name in self.names]
+        self.defaults = [fields[name][1] for name in self.names]
+        self.automaton = self._build_automaton() if ahocorasick is not None else None
+
+    def _build_automaton(self):
+        # keyword -> {field: earliest rule listing it}
+        matches = {}
+        for field, rules in enumerate(self.rules):
+            for priority, (_, keywords) in enumerate(rules):
+                for keyword in keywords:
+                    matches.setdefault(keyword, {}).setdefault(field, priority)
+
+        automaton = ahocorasick.Automaton()
+        for keyword, fields in matches.items():
+            automaton.add_word(keyword, tuple(fields.items()))
+        automaton.make_automaton()
+        return automaton
+
+    def classify(self, text):
+        """{field: label} for the text"""
+        if self.automaton is None:
+            return {
+                name: next((label for label, keywords in rules if any(k in text for k in keywords)), default)
+                for name, rules, default in zip(self.names, self.rules, self.defaults)
+            }
+
+        best = [len(rules) for rules in self.rules]
+        unresolved = len(best)
+        for _, matches in self.automaton.iter(text):
+            for field, priority in matches:
+                if priority < best[field]:
+                    if priority == 0:
+                        unresolved -= 1
+                    best[field] = priority
+            # Every field already matched its first rule - nothing later can change the labels
+            if not unresolved:
+                break
+
+        return {
+            name: rules[priority][0] if priority < len(rules) else default
+            for name, rules, default, priority in zip(self.names, self.rules, self.defaults, best)
+        }
+
+
+PAGE_CLASSIFIER = TextClassifier({
+    'style': (STYLE_RULES, 'General'),
+    'difficulty': (DIFFICULTY_RULES, 'Intermediate')
+})
+
+URL_CLASSIFIER = TextClassifier({
+    'category': (CATEGORY_RULES, 'Techniques')
+})
@@ -0,0 +1,40 @@
+"""
+Rebuild User Stats Script
+Recomputes the user_stats rollup from sessions, videos and progress, and the practice
+trend rollups from the practice log, to fix drift
+Usage: python scripts/rebuild_user_stats.py [--user-id ID]
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.user_stats import rebuild_user_stats
+from app.services.practice_log import rebuild_practice_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the user_stats and practice_rollups tables')
+    parser.add_argument('--user-id', type=int, help='Only rebuild this user (default: everyone)')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        target = f"user {args.user_id}" if args.user_id else "all users"
+        print(f"\n🔄 Rebuilding stats rollup for {target}...")
+
+        written = rebuild_user_stats(args.user_id)
+
+        print(f"✅ Wrote {written} rollup rows")
+
+        written = rebuild_practice_rollups(args.user_id)
+        print(f"✅ Wrote {written} practice trend rows\n")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Refresh Leaderboards Script
+Recomputes the precomputed leaderboards. Run it periodically (e.g. every few minutes from cron) -
+boards nobody refreshes are otherwise rebuilt by the first viewer once they are stale.
+Usage: python scripts/refresh_leaderboards.py [--board NAME]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.leaderboards import refresh_leaderboard, BOARDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the leaderboard tables')
+    parser.add_argument('--board', choices=list(BOARDS), help='Only refresh this board (default: all)')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        for board in [args.board] if args.board else BOARDS:
+            start = time.perf_counter()
+            entries = refresh_leaderboard(board)
+            print(f"✅ {board}: {entries} entries in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,111 +4,271 @@ Scrapes martial arts techniques from BlackBeltWiki
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+import argparse
 import json
+import random
+import threading
 import time
-from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from urllib.parse import urljoin, urlparse
 import re
+from collections import Counter
+from crawl_cache import CrawlCache, CrawlCheckpoint, content_hash
+from page_classifier import PAGE_CLASSIFIER, URL_CLASSIFIER
+
+try:
+    import lxml  # noqa: F401 - only checked for, BeautifulSoup loads it
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+DEFAULT_CACHE_PATH = 'blackbeltwiki_cache.db'
+
+# Part of every cached page's hash - bump it when parsing changes so cached results are re-parsed
+PARSER_VERSION = f'2-{HTML_PARSER}'
+
+# Responses worth retrying - the server is busy or briefly unavailable
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+class TokenBucket:
+    """Rate limiter allowing `rate` requests per second on average, in bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate must be positive and burst at least 1')
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Take the token now, even if that leaves a debt - callers then wait in arrival order
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
 
 class BlackBeltWikiScraper:
-    def __init__(self):
+    def __init__(self, concurrency=1, requests_per_second=2.0, burst=1, max_retries=3, cache_path=None):
         self.base_url = "https://www.blackbeltwiki.com"
+        self.concurrency = max(1, concurrency)
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # One pooled keep-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.techniques = []
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        # Pages unchanged since the last crawl are served from the cache without re-parsing
+        self.cache = CrawlCache(cache_path) if cache_path else None
+        self.checkpoint_path = f'{cache_path}.checkpoint' if cache_path else None
+        self.cache_stats = Counter()
+        self._stats_lock = threading.Lock()
+    
+    def _bucket(self, url):
+        """The rate limiter for a URL's host - the politeness budget is per host"""
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            return bucket
+    
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_CAP)
+        
+        # Full jitter so workers that failed together don't retry together
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    
+    def fetch(self, url, headers=None, timeout=10):
+        """GET a page within the host's rate limit, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            self._bucket(url).acquire()
+            
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                response.raise_for_status()
+                return response
+            
+            time.sleep(self._backoff(attempt, response))
+    
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.cache_stats[outcome] += 1
+    
+    def fetch_page(self, url, parse):
+        """
+        Fetch a page and return parse(html). With a cache, the request is conditional and
+        the cached result is returned when the server answers 304 or the body hashes the same.
+        """
+        cached = self.cache.get(url) if self.cache else None
+        response = self.fetch(url, headers=cached.conditional_headers() if cached else None)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        
+        if cached and response.status_code == 304:
+            self.cache.touch(url, etag, last_modified)
+            self._count('not_modified')
+            return cached.result
+        
+        digest = content_hash(PARSER_VERSION.encode() + response.content)
+        if cached and digest == cached.content_hash:
+            self.cache.touch(url, etag, last_modified)
+            self._count('unchanged')
+            return cached.result
+        
+        result = parse(response.content)
+        if self.cache:
+            self.cache.store(url, etag, last_modified, digest, result)
+        self._count('parsed')
+        return result
+    
+    def _run(self, func, items):
+        """Yield (item, func(item)) - in order when serial, as they finish when concurrent"""
+        if self.concurrency == 1:
+            for item in items:
+                yield item, func(item)
+            return
+        
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Only a couple of tasks per worker in flight, so results can't pile up unconsumed
+            pending = {executor.submit(func, item): item for item in islice(items, self.concurrency * 2)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    for next_item in islice(items, 1):
+                        pending[executor.submit(func, next_item)] = next_item
+                    yield item, future.result()
     
     def scrape_technique_list(self, url):
         """Scrape a list page of techniques"""
         try:
             print(f"📄 Scraping list: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            yield from self.fetch_page(url, self.parse_technique_list)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+        except Exception as e:
+            print(f"❌ Error scraping {url}: {e}")
+    
+    def parse_technique_list(self, html):
+        """Technique links found on a list page"""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        
+        # Find the main content area - technique links are usually in lists or content divs
+        content = soup.find('div', class_='entry-content') or soup.find('article') or soup
+        
+        # Find all links in the content
+        links = content.find_all('a', href=True)
+        techniques = []
+        
+        for link in links:
+            href = link.get('href')
+            text = link.get_text(strip=True)
             
-            # Find the main content area - technique links are usually in lists or content divs
-            content = soup.find('div', class_='entry-content') or soup.find('article') or soup
+            # Skip empty text or very short
+            if not text or len(text) < 3:
+                continue
             
-            # Find all links in the content
-            links = content.find_all('a', href=True)
+            # Skip obvious non-technique links (in text, not href)
+            skip_text_keywords = ['click here', 'read more', 'see also', 'main article',
+                                 'category:', 'home', 'back to', 'return to']
+            if any(keyword in text.lower() for keyword in skip_text_keywords):
+                continue
             
-            for link in links:
-                href = link.get('href')
-                text = link.get_text(strip=True)
-                
-                # Skip empty text or very short
-                if not text or len(text) < 3:
-                    continue
-                
-                # Skip obvious non-technique links (in text, not href)
-                skip_text_keywords = ['click here', 'read more', 'see also', 'main article',
-                                     'category:', 'home', 'back to', 'return to']
-                if any(keyword in text.lower() for keyword in skip_text_keywords):
-                    continue
-                
-                # Must be an internal link
-                if not href.startswith('/') and 'blackbeltwiki.com' not in href:
-                    continue
-                
-                # Convert to full URL
-                full_url = urljoin(self.base_url, href)
-                
-                # Skip navigation/system pages in URL
-                skip_url_keywords = ['wp-content', 'wp-admin', 'wp-includes', 
-                                    'feed', 'rss', 'xmlrpc', 'wp-json',
-                                    'author', 'tag', 'category', 'page',
-                                    'search', 'login', 'register']
-                if any(keyword in href.lower() for keyword in skip_url_keywords):
-                    continue
-                
-                # Skip the main category pages themselves
-                category_pages = ['/kicks', '/punches', '/blocks', '/grappling', '/joint-locks',
-                                 '/karate-kicks', '/karate-techniques', '/taekwondo-kicks',
-                                 '/taekwondo-techniques', '/muay-thai-kicks', '/boxing-techniques',
-                                 '/mixed-martial-arts', '/judo', '/jiu-jitsu',
-                                 '/home', '/about', '/contact', '/privacy', '/terms']
-                
-                # Only skip if it's EXACTLY these pages
-                if href.rstrip('/') in category_pages:
-                    continue
-                
-                # If we got here, it's probably a technique page
-                # Technique pages are typically: /technique-name (one level deep)
-                if href.startswith('/') and href.count('/') >= 1:
-                    yield {'name': text, 'url': full_url}
+            # Must be an internal link
+            if not href.startswith('/') and 'blackbeltwiki.com' not in href:
+                continue
             
-            time.sleep(1)  # Be polite to the server
+            # Convert to full URL
+            full_url = urljoin(self.base_url, href)
             
-        except Exception as e:
-            print(f"❌ Error scraping {url}: {e}")
+            # Skip navigation/system pages in URL
+            skip_url_keywords = ['wp-content', 'wp-admin', 'wp-includes', 
+                                'feed', 'rss', 'xmlrpc', 'wp-json',
+                                'author', 'tag', 'category', 'page',
+                                'search', 'login', 'register']
+            if any(keyword in href.lower() for keyword in skip_url_keywords):
+                continue
+            
+            # Skip the main category pages themselves
+            category_pages = ['/kicks', '/punches', '/blocks', '/grappling', '/joint-locks',
+                             '/karate-kicks', '/karate-techniques', '/taekwondo-kicks',
+                             '/taekwondo-techniques', '/muay-thai-kicks', '/boxing-techniques',
+                             '/mixed-martial-arts', '/judo', '/jiu-jitsu',
+                             '/home', '/about', '/contact', '/privacy', '/terms']
+            
+            # Only skip if it's EXACTLY these pages
+            if href.rstrip('/') in category_pages:
+                continue
+            
+            # If we got here, it's probably a technique page
+            # Technique pages are typically: /technique-name (one level deep)
+            if href.startswith('/') and href.count('/') >= 1:
+                techniques.append({'name': text, 'url': full_url})
+        
+        return techniques
     
     def scrape_technique_detail(self, technique_url):
         """Scrape detailed information for a single technique"""
         try:
-            response = self.session.get(technique_url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract technique data
-            technique_data = {
-                'name': self.extract_name(soup),
-                'description': self.extract_description(soup),
-                'style': self.extract_style(soup),
-                'difficulty': self.extract_difficulty(soup),
-                'category': self.extract_category(technique_url),
-                'reference_video_url': self.extract_video_url(soup)
-            }
-            
-            time.sleep(0.5)  # Be polite
-            return technique_data
+            return self.fetch_page(technique_url, lambda html: self.parse_technique_detail(html, technique_url))
             
         except Exception as e:
             print(f"Error scraping detail {technique_url}: {e}")
             return None
     
+    def parse_technique_detail(self, html, technique_url):
+        """Technique data from a detail page"""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        labels = self.classify_page(soup, technique_url)
+        
+        return {
+            'name': self.extract_name(soup),
+            'description': self.extract_description(soup),
+            'style': labels['style'],
+            'difficulty': labels['difficulty'],
+            'category': labels['category'],
+            'reference_video_url': self.extract_video_url(soup)
+        }
+    
+    def classify_page(self, soup, url):
+        """Style, difficulty and category of a page - its text is extracted once for all of them"""
+        labels = PAGE_CLASSIFIER.classify(soup.get_text().lower())
+        labels.update(URL_CLASSIFIER.classify(url.lower()))
+        return labels
+    
     def extract_name(self, soup):
         """Extract technique name"""
         # Try h1 first, then title
@@ -143,61 +303,15 @@ class BlackBeltWikiScraper:
     
     def extract_style(self, soup):
         """Extract martial arts style"""
-        text = soup.get_text().lower()
-        
-        # Check for common styles
-        styles = {
-            'karate': ['karate', 'shotokan', 'kyokushin', 'goju-ryu'],
-            'taekwondo': ['taekwondo', 'tae kwon do', 'tkd'],
-            'kung fu': ['kung fu', 'wushu', 'shaolin'],
-            'muay thai': ['muay thai', 'thai boxing'],
-            'boxing': ['boxing', 'pugilism'],
-            'judo': ['judo'],
-            'jiu-jitsu': ['jiu-jitsu', 'jujutsu', 'bjj'],
-            'mixed martial arts': ['mma', 'mixed martial'],
-            'kickboxing': ['kickboxing'],
-            'capoeira': ['capoeira']
-        }
-        
-        for style, keywords in styles.items():
-            for keyword in keywords:
-                if keyword in text:
-                    return style.title()
-        
-        return "General"
+        return PAGE_CLASSIFIER.classify(soup.get_text().lower())['style']
     
     def extract_difficulty(self, soup):
         """Extract difficulty level"""
-        text = soup.get_text().lower()
-        
-        if any(word in text for word in ['advanced', 'expert', 'difficult', 'complex']):
-            return "Advanced"
-        elif any(word in text for word in ['intermediate', 'moderate']):
-            return "Intermediate"
-        elif any(word in text for word in ['beginner', 'basic', 'simple', 'easy']):
-            return "Beginner"
-        
-        # Default to intermediate
-        return "Intermediate"
+        return PAGE_CLASSIFIER.classify(soup.get_text().lower())['difficulty']
     
     def extract_category(self, url):
         """Extract category from URL"""
-        url_lower = url.lower()
-        
-        if 'kick' in url_lower:
-            return "Kicks"
-        elif 'punch' in url_lower or 'strike' in url_lower:
-            return "Strikes"
-        elif 'block' in url_lower or 'defense' in url_lower:
-            return "Blocks"
-        elif 'throw' in url_lower or 'takedown' in url_lower:
-            return "Throws"
-        elif 'grappling' in url_lower or 'submission' in url_lower:
-            return "Grappling"
-        elif 'kata' in url_lower or 'form' in url_lower:
-            return "Forms"
-        
-        return "Techniques"
+        return URL_CLASSIFIER.classify(url.lower())['category']
     
     def extract_video_url(self, soup):
         """Extract YouTube video URL if present"""
@@ -214,6 +328,12 @@ class BlackBeltWikiScraper:
     
     def scrape_all(self):
         """Main scraping method"""
+        for technique in self.iter_techniques():
+            self.techniques.append(technique)
+        return self.techniques
+    
+    def iter_techniques(self):
+        """Crawl the site, yielding each technique as soon as its page is scraped"""
         print("🕷️  Starting BlackBeltWiki scraper...")
         
         # List of category pages to scrape (CORRECTED URLS)
@@ -240,48 +360,71 @@ class BlackBeltWikiScraper:
         # Collect all technique URLs
         technique_urls = set()
         
-        for i, page_url in enumerate(category_pages, 1):
-            print(f"\n[{i}/{len(category_pages)}] Processing: {page_url}")
-            try:
-                found_count = 0
-                for technique in self.scrape_technique_list(page_url):
-                    technique_urls.add((technique['name'], technique['url']))
-                    found_count += 1
-                print(f"   ✅ Found {found_count} techniques")
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-                continue
+        pages = self._run(lambda page_url: list(self.scrape_technique_list(page_url)), category_pages)
+        for i, (page_url, found) in enumerate(pages, 1):
+            print(f"\n[{i}/{len(category_pages)}] Processed: {page_url}")
+            for technique in found:
+                technique_urls.add((technique['name'], technique['url']))
+            print(f"   ✅ Found {len(found)} techniques")
         
         print(f"\n📊 Found {len(technique_urls)} unique techniques across all pages")
         
         if len(technique_urls) == 0:
             print("\n⚠️  No techniques found. The site structure may have changed.")
             print("💡 Tip: Check if BlackBeltWiki is accessible at https://blackbeltwiki.com")
-            return []
+            return
         
         # Scrape details for each technique
         scraped_count = 0
         errors_count = 0
         
-        print(f"\n🔍 Scraping technique details...")
+        # Pages finished before an interrupted run are taken straight from the cache
+        checkpoint = CrawlCheckpoint(self.checkpoint_path) if self.checkpoint_path else None
+        pending = []
         for name, url in technique_urls:
-            print(f"[{scraped_count + 1}/{len(technique_urls)}] {name}")
-            detail = self.scrape_technique_detail(url)
-            
-            if detail:
-                self.techniques.append(detail)
+            cached = self.cache.get(url) if checkpoint and url in checkpoint.done else None
+            if cached:
+                yield cached.result
                 scraped_count += 1
             else:
-                errors_count += 1
-            
-            # Progress update every 25 techniques
-            if (scraped_count + errors_count) % 25 == 0:
-                print(f"   📈 Progress: {scraped_count} succeeded, {errors_count} failed")
+                pending.append((name, url))
+        
+        if scraped_count:
+            print(f"\n♻️  Resuming interrupted crawl: {scraped_count} techniques already done")
+        
+        print(f"\n🔍 Scraping technique details ({self.concurrency} workers, {self.requests_per_second} req/s)...")
+        completed = False
+        try:
+            details = self._run(lambda technique: self.scrape_technique_detail(technique[1]), pending)
+            for (name, url), detail in details:
+                print(f"[{scraped_count + errors_count + 1}/{len(technique_urls)}] {name}")
+                
+                if detail:
+                    yield detail
+                    scraped_count += 1
+                    if checkpoint:
+                        checkpoint.mark_done(url)
+                else:
+                    errors_count += 1
+                
+                # Progress update every 25 techniques
+                if (scraped_count + errors_count) % 25 == 0:
+                    print(f"   📈 Progress: {scraped_count} succeeded, {errors_count} failed")
+            completed = True
+        finally:
+            if checkpoint:
+                # Keep the checkpoint if the crawl was interrupted or some pages failed
+                if completed and not errors_count:
+                    checkpoint.complete()
+                else:
+                    checkpoint.close()
         
         print(f"\n✅ Scraping complete!")
-        print(f"   Success: {len(self.techniques)} techniques")
+        print(f"   Success: {scraped_count} techniques")
         print(f"   Failed: {errors_count} techniques")
-        return self.techniques
+        if self.cache:
+            print(f"   Cache: {self.cache_stats['not_modified']} not modified, "
+                  f"{self.cache_stats['unchanged']} unchanged, {self.cache_stats['parsed']} parsed")
     
     def save_to_json(self, filename='techniques_scraped.json'):
         """Save scraped techniques to JSON file"""
@@ -290,10 +433,51 @@ class BlackBeltWikiScraper:
         print(f"💾 Saved to {filename}")
 
 
+def positive_float(value):
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f'must be greater than 0, got {value}')
+    return number
+
+
+def at_least_one(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return number
+
+
+def non_negative(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'must not be negative, got {value}')
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape techniques from BlackBeltWiki')
+    parser.add_argument('--concurrency', type=at_least_one, default=1, help='Parallel requests (default: 1)')
+    parser.add_argument('--rate', type=positive_float, default=2.0, help='Max requests per second to the site (default: 2)')
+    parser.add_argument('--burst', type=at_least_one, default=1, help='Requests allowed back to back before rate limiting')
+    parser.add_argument('--retries', type=non_negative, default=3, help='Retries for timeouts and 429/5xx responses')
+    parser.add_argument('--output', default='techniques_scraped.json')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help=f'HTTP cache file (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='Re-download and re-parse every page')
+    return parser.parse_args(argv)
+
+
 def main():
-    scraper = BlackBeltWikiScraper()
+    args = parse_args()
+    
+    scraper = BlackBeltWikiScraper(
+        concurrency=args.concurrency,
+        requests_per_second=args.rate,
+        burst=args.burst,
+        max_retries=args.retries,
+        cache_path=None if args.no_cache else args.cache
+    )
     techniques = scraper.scrape_all()
-    scraper.save_to_json('techniques_scraped.json')
+    scraper.save_to_json(args.output)
     
     print(f"\n📊 Summary:")
     print(f"Total techniques: {len(techniques)}")
@@ -0,0 +1,190 @@
+"""
+Scrape Pipeline
+Streams scraped techniques into the database while the crawl is still running:
+
+    crawl (fetch + parse) -> bounded queue -> normalize -> JSONL spool -> batch upsert
+
+Every record is appended to the spool before it is imported, so a failed import can be
+replayed from the spool without crawling again. Needs an app context (for the import step).
+"""
+
+import json
+import os
+import queue
+import threading
+from app.models import db
+from app.services.technique_import import import_technique_batch, ImportResult
+
+DEFAULT_SPOOL_PATH = 'techniques_scraped.jsonl'
+DEFAULT_BATCH_SIZE = 200
+
+# Scraped records waiting for the import step - the crawl blocks when the importer falls behind
+QUEUE_SIZE = 256
+
+IMPORT_FIELDS = ('name', 'description', 'style', 'difficulty', 'reference_video_url')
+
+_END = object()
+
+
+class Spool:
+    """
+    Append-only JSONL file of scraped techniques.
+    A sidecar file (<path>.imported) records how many lines have been committed to the database.
+    """
+
+    def __init__(self, path=DEFAULT_SPOOL_PATH):
+        self.path = path
+        self.offset_path = f'{path}.imported'
+        self.file = None
+        self.count = 0
+
+    def start(self):
+        """Begin a new spool, replacing any previous one"""
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.count = 0
+        self.mark_imported(0)
+
+    def append(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        # Flushed per record so everything scraped survives a crash
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def imported_count(self):
+        try:
+            with open(self.offset_path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def mark_imported(self, count):
+        tmp_path = f'{self.offset_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(count))
+        os.replace(tmp_path, self.offset_path)
+
+    def replay(self, start=0):
+        """Yield (line_number, record) for the spooled records from line `start` on"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                if line_number < start or not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave the last line half-written
+                    print(f"⚠️  Skipping unreadable spool line {line_number + 1}")
+
+
+def normalize(record):
+    """Scraped page data -> import record (drops fields the catalog doesn't store)"""
+    return {field: record.get(field) for field in IMPORT_FIELDS}
+
+
+class BatchImporter:
+    """Collects records and upserts them in batches, remembering the spool position committed so far"""
+
+    def __init__(self, spool, policy='skip', batch_size=DEFAULT_BATCH_SIZE, dedupe='off'):
+        self.spool = spool
+        self.policy = policy
+        self.dedupe = dedupe
+        self.batch_size = batch_size
+        self.batch = []
+        self.batch_end = 0
+        self.totals = ImportResult()
+        self.failed = None
+
+    def add(self, line_number, record):
+        if self.failed:
+            return
+        self.batch.append(record)
+        self.batch_end = line_number + 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.failed or not self.batch:
+            return
+
+        try:
+            result = import_technique_batch(self.batch, policy=self.policy, dedupe=self.dedupe)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            # Stop importing - the rest is still spooled and can be replayed
+            self.failed = str(e)
+            print(f"❌ Import failed at spool line {self.batch_end - len(self.batch) + 1}: {e}")
+            return
+
+        self.spool.mark_imported(self.batch_end)
+        self.totals.merge(result)
+        self.batch = []
+        print(f"💾 Committed {self.batch_end} "
+              f"(+{result.imported} new, {result.updated} updated, {result.skipped} skipped)")
+
+
+def _crawl(scraper, out):
+    """Producer thread: push scraped techniques into the queue, then the end marker"""
+    try:
+        for technique in scraper.iter_techniques():
+            out.put(technique)
+    except Exception as e:
+        out.put(e)
+    finally:
+        out.put(_END)
+
+
+def scrape_to_database(scraper, spool_path=DEFAULT_SPOOL_PATH, policy='skip', batch_size=DEFAULT_BATCH_SIZE,
+                       dedupe='off'):
+    """Crawl with `scraper`, spooling every technique and importing them in batches as they arrive"""
+    spool = Spool(spool_path)
+    spool.start()
+    importer = BatchImporter(spool, policy, batch_size, dedupe)
+
+    scraped = queue.Queue(maxsize=QUEUE_SIZE)
+    crawler = threading.Thread(target=_crawl, args=(scraper, scraped), daemon=True)
+    crawler.start()
+
+    try:
+        while True:
+            item = scraped.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                print(f"❌ Crawl failed: {item}")
+                continue
+
+            record = normalize(item)
+            spool.append(record)
+            importer.add(spool.count - 1, record)
+
+        importer.flush()
+    finally:
+        spool.close()
+
+    if importer.failed:
+        print(f"⚠️  {spool.count - spool.imported_count()} spooled techniques were not imported. "
+              f"Replay them from {spool_path} with import_techniques.py (option 3)")
+    return importer.totals
+
+
+def replay_spool(spool_path=DEFAULT_SPOOL_PATH, policy='skip', batch_size=DEFAULT_BATCH_SIZE, from_start=False,
+                 dedupe='off'):
+    """Import spooled techniques, continuing after the last committed batch unless from_start"""
+    spool = Spool(spool_path)
+    start = 0 if from_start else spool.imported_count()
+    if start:
+        print(f"♻️  Skipping {start} spooled techniques that were already imported")
+
+    importer = BatchImporter(spool, policy, batch_size, dedupe)
+    for line_number, record in spool.replay(start):
+        importer.add(line_number, normalize(record))
+        if importer.failed:
+            break
+    importer.flush()
+    return importer.totals
@@ -0,0 +1,179 @@
+"""
+Progress Stress Test
+Hammers the progress endpoints from many threads at once, the way several devices syncing
+the same account do, and checks that no practice was lost and no request collided:
+
+    - every thread starts tracking the same techniques (POST) - exactly one insert wins
+    - every thread then marks them practiced (PUT) - the counters must equal the requests sent
+    - every thread then marks them all practiced in batches (POST /techniques/batch) while also
+      changing their status - each batch must report a practice count no other batch reported
+    - each row's next_due_at must be scheduled from the practice count it ended with
+      (run with few practices, e.g. --threads 8 --requests 1, to stay below the interval cap)
+    - the user_stats rollup must match a full rebuild
+
+Runs against a throwaway SQLite database, never the configured one.
+Usage: python scripts/stress_progress.py [--threads 16] [--requests 50] [--techniques 3]
+"""
+
+import sys
+import os
+import io
+import argparse
+import contextlib
+import tempfile
+import threading
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+
+
+def quietly(func, *args, **kwargs):
+    """The app logs every request - keep the output readable. Not thread-safe: call it around the workers"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent progress updates must not lose increments')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50,
+                        help='PUTs per thread and technique, and batches per thread (default: 50)')
+    parser.add_argument('--techniques', type=int, default=3)
+    parser.add_argument('--duration', type=int, default=5, help='Minutes per practice (default: 5)')
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='dojotracker-stress-')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(db_dir, 'stress.db')}"
+    # Writers queue on the database lock instead of failing straight away
+    Config.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 60}}
+
+    from app import create_app
+    from app.models import db
+    from app.models.technique import Technique
+    from app.models.user_technique_progress import UserTechniqueProgress
+    from app.services.user_stats import get_user_stats_rows, rebuild_user_stats, COUNTER_COLUMNS
+    from app.services.practice_queue import next_due_at
+
+    app = quietly(create_app)
+
+    with app.app_context():
+        techniques = [Technique(name=f'Stress Technique {i}', style='Karate') for i in range(args.techniques)]
+        db.session.add_all(techniques)
+        db.session.commit()
+        technique_ids = [t.id for t in techniques]
+
+    client = app.test_client()
+    credentials = {'username': 'stress', 'email': 'stress@example.com', 'password': 'stress-password'}
+    response = quietly(client.post, '/api/auth/register', json=credentials)
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    barrier = threading.Barrier(args.threads)
+    statuses = {}
+    errors = []
+    reported_counts = {technique_id: [] for technique_id in technique_ids}
+    lock = threading.Lock()
+    proficiency = ('learning', 'practicing', 'mastered')
+
+    def worker(worker_number):
+        client = app.test_client()
+        barrier.wait()
+        for technique_id in technique_ids:
+            response = client.post(f'/api/progress/techniques/{technique_id}', headers=headers)
+            with lock:
+                statuses.setdefault(response.status_code, 0)
+                statuses[response.status_code] += 1
+                if response.status_code not in (200, 201):
+                    errors.append(response.get_json())
+
+        barrier.wait()
+        for _ in range(args.requests):
+            for technique_id in technique_ids:
+                response = client.put(
+                    f'/api/progress/techniques/{technique_id}', headers=headers,
+                    json={'mark_practiced': True, 'practice_duration': args.duration}
+                )
+                if response.status_code != 200:
+                    with lock:
+                        errors.append(response.get_json())
+
+        barrier.wait()
+        for n in range(args.requests):
+            updates = [
+                {'technique_id': technique_id, 'mark_practiced': True, 'practice_duration': args.duration,
+                 'status': proficiency[(worker_number + n) % len(proficiency)]}
+                for technique_id in technique_ids
+            ]
+            response = client.post('/api/progress/techniques/batch', headers=headers, json={'updates': updates})
+            with lock:
+                if response.status_code != 200:
+                    errors.append(response.get_json())
+                    continue
+                for result in response.get_json()['results']:
+                    reported_counts[result['technique_id']].append(result['practice_count'])
+
+    print(f"\n🔨 {args.threads} threads x {args.requests} practices x {args.techniques} techniques...")
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+
+    def run_all():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    quietly(run_all)
+
+    # One practice per PUT and one per batch, for every technique
+    expected = 2 * args.threads * args.requests
+    ok = True
+
+    with app.app_context():
+        rows = UserTechniqueProgress.query.filter(UserTechniqueProgress.technique_id.in_(technique_ids)).all()
+        print(f"   Start tracking: {statuses.get(201, 0)} created, {statuses.get(200, 0)} already tracking")
+        if len(rows) != args.techniques or statuses.get(201, 0) != args.techniques:
+            ok = False
+            print(f"   ❌ Expected {args.techniques} progress rows, found {len(rows)}")
+
+        for row in rows:
+            lost = expected - row.practice_count
+            print(f"   Technique {row.technique_id}: {row.practice_count}/{expected} practices, "
+                  f"{row.total_practice_time}/{expected * args.duration} min")
+            if lost or row.total_practice_time != expected * args.duration:
+                ok = False
+
+            # A batch read from a stale snapshot reports a count another batch already did
+            counts = reported_counts[row.technique_id]
+            if len(set(counts)) != len(counts) or (counts and max(counts) > row.practice_count):
+                ok = False
+                print(f"   ❌ Technique {row.technique_id}: batches reported "
+                      f"{len(counts) - len(set(counts))} repeated practice counts")
+
+            scheduled = next_due_at(row.last_practiced, row.practice_count, row.proficiency_status)
+            if row.next_due_at != scheduled:
+                ok = False
+                print(f"   ❌ Technique {row.technique_id} due {row.next_due_at}, "
+                      f"expected {scheduled} for {row.practice_count} practices")
+
+        user_id = rows[0].user_id if rows else None
+        live = {row.style: {c: getattr(row, c) for c in COUNTER_COLUMNS} for row in
+                get_user_stats_rows(user_id).values()}
+        rebuild_user_stats(user_id)
+        db.session.commit()
+        db.session.expire_all()
+        rebuilt = {row.style: {c: getattr(row, c) for c in COUNTER_COLUMNS} for row in
+                get_user_stats_rows(user_id).values()}
+        if live != rebuilt:
+            ok = False
+            print("   ❌ Stats rollup drifted from a rebuild")
+
+    if errors:
+        ok = False
+        print(f"   ❌ {len(errors)} failed requests, e.g. {errors[0]}")
+
+    print("   ✅ No lost updates" if ok else "   ❌ Updates were lost")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,8 @@ from app.models import db
 from app.models.technique import Technique
 from app.models.user import User
 from app.models.analysis import VideoAnalysis
+from app.services.technique_catalog import bump_catalog_version
+from app.services.technique_search import rebuild_search_index
 
 app = create_app()
 
@@ -76,6 +78,9 @@ with app.app_context():
             technique = Technique(**tech_data)
             db.session.add(technique)
         
+        db.session.flush()
+        rebuild_search_index()
+        bump_catalog_version()
         db.session.commit()
         print(f"✅ Successfully seeded {len(techniques)} techniques!")
         
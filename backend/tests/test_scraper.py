@@ -0,0 +1,334 @@
+"""
+BlackBeltWiki scraper tests
+Run the crawler against a local stub HTTP server: retries on 429/503 with Retry-After,
+jittered backoff, the concurrency cap, per-host token-bucket pacing and connection reuse.
+
+    cd backend && python -m pytest tests/test_scraper.py
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+# The scraper lives in scripts/ and imports its siblings by module name
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import scrape_blackbeltwiki
+from scrape_blackbeltwiki import BlackBeltWikiScraper, TokenBucket, BACKOFF_BASE, BACKOFF_CAP, parse_args
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    HTTP server answering from per-path scripts: queue (status, headers, body) responses for a
+    path with script(); once a path's queue is empty it answers 200 with `default_body`.
+    Records every request and the peak number handled at once.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.scripts = {}
+        self.default_body = b'<html><h1>Page</h1><p>Body</p></html>'
+        self.delay = 0.0
+        self.requests = []
+        self.clients = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def script(self, path, *responses):
+        self.scripts.setdefault(path, deque()).extend(responses)
+
+    def hits(self, path):
+        return [t for p, t in self.requests if p == path]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, time.monotonic()))
+            server.clients[self.client_address] += 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            queue = server.scripts.get(self.path)
+            status, headers, body = queue.popleft() if queue else (200, {}, server.default_body)
+
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Record the scraper's backoff sleeps instead of waiting them out"""
+    sleeps = []
+    monkeypatch.setattr(scrape_blackbeltwiki.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def make_scraper(**kwargs):
+    kwargs.setdefault('requests_per_second', 1000.0)
+    kwargs.setdefault('burst', 1000)
+    return BlackBeltWikiScraper(**kwargs)
+
+
+# ==================== RETRIES ====================
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_after_busy_response_honouring_retry_after(server, no_sleep, status):
+    server.script('/busy', (status, {'Retry-After': '7'}, b'busy'), (status, {'Retry-After': '2'}, b'busy'))
+    scraper = make_scraper(max_retries=3)
+
+    response = scraper.fetch(f'{server.url}/busy')
+
+    assert response.status_code == 200
+    assert len(server.hits('/busy')) == 3
+    assert no_sleep == [7.0, 2.0]
+
+
+def test_retry_after_is_capped(server, no_sleep):
+    server.script('/slow', (503, {'Retry-After': '3600'}, b''))
+
+    make_scraper().fetch(f'{server.url}/slow')
+
+    assert no_sleep == [BACKOFF_CAP]
+
+
+def test_gives_up_after_max_retries(server, no_sleep):
+    server.script('/down', *[(503, {}, b'down')] * 5)
+    scraper = make_scraper(max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        scraper.fetch(f'{server.url}/down')
+
+    assert len(server.hits('/down')) == 3
+    assert len(no_sleep) == 2
+
+
+def test_client_errors_are_not_retried(server, no_sleep):
+    server.script('/missing', (404, {}, b'nope'))
+
+    with pytest.raises(requests.HTTPError):
+        make_scraper().fetch(f'{server.url}/missing')
+
+    assert len(server.hits('/missing')) == 1
+    assert no_sleep == []
+
+
+def test_retries_connection_errors(no_sleep):
+    # Nothing listens on the port once this server is closed
+    closed = StubServer()
+    url = closed.url
+    closed.server_close()
+
+    with pytest.raises(requests.ConnectionError):
+        make_scraper(max_retries=2).fetch(f'{url}/gone', timeout=1)
+
+    assert len(no_sleep) == 2
+
+
+def test_failed_detail_page_is_reported_not_raised(server, no_sleep):
+    server.script('/broken', *[(500, {}, b'oops')] * 2)
+
+    assert make_scraper(max_retries=1).scrape_technique_detail(f'{server.url}/broken') is None
+
+
+# ==================== BACKOFF ====================
+
+def test_backoff_is_full_jitter_within_exponential_bound():
+    scraper = make_scraper()
+
+    for attempt in range(8):
+        bound = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+        delays = [scraper._backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= bound for delay in delays)
+        # Spread over the whole range, not a fixed delay
+        assert len(set(delays)) > 150
+        assert max(delays) > bound / 2
+
+
+def test_backoff_ignores_non_numeric_retry_after(server):
+    server.script('/date', (503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}, b''))
+    response = requests.get(f'{server.url}/date')
+
+    delay = make_scraper()._backoff(1, response)
+
+    assert 0 <= delay <= BACKOFF_BASE * 2
+
+
+# ==================== CONCURRENCY ====================
+
+def test_concurrency_is_capped(server):
+    server.delay = 0.1
+    scraper = make_scraper(concurrency=3)
+    urls = [f'{server.url}/page-{i}' for i in range(12)]
+
+    results = dict(scraper._run(lambda url: scraper.fetch(url).status_code, urls))
+
+    assert results == {url: 200 for url in urls}
+    assert server.peak_in_flight == 3
+
+
+def test_concurrent_crawl_is_faster_than_serial(server):
+    server.delay = 0.1
+    urls = [f'{server.url}/page-{i}' for i in range(8)]
+
+    scraper = make_scraper(concurrency=4)
+    started = time.monotonic()
+    list(scraper._run(lambda url: scraper.fetch(url), urls))
+    elapsed = time.monotonic() - started
+
+    # Serially this is 8 x 0.1s
+    assert elapsed < 0.6
+
+
+def test_connections_are_reused(server):
+    scraper = make_scraper()
+
+    for i in range(5):
+        scraper.fetch(f'{server.url}/page-{i}')
+
+    assert len(server.clients) == 1
+
+
+# ==================== RATE LIMIT ====================
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=20, burst=1)
+    started = time.monotonic()
+
+    for _ in range(11):
+        bucket.acquire()
+
+    # The first token is there already, the other ten arrive 50 ms apart
+    elapsed = time.monotonic() - started
+    assert 0.45 <= elapsed < 0.8
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=5)
+    started = time.monotonic()
+
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_token_bucket_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, burst=0)
+
+
+def test_rate_limit_holds_across_workers(server):
+    scraper = make_scraper(concurrency=8, requests_per_second=25.0, burst=1)
+    urls = [f'{server.url}/page-{i}' for i in range(16)]
+
+    list(scraper._run(lambda url: scraper.fetch(url), urls))
+
+    times = sorted(t for _, t in server.requests)
+    # 16 requests at 25/s: the politeness budget, not the 8 workers, sets the pace
+    assert times[-1] - times[0] >= 15 / 25 * 0.9
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps) > 0.02
+
+
+def test_rate_limit_is_per_host(server):
+    scraper = make_scraper(requests_per_second=5.0, burst=1)
+    other_host = server.url.replace('127.0.0.1', 'localhost')
+
+    assert scraper._bucket(f'{server.url}/a') is scraper._bucket(f'{server.url}/b')
+    assert scraper._bucket(f'{server.url}/a') is not scraper._bucket(f'{other_host}/a')
+
+
+def test_retries_wait_for_the_rate_limit(server):
+    server.script('/flaky', (503, {'Retry-After': '0'}, b''), (503, {'Retry-After': '0'}, b''))
+    scraper = make_scraper(requests_per_second=10.0, burst=1)
+
+    scraper.fetch(f'{server.url}/flaky')
+
+    hits = server.hits('/flaky')
+    assert len(hits) == 3
+    assert hits[-1] - hits[0] >= 0.18
+
+
+# ==================== END TO END ====================
+
+def test_scrape_all_against_stub_site(server):
+    server.script('/kicks', (200, {}, b'''
+        <div class="entry-content">
+            <a href="/front-kick">Front Kick</a>
+            <a href="/side-kick">Side Kick</a>
+            <a href="/kicks">Kicks</a>
+        </div>'''))
+    server.script('/front-kick', (503, {'Retry-After': '0'}, b''),
+                  (200, {}, b'<h1>Front Kick</h1><div class="entry-content"><p>Karate kick.</p></div>'))
+    server.script('/side-kick', (200, {}, b'<h1>Side Kick</h1><div class="entry-content"><p>Kick.</p></div>'))
+    server.default_body = b''
+    scraper = make_scraper(concurrency=2)
+    scraper.base_url = server.url
+
+    techniques = scraper.scrape_all()
+
+    assert sorted(t['name'] for t in techniques) == ['Front Kick', 'Side Kick']
+    assert len(server.hits('/front-kick')) == 2
+
+
+# ==================== COMMAND LINE ====================
+
+@pytest.mark.parametrize('argv', [
+    ['--rate', '0'],
+    ['--rate', '-1'],
+    ['--burst', '0'],
+    ['--concurrency', '0'],
+    ['--retries', '-1'],
+])
+def test_rejects_invalid_arguments(argv, capsys):
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_parses_valid_arguments():
+    args = parse_args(['--rate', '0.5', '--burst', '3', '--concurrency', '4'])
+
+    assert (args.rate, args.burst, args.concurrency) == (0.5, 3, 4)
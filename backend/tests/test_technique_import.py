@@ -0,0 +1,77 @@
+"""
+Technique import stream tests
+Line splitting for the streaming NDJSON/CSV import: only '\\n' ends a line, CRLF endings are
+normalized even when the pair is split across reads, and lines carry over between chunks.
+
+    cd backend && python -m pytest tests/test_technique_import.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.technique_import import _text_lines, iter_stream_records
+
+
+class ChunkedStream:
+    """Binary stream that hands out the given chunks one read() at a time"""
+
+    def __init__(self, *chunks):
+        self.chunks = list(chunks)
+
+    def read(self, size=-1):
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+def test_line_separator_inside_a_json_string_does_not_split_the_line():
+    record = {'name': 'Front Kick', 'description': 'Chamber\u2028then extend\u2029and\x85retract'}
+    stream = ChunkedStream(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    lines = list(_text_lines(stream))
+
+    assert len(lines) == 1
+    assert json.loads(lines[0]) == record
+
+
+def test_crlf_split_across_chunks_is_one_line_ending():
+    stream = ChunkedStream(b'{"name": "A"}\r', b'\n{"name": "B"}\r\n')
+
+    assert list(_text_lines(stream)) == ['{"name": "A"}\n', '{"name": "B"}\n']
+
+
+def test_lines_carry_over_between_chunks():
+    stream = ChunkedStream(b'{"na', b'me": "A"}\n{"name"', b': "B"}')
+
+    assert list(_text_lines(stream)) == ['{"name": "A"}\n', '{"name": "B"}']
+
+
+def test_multibyte_character_split_across_chunks():
+    encoded = '{"name": "Mawashi Geri é"}\n'.encode('utf-8')
+    split = encoded.index(b'\xc3') + 1
+    stream = ChunkedStream(encoded[:split], encoded[split:])
+
+    assert list(_text_lines(stream)) == ['{"name": "Mawashi Geri é"}\n']
+
+
+def test_trailing_carriage_return_without_newline_is_dropped():
+    assert list(_text_lines(ChunkedStream(b'a\r\nb\r'))) == ['a\n', 'b']
+
+
+def test_byte_order_mark_is_skipped():
+    assert list(_text_lines(ChunkedStream(b'\xef\xbb\xbfname\n'))) == ['name\n']
+
+
+def test_csv_records_with_crlf_split_across_chunks():
+    stream = ChunkedStream(
+        b'name,style,description\r',
+        b'\nArmbar,BJJ,"Grip\r\nand finish"\r\nHip Throw,Judo,\r\n',
+    )
+
+    records = [record for _, record, error in iter_stream_records(stream, 'csv') if not error]
+
+    assert records == [
+        {'name': 'Armbar', 'style': 'BJJ', 'description': 'Grip\nand finish'},
+        {'name': 'Hip Throw', 'style': 'Judo'},
+    ]